@@ -1,3 +1,13 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import ConcreteGrade, SteelGrade
+
+
+@admin.register(SteelGrade)
+class SteelGradeAdmin(admin.ModelAdmin):
+    list_display = ('grade', 'fy', 'fu', 'elastic_modulus', 'density', 'thermal_coefficient')
+
+
+@admin.register(ConcreteGrade)
+class ConcreteGradeAdmin(admin.ModelAdmin):
+    list_display = ('grade', 'fck', 'ecm', 'density', 'thermal_coefficient')
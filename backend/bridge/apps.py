@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class BridgeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'bridge'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .materials import reset_registry
+
+        # Server processes load the materials catalog at startup (wsgi.py/asgi.py);
+        # not here: ready() also runs for manage.py commands and before the
+        # test database exists
+        reset_registry()
@@ -0,0 +1,278 @@
+"""
+Native async views for OSDAG Bridge Module API endpoints.
+
+These serve the same payloads as their DRF counterparts in views.py, but
+are plain Django coroutine views using the async ORM (aget, afirst, asave,
+async iteration), so under ASGI (osdag_backend.asgi) a request waiting on
+the database does not hold a worker thread.
+
+Views:
+- locations_by_state: GET /api/async/locations/by_state/
+- locations_by_district: GET /api/async/locations/by_district/
+- material_options: GET /api/async/materials/
+- validate_geometry_view: POST /api/async/geometry/validate/
+- submit: POST /api/async/submit/
+
+DRF's APIView is synchronous, so request parsing and rendering are done
+here directly: bodies are JSON and responses are rendered with
+FastJSONRenderer. The three reference reads are wrapped with coalesced,
+so concurrent identical requests share one response.
+"""
+
+import json
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import quote_etag
+from rest_framework import status
+
+from .cache import location_cache, validation_memo
+from .coalesce import coalesced
+from .conditional import add_reference_headers, etag_matches
+from .designs import amissing_references, parse_design
+from .geometry import geometry_key, validate_geometry
+from .materials import amaterial_registry
+from .models import GeometryData
+from .renderers import FastJSONRenderer
+from .retention import atouch_geometry, needs_touch
+from .serializers import MaterialInputSerializer
+from .views import memoized_geometry_response
+from .writer import record_writer, wants_sync_write
+
+_renderer = FastJSONRenderer()
+
+
+def json_response(data, status=status.HTTP_200_OK):
+    return HttpResponse(_renderer.render(data), content_type='application/json', status=status)
+
+
+def method_not_allowed(request, method):
+    response = json_response(
+        {'detail': f'Method "{request.method}" not allowed.'},
+        status=status.HTTP_405_METHOD_NOT_ALLOWED
+    )
+    response['Allow'] = method
+    return response
+
+
+def parse_body(request):
+    """Return the JSON request body as a dict, or None if it is not one."""
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def reference_response(request, version, data):
+    """Async counterpart of conditional_response for already-loaded data."""
+    # Same tag as the DRF JSON response, so clients can switch paths freely
+    etag = quote_etag(f'{version}-{_renderer.format}')
+    if etag_matches(request, etag):
+        response = HttpResponseNotModified()
+    else:
+        response = json_response(data)
+    return add_reference_headers(response, etag)
+
+
+@sync_to_async
+def save_design(material, design):
+    # The async ORM has no transactions; run both inserts in one atomic block
+    with transaction.atomic():
+        material.save()
+        design.save()
+
+
+@coalesced
+async def locations_by_state(request):
+    """
+    Get all districts for a specific state.
+
+    GET /api/async/locations/by_state/?state=Maharashtra
+    """
+    if request.method != 'GET':
+        return method_not_allowed(request, 'GET')
+    state = request.GET.get('state')
+    if not state:
+        return json_response(
+            {'error': 'state parameter is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    version = await location_cache.aversion()
+    return reference_response(request, version, await location_cache.aget_state_locations(state))
+
+
+@coalesced
+async def locations_by_district(request):
+    """
+    Get location data for a specific state and district.
+
+    GET /api/async/locations/by_district/?state=Maharashtra&district=Mumbai
+    """
+    if request.method != 'GET':
+        return method_not_allowed(request, 'GET')
+    state = request.GET.get('state')
+    district = request.GET.get('district')
+
+    if not state or not district:
+        return json_response(
+            {'error': 'state and district parameters are required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    location = await location_cache.aget_location(state, district)
+    if location is None:
+        return json_response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+    return reference_response(request, await location_cache.aversion(), location)
+
+
+@coalesced
+async def material_options(request):
+    """
+    Return available material options.
+
+    GET /api/async/materials/
+    """
+    if request.method != 'GET':
+        return method_not_allowed(request, 'GET')
+    registry = await amaterial_registry()
+    return reference_response(request, registry.version, registry.options)
+
+
+async def validate_geometry_view(request):
+    """
+    Validate geometry and compute derived parameters.
+
+    POST /api/async/geometry/validate/
+
+    Same request, response and write semantics as GeometryValidationView.
+    """
+    if request.method != 'POST':
+        return method_not_allowed(request, 'POST')
+    data = parse_body(request)
+    try:
+        carriageway_width = float(data.get('carriageway_width'))
+        girder_spacing = float(data.get('girder_spacing'))
+        num_girders = int(data.get('num_girders'))
+        deck_overhang_width = float(data.get('deck_overhang_width'))
+    except (AttributeError, TypeError, ValueError):
+        return json_response(
+            {
+                'valid': False,
+                'message': 'Invalid input parameters',
+                'errors': ['All parameters must be valid numbers']
+            },
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    key = geometry_key(carriageway_width, girder_spacing, num_girders, deck_overhang_width)
+    sync = wants_sync_write(request, data)
+
+    memoized = memoized_geometry_response(key, sync)
+    if memoized is not None:
+        if memoized['geometry_id'] is not None and validation_memo.touch_due(key):
+            await atouch_geometry([memoized['geometry_id']])
+        return json_response(memoized)
+
+    is_valid, overall_width, errors = validate_geometry(
+        carriageway_width, girder_spacing, num_girders, deck_overhang_width
+    )
+
+    stored = await GeometryData.objects.filter(input_hash=key).values_list('id', 'updated_at').afirst()
+    response = {
+        'valid': is_valid,
+        'overall_width': overall_width,
+        'geometry_id': stored[0] if stored else None,
+        'message': 'Geometry validated successfully.' if is_valid else 'Geometry validation failed.',
+        'errors': errors
+    }
+
+    if stored is not None:
+        if needs_touch(stored[1]):
+            await atouch_geometry([stored[0]])
+        validation_memo.put(key, response)
+        return json_response(response)
+
+    geometry = GeometryData(
+        carriageway_width=carriageway_width,
+        girder_spacing=girder_spacing,
+        num_girders=num_girders,
+        deck_overhang_width=deck_overhang_width,
+        overall_width=overall_width,
+        valid=is_valid,
+        input_hash=key
+    )
+
+    if sync:
+        try:
+            # A single INSERT is atomic on its own; no transaction block needed
+            await geometry.asave()
+            response['geometry_id'] = geometry.id
+        except IntegrityError:
+            response['geometry_id'] = (await GeometryData.objects.aget(input_hash=key)).id
+            await atouch_geometry([response['geometry_id']])
+        validation_memo.put(key, response)
+        return json_response(response)
+
+    response['write_token'] = record_writer.submit(geometry)
+    validation_memo.put(key, response)
+    return json_response(response, status=status.HTTP_202_ACCEPTED)
+
+
+async def submit(request):
+    """
+    Store form submission.
+
+    POST /api/async/submit/
+
+    Same request, response and write semantics as SubmissionView.
+    """
+    if request.method != 'POST':
+        return method_not_allowed(request, 'POST')
+    data = parse_body(request)
+    if data is None:
+        return json_response({
+            'success': False,
+            'message': 'Error submitting form: request body must be a JSON object'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    # parse_design and the serializer read the registry synchronously; load it here first
+    await amaterial_registry()
+    try:
+        material, design = parse_design(data)
+        errors = await amissing_references([design])
+        if errors:
+            raise ValueError('; '.join(errors))
+
+        if wants_sync_write(request, data):
+            await save_design(material, design)
+            return json_response({
+                'success': True,
+                'message': 'Form submitted successfully.',
+                'design_id': design.id,
+                'data': MaterialInputSerializer(material).data
+            }, status=status.HTTP_201_CREATED)
+
+        token = record_writer.submit(material)
+        design_token = record_writer.submit(design)
+        return json_response({
+            'success': True,
+            'message': 'Form accepted; it will be stored shortly.',
+            'write_token': token,
+            'design_write_token': design_token,
+            'data': MaterialInputSerializer(material).data
+        }, status=status.HTTP_202_ACCEPTED)
+
+    except Exception as e:
+        return json_response({
+            'success': False,
+            'message': f'Error submitting form: {str(e)}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+
+# Like APIView, these JSON endpoints do not use Django's CSRF protection.
+# csrf_exempt is not coroutine-aware in Django 4.2, so set the flag directly.
+for _view in (validate_geometry_view, submit):
+    _view.csrf_exempt = True
@@ -0,0 +1,248 @@
+"""
+Endpoint benchmark definitions shared by bench_endpoints and tests.py.
+
+ROUTES lists one request per route in bridge/urls.py with the maximum
+number of SQL queries it may issue against a cold location cache. The
+limits hold at any table size: a route whose query count grows with the
+data (an N+1) fails the guard at the small sizes used in tests.py just
+as it does under the 500k-row benchmark.
+
+Payload callables take the request index and the seeded context, so
+write endpoints get distinct inputs (no memo hits) on every request.
+
+Helpers:
+- QueryCounter: Execute wrapper counting the queries of a block
+- seed_locations(rows): Synthetic LocationData, 36 states
+- seed_geometry(rows): GeometryData with distinct input hashes
+- seed_materials(rows): MaterialInput rows
+- seed_designs(rows): DesignSubmission rows over the seeded references
+"""
+
+import uuid
+from collections import namedtuple
+
+from .geometry import geometry_key, validate_geometry
+from .models import DesignSubmission, GeometryData, LocationData, MaterialInput
+
+BENCH_STATES = 36
+
+# path may contain any bench_context() key, e.g. {location_id} or {token}; data(i, context) gives
+# query parameters for GET and the JSON body for POST
+Route = namedtuple('Route', 'name method path data max_queries')
+
+
+def _no_data(i, context):
+    return {}
+
+
+def _state(i, context):
+    return {'state': context['state']}
+
+
+def _state_district(i, context):
+    return {'state': context['state'], 'district': context['district']}
+
+
+def _geometry(i, context):
+    return {
+        'carriageway_width': round(7.5 + (i % 100000) * 0.0001, 6),
+        'girder_spacing': 2.5,
+        'num_girders': 4 + i // 100000,
+        'deck_overhang_width': 2.5,
+        'sync': True,
+    }
+
+
+def _geometry_batch(i, context):
+    return {
+        'carriageway_width': [round(8.0 + (i * 100 + j) * 0.0001, 6) for j in range(100)],
+        'girder_spacing': [2.5] * 100,
+        'num_girders': [4] * 100,
+        'deck_overhang_width': [2.5] * 100,
+    }
+
+
+def _async_geometry(i, context):
+    # Different inputs from _geometry, so the async route cannot hit the memo
+    return {**_geometry(i, context), 'deck_overhang_width': 2.0}
+
+
+def _submission(i, context):
+    return {
+        'structure_type': 'Highway',
+        'location_id': context['location_id'],
+        'geometry_id': context['geometry_id'],
+        'materials': {'girder_steel': 'E350', 'cross_bracing_steel': 'E250', 'deck_concrete': 'M30'},
+        'sync': True,
+    }
+
+
+def _design_batch(i, context):
+    return [_submission(i, context) for _ in range(100)]
+
+
+def _loads(i, context):
+    return {
+        'state': context['state'],
+        'geometries': {
+            'carriageway_width': [4.25 + j * 0.25 for j in range(50)],
+            'girder_spacing': [2.5] * 50,
+            'num_girders': [4] * 50,
+            'deck_overhang_width': [1.0] * 50,
+        },
+    }
+
+
+def _sweep(i, context):
+    return {
+        'carriageway_width': [5.0, 15.0, 0.5],
+        'girder_spacing': [1.0, 4.0, 0.25],
+        'deck_overhang_width': [0.0, 2.0, 0.25],
+        'num_girders': [2, 10],
+    }
+
+
+ROUTES = [
+    Route('location-list', 'get', '/api/locations/', _no_data, 2),
+    Route('location-list-search', 'get', '/api/locations/', lambda i, c: {'state': c['state'], 'search': 'Bench District 1'}, 2),
+    Route('location-detail', 'get', '/api/locations/{location_id}/', _no_data, 1),
+    Route('location-by-state', 'get', '/api/locations/by_state/', _state, 2),
+    Route('location-by-district', 'get', '/api/locations/by_district/', _state_district, 2),
+    Route('location-index', 'get', '/api/locations/index/', _no_data, 2),
+    Route('location-nearest', 'get', '/api/locations/nearest/', lambda i, c: {'lat': 19.07, 'lon': 72.88, 'k': 10}, 2),
+    Route('location-search', 'get', '/api/locations/search/', lambda i, c: {'q': 'Bench Distrct 1'}, 2),
+    Route('location-export', 'get', '/api/locations/export/', _state, 1),
+    Route('geometry-validate', 'post', '/api/geometry/validate/', _geometry, 4),
+    Route('geometry-validate-batch', 'post', '/api/geometry/validate/batch/', _geometry_batch, 4),
+    Route('geometry-solve', 'get', '/api/geometry/solve/', lambda i, c: {'carriageway_width': 7.5}, 0),
+    Route('geometry-sweep', 'post', '/api/geometry/sweep/', _sweep, 0),
+    Route('design-loads', 'post', '/api/loads/', _loads, 1),
+    Route('materials', 'get', '/api/materials/', _no_data, 0),
+    Route('submit', 'post', '/api/submit/', _submission, 6),
+    Route('design-list', 'get', '/api/designs/', lambda i, c: {'page_size': 1000}, 1),
+    Route('design-detail', 'get', '/api/designs/{design_id}/', _no_data, 1),
+    Route('design-load-detail', 'get', '/api/designs/{design_id}/loads/', _no_data, 1),
+    Route('design-bulk', 'post', '/api/designs/bulk/', _design_batch, 6),
+    Route('health', 'get', '/api/health/', _no_data, 0),
+    Route('write-status', 'get', '/api/writes/{token}/', _no_data, 0),
+    Route('async-location-by-state', 'get', '/api/async/locations/by_state/', _state, 2),
+    Route('async-location-by-district', 'get', '/api/async/locations/by_district/', _state_district, 2),
+    Route('async-materials', 'get', '/api/async/materials/', _no_data, 0),
+    Route('async-geometry-validate', 'post', '/api/async/geometry/validate/', _async_geometry, 2),
+    Route('async-submit', 'post', '/api/async/submit/', _submission, 6),
+]
+
+
+class QueryCounter:
+    """Execute wrapper counting queries (unlike CaptureQueriesContext, not capped by the DEBUG log)."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def seed_locations(rows, batch_size=5000):
+    LocationData.objects.bulk_create(
+        (
+            LocationData(
+                state=f'Bench State {i % BENCH_STATES}',
+                district=f'Bench District {i}',
+                basic_wind_speed=33 + i % 18,
+                seismic_zone=('II', 'III', 'IV', 'V')[i % 4],
+                seismic_factor=(0.10, 0.16, 0.24, 0.36)[i % 4],
+                temperature_max=35 + i % 15,
+                temperature_min=i % 20,
+                latitude=round(8 + (i * 7919 % 2900) / 100, 2),
+                longitude=round(68 + (i * 104729 % 2900) / 100, 2),
+            )
+            for i in range(rows)
+        ),
+        batch_size=batch_size,
+    )
+
+
+def seed_geometry(rows, batch_size=5000):
+    """GeometryData spread over the carriageway range (distinct from _geometry inputs)."""
+    geometries = []
+    for i in range(rows):
+        carriageway_width = round(4.25 + (i % 19000) * 0.001, 6)
+        girder_spacing = 1.0 + (i // 19000) % 40 * 0.1
+        num_girders = 2 + i % 9
+        is_valid, overall_width, _ = validate_geometry(carriageway_width, girder_spacing, num_girders, 1.0)
+        geometries.append(GeometryData(
+            carriageway_width=carriageway_width,
+            girder_spacing=girder_spacing,
+            num_girders=num_girders,
+            deck_overhang_width=1.0,
+            overall_width=overall_width,
+            valid=is_valid,
+            input_hash=geometry_key(carriageway_width, girder_spacing, num_girders, 1.0),
+        ))
+    GeometryData.objects.bulk_create(geometries, batch_size=batch_size, ignore_conflicts=True)
+
+
+def seed_materials(rows, batch_size=5000):
+    steels = ('E250', 'E350', 'E450')
+    concretes = ('M25', 'M30', 'M35', 'M40', 'M45', 'M50', 'M55', 'M60')
+    MaterialInput.objects.bulk_create(
+        (
+            MaterialInput(
+                girder_steel=steels[i % 3],
+                cross_bracing_steel=steels[(i // 3) % 3],
+                deck_concrete=concretes[i % 8],
+            )
+            for i in range(rows)
+        ),
+        batch_size=batch_size,
+    )
+
+
+def seed_designs(rows, batch_size=5000):
+    """DesignSubmission rows referencing the seeded locations, geometries and materials."""
+    location_ids = list(LocationData.objects.values_list('id', flat=True)[:1000])
+    geometry_ids = list(GeometryData.objects.values_list('id', flat=True)[:1000])
+    material_ids = list(MaterialInput.objects.values_list('id', flat=True)[:rows])
+    DesignSubmission.objects.bulk_create(
+        (
+            DesignSubmission(
+                structure_type='Highway',
+                location_id=location_ids[i % len(location_ids)] if location_ids else None,
+                geometry_id=geometry_ids[i % len(geometry_ids)] if geometry_ids else None,
+                materials_id=material_id,
+            )
+            for i, material_id in enumerate(material_ids)
+        ),
+        batch_size=batch_size,
+    )
+
+
+def bench_context():
+    """Values substituted into route paths and payloads, taken from the seeded data."""
+    location = LocationData.objects.filter(state=f'Bench State {1 % BENCH_STATES}').values(
+        'id', 'state', 'district'
+    ).first()
+    return {
+        'location_id': location['id'],
+        'geometry_id': GeometryData.objects.values_list('id', flat=True).first(),
+        'design_id': DesignSubmission.objects.values_list('id', flat=True).first(),
+        'state': location['state'],
+        'district': location['district'],
+        'token': uuid.uuid4().hex,
+    }
+
+
+def route_request(client, route, i, context):
+    """Send one request for route with the test client and return the response."""
+    path = route.path.format(**context)
+    data = route.data(i, context)
+    if route.method == 'post':
+        response = client.post(path, data, content_type='application/json')
+    else:
+        response = client.get(path, data)
+    if response.streaming:
+        # Streamed rows are queried while the body is consumed
+        response.content_length = sum(len(chunk) for chunk in response.streaming_content)
+    return response
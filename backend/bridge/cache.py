@@ -0,0 +1,468 @@
+"""
+Read-through cache for LocationData reference data.
+
+LocationData is near-static (loaded by seed_locations), so the by_state and
+by_district endpoints are served from memory instead of SQLite:
+
+- Rows are loaded per state, lazily, the first time that state is requested
+- Lookups by (state, district) and per-state district lists never touch the
+  database once the state is loaded; only states with rows are kept, so
+  requests for made-up states cannot grow the cache
+- post_save/post_delete signals on LocationData call invalidate() (see signals.py)
+- check() drops the local state when the table version (one aggregate over
+  id and updated_at, see snapshot.table_version) or the shared generation
+  changed since the last check; location_watcher runs it every
+  LOCATION_CHECK_INTERVAL seconds in the server, so rows changed by another
+  process (import_locations, another worker) are picked up
+- index() is the compact {state: [districts]} tree for dropdowns
+- version() is the table version, used as the ETag of location responses
+- aget_location, aget_state_locations and aversion are the async counterparts
+  for the ASGI views, loading misses with the async ORM
+
+An optional Django cache backend can be used as a shared second tier, so a
+fresh worker process warms from the cache instead of the database. Set
+LOCATION_CACHE_ALIAS in settings to a key of CACHES to enable it.
+
+With LOCATION_SNAPSHOT_PATH set, location_snapshot keeps the table in a
+memory-mapped columnar file (see snapshot.py) shared by every worker
+process. Lookups, the index and the version are then read from the file
+instead of the database or per-process copies. invalidate() stops using
+the file in this process and schedules a rebuild; every process adopts
+the rebuilt file (and bumps generation) within
+LOCATION_SNAPSHOT_CHECK_INTERVAL seconds.
+
+ValidationMemo is a bounded LRU of geometry validation results keyed by
+GeometryData.input_hash (GEOMETRY_MEMO_SIZE entries), cleared when geometry
+retention deletes rows in any process.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections, transaction
+
+from .models import LocationData
+from .retention import TOUCH_INTERVAL, deletion_stamp
+from .snapshot import SnapshotStore, atable_version, table_version
+
+logger = logging.getLogger(__name__)
+
+LOCATION_FIELDS = (
+    'id',
+    'state',
+    'district',
+    'basic_wind_speed',
+    'seismic_zone',
+    'seismic_factor',
+    'temperature_max',
+    'temperature_min',
+    'latitude',
+    'longitude',
+)
+
+location_snapshot = SnapshotStore(
+    LocationData.objects.all(),
+    LOCATION_FIELDS,
+    order=('state', 'district'),
+    path_setting='LOCATION_SNAPSHOT_PATH',
+    check_interval=getattr(settings, 'LOCATION_SNAPSHOT_CHECK_INTERVAL', 1.0),
+)
+
+
+class LocationCache:
+    """In-memory map of state -> {district: row}, built lazily per state."""
+
+    key_prefix = 'bridge:locations'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states = {}
+        self._index = None
+        self._version = None
+        self._generation = 0
+        # (table version, shared generation) at the last check()
+        self._stamp = None
+        # Snapshot the local state was derived from, and one invalidate() made stale
+        self._snapshot = None
+        self._stale_snapshot = None
+        self.hits = 0
+        self.misses = 0
+
+    def snapshot(self):
+        """
+        Return the current location snapshot, or None to use the database.
+
+        Adopting a new snapshot file clears the per-process state and bumps
+        generation, so structures derived from the table are rebuilt.
+        """
+        snapshot = location_snapshot.current()
+        if snapshot is None or snapshot is self._stale_snapshot:
+            return None
+        if snapshot is not self._snapshot:
+            with self._lock:
+                if snapshot is not self._snapshot:
+                    self._reset()
+                    self._snapshot = snapshot
+        return snapshot
+
+    def _shared(self):
+        alias = getattr(settings, 'LOCATION_CACHE_ALIAS', None)
+        return caches[alias] if alias else None
+
+    def _shared_key(self, shared, state):
+        generation = shared.get_or_set(f'{self.key_prefix}:generation', 0, None)
+        digest = hashlib.sha1(state.encode('utf-8')).hexdigest()
+        return f'{self.key_prefix}:{generation}:{digest}'
+
+    def _load_state(self, state):
+        """Fetch the rows of one state, from the shared cache or the database."""
+        shared = self._shared()
+        if shared is not None:
+            key = self._shared_key(shared, state)
+            rows = shared.get(key)
+            if rows is not None:
+                return rows
+
+        rows = {
+            row['district']: row
+            for row in LocationData.objects.filter(state=state)
+            .order_by('district')
+            .values(*LOCATION_FIELDS)
+        }
+
+        if shared is not None and rows:
+            shared.set(key, rows, None)
+        return rows
+
+    def _get_state(self, state):
+        rows = self._states.get(state)
+        if rows is not None:
+            self.hits += 1
+            return rows
+
+        self.misses += 1
+        generation = self._generation
+        rows = self._load_state(state)
+        with self._lock:
+            # Drop the result if an invalidation happened while loading
+            if rows and generation == self._generation:
+                self._states[state] = rows
+        return rows
+
+    def get_location(self, state, district):
+        """Return the row for (state, district), or None if it does not exist."""
+        snapshot = self.snapshot()
+        if snapshot is not None:
+            self.hits += 1
+            return snapshot.find(state, district)
+        return self._get_state(state).get(district)
+
+    def get_state_locations(self, state):
+        """Return the rows of a state ordered by district."""
+        snapshot = self.snapshot()
+        if snapshot is not None:
+            self.hits += 1
+            return snapshot.rows(*snapshot.partition(state))
+        return list(self._get_state(state).values())
+
+    def index(self):
+        """Return {state: [districts...]} for every state, built with one query."""
+        snapshot = self.snapshot()
+        if self._index is not None:
+            self.hits += 1
+            return self._index
+
+        self.misses += 1
+        generation = self._generation
+        index = {}
+        if snapshot is not None:
+            for state in snapshot.partitions():
+                index[state] = snapshot.values('district', *snapshot.partition(state))
+        else:
+            rows = LocationData.objects.order_by('state', 'district').values_list('state', 'district')
+            for state, district in rows.iterator(chunk_size=2000):
+                index.setdefault(state, []).append(district)
+        with self._lock:
+            if generation == self._generation:
+                self._index = index
+        return index
+
+    def version(self):
+        """Return the table version (bridge.snapshot.table_version), computed once per generation."""
+        snapshot = self.snapshot()
+        if snapshot is not None:
+            return snapshot.version
+        if self._version is not None:
+            return self._version
+
+        generation = self._generation
+        version = table_version(LocationData.objects.all())
+        with self._lock:
+            if generation == self._generation:
+                self._version = version
+        return version
+
+    async def _aload_state(self, state):
+        if self._shared() is not None:
+            return await sync_to_async(self._load_state)(state)
+        queryset = LocationData.objects.filter(state=state).order_by('district').values(*LOCATION_FIELDS)
+        return {row['district']: row async for row in queryset}
+
+    async def _aget_state(self, state):
+        rows = self._states.get(state)
+        if rows is not None:
+            self.hits += 1
+            return rows
+
+        self.misses += 1
+        generation = self._generation
+        rows = await self._aload_state(state)
+        with self._lock:
+            if rows and generation == self._generation:
+                self._states[state] = rows
+        return rows
+
+    async def aget_location(self, state, district):
+        snapshot = self.snapshot()
+        if snapshot is not None:
+            self.hits += 1
+            return snapshot.find(state, district)
+        return (await self._aget_state(state)).get(district)
+
+    async def aget_state_locations(self, state):
+        snapshot = self.snapshot()
+        if snapshot is not None:
+            self.hits += 1
+            return snapshot.rows(*snapshot.partition(state))
+        return list((await self._aget_state(state)).values())
+
+    async def aversion(self):
+        snapshot = self.snapshot()
+        if snapshot is not None:
+            return snapshot.version
+        if self._version is not None:
+            return self._version
+
+        generation = self._generation
+        version = await atable_version(LocationData.objects.all())
+        with self._lock:
+            if generation == self._generation:
+                self._version = version
+        return version
+
+    @property
+    def generation(self):
+        """Counter bumped by invalidate() or a new snapshot, for structures derived from the table."""
+        self.snapshot()
+        return self._generation
+
+    def _reset(self):
+        self._generation += 1
+        self._states = {}
+        self._index = None
+        self._version = None
+
+    def invalidate(self):
+        """Forget every cached state, locally and in the shared cache, and rebuild the snapshot."""
+        with self._lock:
+            self._reset()
+            # The file predates this change; use the database until it is rebuilt
+            self._stale_snapshot = location_snapshot.current()
+            self._snapshot = None
+            # Our own change; the next check() takes a new baseline
+            self._stamp = None
+        # Rebuild from committed rows only
+        transaction.on_commit(location_snapshot.schedule_rebuild)
+
+        shared = self._shared()
+        if shared is not None:
+            key = f'{self.key_prefix}:generation'
+            try:
+                shared.incr(key)
+            except ValueError:
+                shared.set(key, 1, None)
+
+    def check(self):
+        """
+        Forget the local state if the table changed elsewhere; return True if it did.
+
+        Compares the table version and the shared-cache generation with the
+        previous check (one aggregate query), so rows changed by another
+        process (import_locations, another worker) are picked up.
+        location_watcher calls this every LOCATION_CHECK_INTERVAL seconds.
+        """
+        shared = self._shared()
+        stamp = (
+            table_version(LocationData.objects.all()),
+            shared.get(f'{self.key_prefix}:generation') if shared is not None else None,
+        )
+        with self._lock:
+            changed = self._stamp is not None and stamp != self._stamp
+            if changed:
+                self._reset()
+            self._stamp = stamp
+        return changed
+
+    def stats(self):
+        """Return hit/miss counters and the number of loaded states."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'states_loaded': len(self._states),
+            'snapshot': location_snapshot.stats(),
+        }
+
+
+location_cache = LocationCache()
+
+
+class LocationWatcher:
+    """Background thread running location_cache.check() every LOCATION_CHECK_INTERVAL seconds."""
+
+    def __init__(self, cache):
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.changes = 0
+        self.failed = 0
+
+    def start(self):
+        """Take the first stamp and start the thread (idempotent)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self.check()
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name='bridge-location-watch', daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def check(self):
+        try:
+            if self.cache.check():
+                self.changes += 1
+                logger.info('LocationData changed in another process; cached locations dropped')
+        except Exception:
+            self.failed += 1
+            logger.exception('Location change check failed')
+        finally:
+            connections.close_all()
+
+    def _run(self):
+        while not self._stop.wait(getattr(settings, 'LOCATION_CHECK_INTERVAL', 5.0)):
+            self.check()
+
+
+location_watcher = LocationWatcher(location_cache)
+
+
+class ValidationMemo:
+    """
+    Bounded LRU map of geometry input hash -> validation response.
+
+    Results carry the id of a stored GeometryData row, which retention in
+    another process may delete: the memo clears itself when the deletion
+    stamp (retention.deletion_stamp()) changes, re-stating it at most every
+    check_interval seconds. touch_due() throttles touch_geometry() per key.
+    """
+
+    def __init__(self, maxsize=None, check_interval=1.0):
+        self._maxsize = maxsize
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        # key -> time.monotonic() of the last touch of its row
+        self._touched = {}
+        self._checked_at = float('-inf')
+        self._stamp = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self):
+        return self._maxsize or getattr(settings, 'GEOMETRY_MEMO_SIZE', 4096)
+
+    def _check_stamp(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        path = deletion_stamp()
+        try:
+            stamp = os.stat(path).st_mtime_ns if path else None
+        except FileNotFoundError:
+            stamp = None
+        with self._lock:
+            if stamp != self._stamp:
+                self._entries.clear()
+                self._touched.clear()
+                self._stamp = stamp
+            self._checked_at = now
+
+    def get(self, key):
+        """Return the memoized result for key (most recently used), or None."""
+        self._check_stamp()
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key, result):
+        """Memoize result; its row counts as touched now (it was just stored or read)."""
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            self._touched.setdefault(key, time.monotonic())
+            while len(self._entries) > self.maxsize:
+                evicted, _ = self._entries.popitem(last=False)
+                self._touched.pop(evicted, None)
+
+    def touch_due(self, key):
+        """Return True, once per TOUCH_INTERVAL, when key's row should be touched again."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._touched.get(key, now) < TOUCH_INTERVAL.total_seconds():
+                return False
+            self._touched[key] = now
+            return True
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._touched.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._touched.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'size': len(self._entries),
+        }
+
+
+validation_memo = ValidationMemo()
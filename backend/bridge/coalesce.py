@@ -0,0 +1,249 @@
+"""
+Single-flight coalescing of identical concurrent reads.
+
+When many clients request the same reference data at the same moment
+(e.g. every screen loading /api/materials/ at shift start), the first
+request (the leader) runs the view and the ones arriving while it is in
+flight wait for it and receive a copy of its rendered response, sharing
+the encoded bytes instead of repeating the queries and serialization.
+Nothing is kept once the leader finishes; this is not a cache.
+
+Requests are identical when their view, scheme, host, full path (with
+query string), Accept and If-None-Match headers are; scheme and host are
+part of the absolute "next"/"previous" links in responses. Streaming responses are never
+shared: waiting requests then run the view themselves. A waiter gives up
+after COALESCE_WAIT_TIMEOUT seconds and runs the view itself too.
+
+- SharedResponse: Status, headers and body of a rendered response, replayed
+  as a new HttpResponse for each waiter
+- SingleFlight: do(key, fn) for threads (WSGI, and sync views under ASGI)
+  and ado(key, factory) for coroutines (async views)
+- CoalescingMixin: APIView mixin coalescing GET requests to coalesced_actions
+- coalesced: Decorator for async function views
+- coalescer: The process-wide SingleFlight, with per-view counters
+
+Settings:
+- COALESCE_ENABLED: Coalesce requests at all
+- COALESCE_WAIT_TIMEOUT: Seconds a waiter waits for the leader
+"""
+
+import asyncio
+import functools
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse
+
+
+class SharedResponse:
+    """Immutable copy of a rendered, non-streaming response."""
+
+    __slots__ = ('status', 'headers', 'content')
+
+    def __init__(self, response):
+        self.status = response.status_code
+        self.headers = tuple(response.items())
+        self.content = response.content
+
+    @classmethod
+    def freeze(cls, response):
+        """Render response if needed and copy it, or return None for streaming responses."""
+        if response.streaming:
+            return None
+        if hasattr(response, 'render'):
+            response.render()
+        return cls(response)
+
+    def replay(self):
+        # The body bytes object is shared, not copied
+        response = HttpResponse(self.content, status=self.status)
+        for name, value in self.headers:
+            response[name] = value
+        return response
+
+
+def request_key(request, view):
+    meta = request.META
+    return (
+        view,
+        request.scheme,
+        request.get_host(),
+        request.get_full_path(),
+        meta.get('HTTP_ACCEPT', ''),
+        meta.get('HTTP_IF_NONE_MATCH', ''),
+    )
+
+
+def _enabled():
+    return getattr(settings, 'COALESCE_ENABLED', True)
+
+
+def _timeout():
+    return getattr(settings, 'COALESCE_WAIT_TIMEOUT', 10.0)
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """At most one in-flight computation per key; concurrent callers share its result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._tasks = {}
+        # label -> [leaders, coalesced, timeouts]
+        self._counts = {}
+
+    def _count(self, label, index):
+        with self._lock:
+            counts = self._counts.setdefault(label, [0, 0, 0])
+            counts[index] += 1
+
+    def do(self, key, fn, label=None):
+        """
+        Return (fn() result, True) as the leader or (the leader's result, False).
+
+        The leader's exception is raised in every waiter. A waiter that
+        times out calls fn() itself and is reported as a leader.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if call.done.wait(_timeout()):
+                self._count(label, 1)
+                if call.error is not None:
+                    raise call.error
+                return call.result, False
+            self._count(label, 2)
+            return fn(), True
+
+        self._count(label, 0)
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, True
+
+    async def ado(self, key, factory, label=None):
+        """
+        Async counterpart of do(): factory() returns the coroutine to share.
+
+        The coroutine runs as its own task, so a leader whose client
+        disconnects does not cancel it for the waiters.
+        """
+        loop = asyncio.get_running_loop()
+        # Tasks belong to one event loop
+        key = (id(loop), key)
+        with self._lock:
+            task = self._tasks.get(key)
+            leader = task is None
+            if leader:
+                task = self._tasks[key] = loop.create_task(factory())
+                task.add_done_callback(lambda _: self._forget(key))
+
+        if leader:
+            self._count(label, 0)
+            return await asyncio.shield(task), True
+        try:
+            result = await asyncio.wait_for(asyncio.shield(task), _timeout())
+        except asyncio.TimeoutError:
+            self._count(label, 2)
+            return await factory(), True
+        self._count(label, 1)
+        return result, False
+
+    def _forget(self, key):
+        with self._lock:
+            self._tasks.pop(key, None)
+
+    def in_flight(self):
+        return len(self._calls) + len(self._tasks)
+
+    def stats(self):
+        """{label: {"leaders", "coalesced", "timeouts"}}"""
+        with self._lock:
+            return {
+                label: {'leaders': counts[0], 'coalesced': counts[1], 'timeouts': counts[2]}
+                for label, counts in self._counts.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+coalescer = SingleFlight()
+
+
+class CoalescingMixin:
+    """
+    Coalesce concurrent identical GET requests to an APIView or ViewSet.
+
+    coalesced_actions lists the ViewSet actions to coalesce; APIViews
+    (no action) coalesce every GET. The leader's response is rendered in
+    dispatch so waiters can replay its bytes.
+    """
+    coalesced_actions = None
+
+    def dispatch(self, request, *args, **kwargs):
+        # DRF sets self.action in initialize_request, after this point
+        action_map = getattr(self, 'action_map', None)
+        action = action_map.get(request.method.lower()) if action_map else None
+        if (
+            request.method != 'GET'
+            or not _enabled()
+            or (self.coalesced_actions is not None and action not in self.coalesced_actions)
+        ):
+            return super().dispatch(request, *args, **kwargs)
+
+        label = f'{type(self).__name__}.{action}' if action else type(self).__name__
+
+        def lead():
+            response = super(CoalescingMixin, self).dispatch(request, *args, **kwargs)
+            return response, SharedResponse.freeze(response)
+
+        (response, shared), leader = coalescer.do(request_key(request, label), lead, label)
+        if leader:
+            return response
+        if shared is None:
+            return super().dispatch(request, *args, **kwargs)
+        return shared.replay()
+
+
+def coalesced(view):
+    """Coalesce concurrent identical GET requests to an async function view."""
+    label = view.__name__
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET' or not _enabled():
+            return await view(request, *args, **kwargs)
+
+        async def lead():
+            response = await view(request, *args, **kwargs)
+            return response, SharedResponse.freeze(response)
+
+        (response, shared), leader = await coalescer.ado(request_key(request, label), lead, label)
+        if leader:
+            return response
+        if shared is None:
+            return await view(request, *args, **kwargs)
+        return shared.replay()
+
+    return wrapper
@@ -0,0 +1,146 @@
+"""
+Content-encoding negotiation and compressors for CompressionMiddleware.
+
+Encodings, in server preference order: zstd (needs the zstandard
+package), br (needs brotli) and gzip (standard library). Optional ones
+whose package is missing are never offered.
+
+Each encoder compresses a whole body with compress(data), or a stream
+with stream(), whose compress(chunk) returns everything decodable so far
+(each chunk is flushed, so clients can process a streamed export as it
+arrives) and whose finish() ends the stream.
+
+- parse_accept_encoding(header): {coding: q} from an Accept-Encoding header
+- negotiate(header): The preferred available coding the client accepts, or None
+- is_compressible(content_type): Text-like media types worth compressing
+"""
+
+import zlib
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard is optional
+    zstandard = None
+
+# Levels favour speed: responses are compressed on every request
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+ZSTD_LEVEL = 3
+
+COMPRESSIBLE_TYPES = (
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'application/xml',
+)
+
+
+class _GzipStream:
+    def __init__(self):
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, chunk):
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, chunk):
+        return self._compressor.process(chunk) + self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class _ZstdStream:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def compress(self, chunk):
+        return self._compressor.compress(chunk) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class Encoder:
+    def __init__(self, name, compress, stream):
+        self.name = name
+        self.compress = compress
+        self.stream = stream
+
+
+ENCODERS = {}
+if zstandard is not None:
+    ENCODERS['zstd'] = Encoder('zstd', zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress, _ZstdStream)
+if brotli is not None:
+    ENCODERS['br'] = Encoder('br', lambda data: brotli.compress(data, quality=BROTLI_QUALITY), _BrotliStream)
+ENCODERS['gzip'] = Encoder(
+    'gzip', lambda data: zlib.compress(data, GZIP_LEVEL, wbits=31), _GzipStream
+)
+
+PREFERENCE = ('zstd', 'br', 'gzip')
+
+
+def parse_accept_encoding(header):
+    """Return {coding: q} for an Accept-Encoding header (codings lower-cased)."""
+    accepted = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def negotiate(header, available=None):
+    """
+    Choose the response encoding for an Accept-Encoding header.
+
+    Highest q wins, ties go to PREFERENCE order; "*" covers codings not
+    listed and q=0 refuses a coding. Returns None for no compression.
+    """
+    if not header:
+        return None
+    available = ENCODERS if available is None else available
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get('*', 0.0)
+    best = None
+    best_q = 0.0
+    for name in PREFERENCE:
+        if name not in available:
+            continue
+        q = accepted.get(name, accepted.get('x-gzip') if name == 'gzip' else None)
+        if q is None:
+            q = wildcard
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def is_compressible(content_type):
+    media_type = (content_type or '').split(';')[0].strip().lower()
+    return (
+        media_type.startswith('text/')
+        or media_type in COMPRESSIBLE_TYPES
+        or media_type.endswith('+json')
+    )
@@ -0,0 +1,59 @@
+"""
+Conditional GET helpers for reference-data endpoints.
+
+Reference responses carry an ETag derived from a content version (see
+LocationCache.version and MaterialRegistry.version) plus a Cache-Control
+header. A request whose If-None-Match matches gets a bodyless 304 before
+any query or serialization runs.
+"""
+
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def reference_etag(request, version):
+    """Quoted ETag for a content version, varied by the negotiated renderer."""
+    renderer = getattr(request, 'accepted_renderer', None)
+    suffix = f'-{renderer.format}' if renderer is not None else ''
+    return quote_etag(f'{version}{suffix}')
+
+
+def etag_matches(request, etag):
+    """Return True if the request's If-None-Match header covers etag."""
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    # Compression middleware weakens ETags, so compare weak tags as strong
+    etags = [tag[2:] if tag.startswith('W/') else tag for tag in parse_etags(header)]
+    return '*' in etags or etag in etags
+
+
+def add_reference_headers(response, etag):
+    """Attach ETag and Cache-Control headers to a reference-data response."""
+    response['ETag'] = etag
+    patch_cache_control(
+        response,
+        public=True,
+        max_age=getattr(settings, 'REFERENCE_DATA_MAX_AGE', 3600),
+    )
+    return response
+
+
+def conditional_response(request, version, build):
+    """
+    Return a 304 if the client already holds this version, else build the response.
+
+    build is a zero-argument callable returning a Response; it is only
+    called when the client's copy is missing or stale.
+    """
+    etag = reference_etag(request, version)
+    if etag_matches(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = build()
+    if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+        add_reference_headers(response, etag)
+    return response
@@ -0,0 +1,150 @@
+"""
+Parsing and reference checks for design submissions.
+
+A design payload matches POST /api/submit/:
+{
+    "structure_type": "Highway",
+    "location_id": 1,
+    "geometry_id": 5,
+    "materials": {
+        "girder_steel": "E250",
+        "cross_bracing_steel": "E250",
+        "deck_concrete": "M25"
+    }
+}
+
+parse_design turns one payload into unsaved MaterialInput and
+DesignSubmission instances; parse_design_batch does the same for a list
+and collects every row's errors. missing_references then checks the
+referenced location/geometry ids with one query per id chunk, so a batch
+of any size costs a constant number of lookups (amissing_references is
+the async counterpart).
+"""
+
+from django.db import connection
+
+from .materials import material_registry
+from .models import DesignSubmission, GeometryData, LocationData, MaterialInput
+
+STRUCTURE_TYPES = {value for value, _ in DesignSubmission.STRUCTURE_CHOICES}
+
+MATERIAL_DEFAULTS = {
+    'girder_steel': 'E250',
+    'cross_bracing_steel': 'E250',
+    'deck_concrete': 'M25',
+}
+
+
+def _optional_id(data, field):
+    value = data.get(field)
+    if value is None or value == '':
+        return None
+    if isinstance(value, bool):
+        raise ValueError(f'{field} must be an integer')
+    try:
+        return int(value)
+    except (OverflowError, TypeError, ValueError):
+        raise ValueError(f'{field} must be an integer')
+
+
+def parse_design(data):
+    """
+    Return unsaved (MaterialInput, DesignSubmission) for a design payload.
+
+    Raises ValueError with a message when the payload is invalid, including
+    grades and structure types that are not strings.
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Design must be an object')
+
+    structure_type = data.get('structure_type', 'Highway')
+    if not isinstance(structure_type, str) or structure_type not in STRUCTURE_TYPES:
+        raise ValueError(f'structure_type must be one of {sorted(STRUCTURE_TYPES)}')
+
+    materials_data = data.get('materials') or {}
+    if not isinstance(materials_data, dict):
+        raise ValueError('materials must be an object')
+    grades = {field: materials_data.get(field, default) for field, default in MATERIAL_DEFAULTS.items()}
+    registry = material_registry()
+    for field in ('girder_steel', 'cross_bracing_steel'):
+        if not isinstance(grades[field], str) or grades[field] not in registry.steel:
+            raise ValueError(f'{field} must be one of {list(registry.steel)}')
+    if not isinstance(grades['deck_concrete'], str) or grades['deck_concrete'] not in registry.concrete:
+        raise ValueError(f'deck_concrete must be one of {list(registry.concrete)}')
+
+    material = MaterialInput(**grades)
+    design = DesignSubmission(
+        structure_type=structure_type,
+        location_id=_optional_id(data, 'location_id'),
+        geometry_id=_optional_id(data, 'geometry_id'),
+        materials=material
+    )
+    return material, design
+
+
+def parse_design_batch(data, max_rows=None):
+    """
+    Parse a list of design payloads (optionally wrapped as {"designs": [...]}).
+
+    Returns a list of (MaterialInput, DesignSubmission) pairs. Raises
+    ValueError with a list of messages, one per invalid row.
+    """
+    if isinstance(data, dict) and 'designs' in data:
+        data = data['designs']
+    if not isinstance(data, list):
+        raise ValueError(['Payload must be a list of designs'])
+    if not data:
+        raise ValueError(['At least one design is required'])
+    if max_rows is not None and len(data) > max_rows:
+        raise ValueError([f'Batch size {len(data)} exceeds the limit of {max_rows}'])
+
+    pairs = []
+    errors = []
+    for index, row in enumerate(data):
+        try:
+            pairs.append(parse_design(row))
+        except ValueError as e:
+            errors.append(f'Row {index}: {e}')
+            if len(errors) == 20:
+                break
+    if errors:
+        raise ValueError(errors)
+    return pairs
+
+
+def _existing_ids(model, ids):
+    ids = sorted(ids)
+    chunk = connection.features.max_query_params or len(ids) or 1
+    found = set()
+    for start in range(0, len(ids), chunk):
+        found.update(
+            model.objects.filter(pk__in=ids[start:start + chunk]).values_list('pk', flat=True)
+        )
+    return found
+
+
+def missing_references(designs):
+    """Return error messages for location/geometry ids that do not exist."""
+    errors = []
+    for model, field in ((LocationData, 'location_id'), (GeometryData, 'geometry_id')):
+        ids = {getattr(design, field) for design in designs} - {None}
+        if not ids:
+            continue
+        missing = sorted(ids - _existing_ids(model, ids))
+        if missing:
+            errors.append(f'Unknown {field}: {missing[:20]}')
+    return errors
+
+
+async def amissing_references(designs):
+    """Async counterpart of missing_references, for the ASGI views."""
+    errors = []
+    for model, field in ((LocationData, 'location_id'), (GeometryData, 'geometry_id')):
+        ids = {getattr(design, field) for design in designs} - {None}
+        if not ids:
+            continue
+        found = {pk async for pk in model.objects.filter(pk__in=sorted(ids)).values_list('pk', flat=True)}
+        missing = sorted(ids - found)
+        if missing:
+            errors.append(f'Unknown {field}: {missing[:20]}')
+    return errors
@@ -0,0 +1,308 @@
+"""
+Geometry validation rules for OSDAG Bridge Module.
+
+Rules:
+- overall_width = carriageway_width + 5
+- girder_spacing < overall_width
+- deck_overhang_width < overall_width
+- (overall_width - deck_overhang_width) / girder_spacing = num_girders (±0.01)
+
+The same rules are provided in two forms:
+- validate_geometry: a single geometry, used by GeometryValidationView
+- validate_geometry_batch: NumPy arrays of geometries, used by the batch endpoint
+
+geometry_key is the content hash of a normalized input tuple; it is stored
+in GeometryData.input_hash so identical inputs share one row.
+
+solve_geometry enumerates every feasible layout for a carriageway width.
+"""
+
+import hashlib
+
+import numpy as np
+
+OVERALL_WIDTH_ALLOWANCE = 5
+GIRDER_COUNT_TOLERANCE = 0.01
+
+# Software range of the carriageway width (frontend/src/utils/validation.js)
+CARRIAGEWAY_WIDTH_MIN = 4.25
+CARRIAGEWAY_WIDTH_MAX = 24
+
+# Largest |num_girders| accepted in a batch (IntegerField range)
+NUM_GIRDERS_LIMIT = 2**31 - 1
+
+# Row errors reported for a rejected batch
+MAX_ROW_ERRORS = 20
+
+GEOMETRY_FIELDS = (
+    'carriageway_width',
+    'girder_spacing',
+    'num_girders',
+    'deck_overhang_width',
+)
+
+
+def geometry_key(carriageway_width, girder_spacing, num_girders, deck_overhang_width):
+    """SHA-256 of the input tuple, normalized to 6 decimal places (mm/1000)."""
+    normalized = '|'.join((
+        f'{float(carriageway_width) + 0.0:.6f}',
+        f'{float(girder_spacing) + 0.0:.6f}',
+        f'{int(num_girders):d}',
+        f'{float(deck_overhang_width) + 0.0:.6f}',
+    ))
+    return hashlib.sha256(normalized.encode('ascii')).hexdigest()
+
+
+def spacing_error(girder_spacing, overall_width):
+    return f"Girder spacing ({girder_spacing}) must be < overall width ({overall_width})"
+
+
+def overhang_error(deck_overhang_width, overall_width):
+    return f"Deck overhang ({deck_overhang_width}) must be < overall width ({overall_width})"
+
+
+def mismatch_error(calculated_girders, num_girders):
+    return f"Geometry mismatch: Expected {calculated_girders:.2f} girders, got {num_girders}"
+
+
+def validate_geometry(carriageway_width, girder_spacing, num_girders, deck_overhang_width):
+    """
+    Validate a single geometry.
+
+    Returns a tuple of (valid, overall_width, errors).
+    """
+    overall_width = carriageway_width + OVERALL_WIDTH_ALLOWANCE
+    errors = []
+
+    if girder_spacing >= overall_width:
+        errors.append(spacing_error(girder_spacing, overall_width))
+
+    if deck_overhang_width >= overall_width:
+        errors.append(overhang_error(deck_overhang_width, overall_width))
+
+    # Validate formula: (overall_width - overhang) / spacing = num_girders
+    if girder_spacing > 0:
+        calculated_girders = (overall_width - deck_overhang_width) / girder_spacing
+        if abs(calculated_girders - num_girders) > GIRDER_COUNT_TOLERANCE:
+            errors.append(mismatch_error(calculated_girders, num_girders))
+
+    return len(errors) == 0, overall_width, errors
+
+
+def validate_geometry_batch(carriageway_width, girder_spacing, num_girders, deck_overhang_width):
+    """
+    Validate arrays of geometries with vectorized NumPy operations.
+
+    Arguments are arrays that broadcast together (1-D arrays of equal length,
+    or axes shaped for an outer grid). Returns a dict of arrays:
+    - overall_width: carriageway_width + 5
+    - calculated_girders: (overall_width - overhang) / spacing, NaN where spacing <= 0
+    - spacing_failed, overhang_failed, mismatch_failed: per-rule failure masks
+    - valid: rows that pass every rule
+    """
+    carriageway_width, girder_spacing, num_girders, deck_overhang_width = np.broadcast_arrays(
+        np.asarray(carriageway_width, dtype=np.float64),
+        np.asarray(girder_spacing, dtype=np.float64),
+        np.asarray(num_girders),
+        np.asarray(deck_overhang_width, dtype=np.float64),
+    )
+
+    overall_width = carriageway_width + OVERALL_WIDTH_ALLOWANCE
+
+    spacing_failed = girder_spacing >= overall_width
+    overhang_failed = deck_overhang_width >= overall_width
+
+    positive_spacing = girder_spacing > 0
+    calculated_girders = np.divide(
+        overall_width - deck_overhang_width,
+        girder_spacing,
+        out=np.full(overall_width.shape, np.nan),
+        where=positive_spacing,
+    )
+    mismatch_failed = positive_spacing & (
+        np.abs(calculated_girders - num_girders) > GIRDER_COUNT_TOLERANCE
+    )
+
+    return {
+        'overall_width': overall_width,
+        'calculated_girders': calculated_girders,
+        'spacing_failed': spacing_failed,
+        'overhang_failed': overhang_failed,
+        'mismatch_failed': mismatch_failed,
+        'valid': ~(spacing_failed | overhang_failed | mismatch_failed),
+    }
+
+
+def batch_errors(result, index, girder_spacing, num_girders, deck_overhang_width):
+    """Build the error messages for one row of a validate_geometry_batch result."""
+    overall_width = float(result['overall_width'][index])
+    errors = []
+    if result['spacing_failed'][index]:
+        errors.append(spacing_error(girder_spacing, overall_width))
+    if result['overhang_failed'][index]:
+        errors.append(overhang_error(deck_overhang_width, overall_width))
+    if result['mismatch_failed'][index]:
+        errors.append(mismatch_error(float(result['calculated_girders'][index]), num_girders))
+    return errors
+
+
+def parse_geometry_batch(data, max_rows=None):
+    """
+    Convert a batch payload into NumPy columns.
+
+    Accepts either a list of geometry objects (optionally wrapped as
+    {"geometries": [...]}) or a columnar object of equal-length lists:
+    {"carriageway_width": [...], "girder_spacing": [...], ...}
+
+    Returns a dict of arrays keyed by GEOMETRY_FIELDS. Raises ValueError
+    with a list of messages when the payload cannot be evaluated; bad
+    values (anything but a finite real number or numeric string, and
+    num_girders that is fractional or out of range) get one message per
+    row and field.
+    """
+    if isinstance(data, dict) and 'geometries' in data:
+        data = data['geometries']
+
+    if isinstance(data, list):
+        columns = {
+            field: [row.get(field) if isinstance(row, dict) else None for row in data]
+            for field in GEOMETRY_FIELDS
+        }
+    elif isinstance(data, dict):
+        columns = {field: data.get(field) for field in GEOMETRY_FIELDS}
+        if not all(isinstance(column, list) for column in columns.values()):
+            raise ValueError(['Columnar payload must provide a list for every parameter'])
+        if len({len(column) for column in columns.values()}) != 1:
+            raise ValueError(['Columnar payload lists must all have the same length'])
+    else:
+        raise ValueError(['Payload must be a list of geometries or a columnar object'])
+
+    size = len(columns['carriageway_width'])
+    if size == 0:
+        raise ValueError(['At least one geometry is required'])
+    if max_rows is not None and size > max_rows:
+        raise ValueError([f'Batch size {size} exceeds the limit of {max_rows}'])
+
+    arrays = {}
+    errors = []
+    for field, column in columns.items():
+        values = np.array([_real_number(value) for value in column], dtype=np.float64)
+        bad = ~np.isfinite(values)
+        if field == 'num_girders':
+            # Whole and within IntegerField range, before the int64 cast can wrap
+            bad |= (values != np.trunc(values)) | (np.abs(values) > NUM_GIRDERS_LIMIT)
+            message = f'must be a whole number between -{NUM_GIRDERS_LIMIT} and {NUM_GIRDERS_LIMIT}'
+        else:
+            message = 'must be a finite number'
+        errors.extend((index, f'Row {index}: {field} {message}') for index in np.flatnonzero(bad).tolist())
+        arrays[field] = values
+    if errors:
+        errors.sort(key=lambda error: error[0])
+        raise ValueError([message for _, message in errors[:MAX_ROW_ERRORS]])
+
+    arrays['num_girders'] = arrays['num_girders'].astype(np.int64)
+    return arrays
+
+
+def _real_number(value):
+    """value as a float, or NaN when it is not a real number (or numeric string)."""
+    if isinstance(value, bool):
+        return np.nan
+    if isinstance(value, (int, float, str)):
+        try:
+            return float(value)
+        except (OverflowError, ValueError):
+            return np.nan
+    return np.nan
+
+
+def solve_geometry(
+    carriageway_width,
+    spacing_min=0.5,
+    spacing_max=None,
+    spacing_step=0.05,
+    overhang_min=0.0,
+    overhang_max=None,
+    num_girders_min=2,
+    num_girders_max=20,
+    overhang_target=None,
+):
+    """
+    Enumerate every feasible (girder_spacing, num_girders, deck_overhang_width).
+
+    Girder spacing is taken on a grid of spacing_step between spacing_min and
+    spacing_max; for each spacing s and girder count n the overhang follows in
+    closed form from the girder rule, overhang = overall_width - n * s. The
+    whole n x s grid is computed with NumPy broadcasting, then filtered to the
+    bounds and checked with validate_geometry_batch.
+
+    Results are ranked by fewest girders, then smallest overhang. With an
+    overhang_target they are ranked by overhang closest to the target, then
+    fewest girders.
+
+    Returns a dict with overall_width and arrays girder_spacing, num_girders,
+    deck_overhang_width in rank order. Raises ValueError for invalid bounds.
+    """
+    overall_width = carriageway_width + OVERALL_WIDTH_ALLOWANCE
+    spacing_max = overall_width if spacing_max is None else min(spacing_max, overall_width)
+    overhang_max = overall_width if overhang_max is None else min(overhang_max, overall_width)
+
+    if not CARRIAGEWAY_WIDTH_MIN <= carriageway_width < CARRIAGEWAY_WIDTH_MAX:
+        raise ValueError(
+            f'carriageway_width must be >= {CARRIAGEWAY_WIDTH_MIN} and < {CARRIAGEWAY_WIDTH_MAX}'
+        )
+    if spacing_step <= 0:
+        raise ValueError('spacing_step must be > 0')
+    if spacing_min <= 0 or spacing_min > spacing_max:
+        raise ValueError('spacing_min must be > 0 and <= spacing_max')
+    if overhang_min < 0 or overhang_min > overhang_max:
+        raise ValueError('overhang_min must be >= 0 and <= overhang_max')
+    if num_girders_min < 1 or num_girders_min > num_girders_max:
+        raise ValueError('num_girders_min must be >= 1 and <= num_girders_max')
+
+    spacing_count = int(np.floor((spacing_max - spacing_min) / spacing_step + 1e-9)) + 1
+    girder_count = num_girders_max - num_girders_min + 1
+    if spacing_count * girder_count > 10_000_000:
+        raise ValueError('Search space is too large; narrow the bounds or increase spacing_step')
+
+    spacing = np.round(spacing_min + spacing_step * np.arange(spacing_count), 6)
+    girders = np.arange(num_girders_min, num_girders_max + 1)
+
+    # Closed form over the n x s grid: overhang = overall_width - n * s
+    overhang = np.round(overall_width - girders[:, None] * spacing[None, :], 6)
+    feasible = (
+        (overhang >= overhang_min)
+        & (overhang <= overhang_max)
+        & (overhang < overall_width)
+        & (spacing[None, :] < overall_width)
+    )
+    girder_index, spacing_index = np.nonzero(feasible)
+
+    girder_spacing = spacing[spacing_index]
+    num_girders = girders[girder_index]
+    deck_overhang_width = overhang[girder_index, spacing_index]
+
+    # Rounding must not push any layout outside the validation tolerance
+    valid = validate_geometry_batch(
+        np.full(girder_spacing.shape, carriageway_width, dtype=np.float64),
+        girder_spacing,
+        num_girders,
+        deck_overhang_width,
+    )['valid']
+    girder_spacing = girder_spacing[valid]
+    num_girders = num_girders[valid]
+    deck_overhang_width = deck_overhang_width[valid]
+
+    # np.lexsort sorts by the last key first
+    if overhang_target is None:
+        order = np.lexsort((girder_spacing, deck_overhang_width, num_girders))
+    else:
+        deviation = np.round(np.abs(deck_overhang_width - overhang_target), 6)
+        order = np.lexsort((girder_spacing, num_girders, deviation))
+
+    return {
+        'overall_width': overall_width,
+        'girder_spacing': girder_spacing[order],
+        'num_girders': num_girders[order],
+        'deck_overhang_width': deck_overhang_width[order],
+    }
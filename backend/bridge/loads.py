@@ -0,0 +1,253 @@
+"""
+Environmental design loads derived from LocationData and a deck geometry.
+
+Quantities (IRC 6 / IS 875 Part 3 / IRC SP 114 simplified forms):
+- design_wind_speed = basic_wind_speed * k1 * k2 * k3  (m/s)
+- design_wind_pressure = 0.6 * design_wind_speed^2 / 1000  (kN/m^2)
+- vertical_wind_load = pressure * overall_width * G * CL  (kN per metre of span)
+- wind_load_per_girder = vertical_wind_load / num_girders  (kN/m)
+- seismic_coefficient Ah = (Z / 2) * (Sa/g) / (R / I), with Z = seismic_factor
+- temperature_range = temperature_max - temperature_min  (deg C)
+- thermal_movement = alpha * temperature_range * overall_width  (mm, transverse),
+  with alpha from the deck_concrete grade in the materials registry when given
+
+The factors default to an important bridge on flat, open terrain and can
+be overridden per request (see DEFAULT_FACTORS). These are preliminary
+values for comparing locations and layouts, not a code check.
+
+compute_loads works on NumPy arrays that broadcast together, e.g. an
+(L, 1) column of locations against a (1, G) row of geometries gives the
+full L x G grid without Python loops. design_loads wraps it for a single
+location and geometry.
+
+location_columns and geometry_columns load the inputs of POST /api/loads/
+as arrays: stored rows are fetched with one query per id chunk, so the
+request costs a constant number of queries however many ids it names.
+"""
+
+import math
+
+import numpy as np
+from django.db import connection
+
+from .geometry import OVERALL_WIDTH_ALLOWANCE, parse_geometry_batch
+from .materials import material_registry
+from .models import GeometryData, LocationData
+
+# Air density term of p = 0.6 V^2 (N/m^2 with V in m/s)
+WIND_PRESSURE_COEFFICIENT = 0.6
+
+# Coefficient of thermal expansion for steel/concrete (per deg C)
+THERMAL_EXPANSION = 12e-6
+
+DEFAULT_FACTORS = {
+    'risk_factor': 1.08,            # k1, 100-year design life
+    'terrain_factor': 1.0,          # k2, terrain category and height
+    'topography_factor': 1.0,       # k3, flat ground
+    'gust_factor': 2.0,             # G, IRC 6 clause 209.3.3
+    'lift_coefficient': 0.75,       # CL, IRC 6 clause 209.3.5
+    'importance_factor': 1.2,       # I, important bridges
+    'response_reduction': 3.0,      # R, ductile substructure
+    'spectral_acceleration': 2.5,   # Sa/g, plateau of the design spectrum
+}
+
+LOAD_FIELDS = (
+    'design_wind_speed',
+    'design_wind_pressure',
+    'vertical_wind_load',
+    'wind_load_per_girder',
+    'seismic_coefficient',
+    'temperature_range',
+    'thermal_movement',
+)
+
+LOCATION_LOAD_FIELDS = ('basic_wind_speed', 'seismic_factor', 'temperature_max', 'temperature_min')
+
+
+def parse_factors(data):
+    """
+    Return DEFAULT_FACTORS updated with positive, finite numeric overrides from data.
+
+    A "deck_concrete" grade name adds that grade's thermal_coefficient.
+    Raises ValueError with a list of messages.
+    """
+    factors = dict(DEFAULT_FACTORS)
+    errors = []
+    for name in DEFAULT_FACTORS:
+        if name not in data:
+            continue
+        try:
+            value = float(data[name])
+        except (TypeError, ValueError):
+            errors.append(f'{name} must be a number')
+            continue
+        if not (math.isfinite(value) and value > 0):
+            errors.append(f'{name} must be a finite number > 0')
+        factors[name] = value
+    if 'deck_concrete' in data:
+        concrete = data['deck_concrete']
+        concrete = material_registry().concrete.get(concrete) if isinstance(concrete, str) else None
+        if concrete is None:
+            errors.append(f'deck_concrete must be one of {list(material_registry().concrete)}')
+        else:
+            factors['thermal_coefficient'] = concrete.thermal_coefficient
+    if errors:
+        raise ValueError(errors)
+    return factors
+
+
+def compute_loads(basic_wind_speed, seismic_factor, temperature_max, temperature_min,
+                  overall_width, num_girders, factors=None):
+    """
+    Compute design loads for arrays of locations and geometries.
+
+    Location arguments and geometry arguments are arrays that broadcast
+    together. Returns a dict of float64 arrays keyed by LOAD_FIELDS.
+    """
+    factors = {**DEFAULT_FACTORS, **(factors or {})}
+    basic_wind_speed = np.asarray(basic_wind_speed, dtype=np.float64)
+    seismic_factor = np.asarray(seismic_factor, dtype=np.float64)
+    temperature_max = np.asarray(temperature_max, dtype=np.float64)
+    temperature_min = np.asarray(temperature_min, dtype=np.float64)
+    overall_width = np.asarray(overall_width, dtype=np.float64)
+    num_girders = np.asarray(num_girders, dtype=np.float64)
+
+    wind_speed = basic_wind_speed * (
+        factors['risk_factor'] * factors['terrain_factor'] * factors['topography_factor']
+    )
+    wind_pressure = WIND_PRESSURE_COEFFICIENT * wind_speed ** 2 / 1000
+    vertical_wind_load = wind_pressure * overall_width * (
+        factors['gust_factor'] * factors['lift_coefficient']
+    )
+    wind_load_per_girder = np.divide(
+        vertical_wind_load,
+        num_girders,
+        out=np.full(np.broadcast(vertical_wind_load, num_girders).shape, np.nan),
+        where=num_girders > 0,
+    )
+    seismic_coefficient = (seismic_factor / 2) * factors['spectral_acceleration'] * (
+        factors['importance_factor'] / factors['response_reduction']
+    )
+    temperature_range = temperature_max - temperature_min
+    alpha = factors.get('thermal_coefficient', THERMAL_EXPANSION)
+    thermal_movement = alpha * temperature_range * overall_width * 1000
+
+    shape = np.broadcast(wind_speed, seismic_factor, temperature_range, overall_width, num_girders).shape
+    return {
+        'design_wind_speed': np.broadcast_to(wind_speed, shape),
+        'design_wind_pressure': np.broadcast_to(wind_pressure, shape),
+        'vertical_wind_load': np.broadcast_to(vertical_wind_load, shape),
+        'wind_load_per_girder': np.broadcast_to(wind_load_per_girder, shape),
+        'seismic_coefficient': np.broadcast_to(seismic_coefficient, shape),
+        'temperature_range': np.broadcast_to(temperature_range, shape),
+        'thermal_movement': np.broadcast_to(thermal_movement, shape),
+    }
+
+
+def design_loads(location, geometry, factors=None):
+    """
+    Design loads for one location and one geometry.
+
+    location and geometry are model instances or dicts with the
+    LocationData fields and overall_width (or carriageway_width) and
+    num_girders. Returns a dict of floats keyed by LOAD_FIELDS.
+    """
+    def get(obj, name, default=None):
+        return obj.get(name, default) if isinstance(obj, dict) else getattr(obj, name, default)
+
+    overall_width = get(geometry, 'overall_width')
+    if overall_width is None:
+        overall_width = float(get(geometry, 'carriageway_width')) + OVERALL_WIDTH_ALLOWANCE
+
+    loads = compute_loads(
+        *(get(location, name) for name in LOCATION_LOAD_FIELDS),
+        overall_width,
+        get(geometry, 'num_girders'),
+        factors,
+    )
+    return {name: float(value) for name, value in loads.items()}
+
+
+def _parse_ids(values, field, max_rows):
+    if not isinstance(values, list) or not values:
+        raise ValueError([f'{field}s must be a non-empty list of ids'])
+    if len(values) > max_rows:
+        raise ValueError([f'{len(values)} {field}s exceeds the limit of {max_rows}'])
+    if any(isinstance(value, bool) for value in values):
+        raise ValueError([f'{field}s must all be integers'])
+    try:
+        ids = [int(value) for value in values]
+    except (TypeError, ValueError):
+        raise ValueError([f'{field}s must all be integers'])
+    # Keep the request order, dropping repeats
+    return list(dict.fromkeys(ids))
+
+
+def _fetch_rows(queryset, ids, fields):
+    chunk = connection.features.max_query_params or len(ids)
+    rows = {}
+    for start in range(0, len(ids), chunk):
+        for row in queryset.filter(pk__in=ids[start:start + chunk]).order_by().values_list('pk', *fields):
+            rows[row[0]] = row[1:]
+    return rows
+
+
+def location_columns(data, max_rows=None):
+    """
+    Return (ids, columns) for the locations named by a loads payload.
+
+    data gives either "location_ids" or a "state" (every district in it).
+    columns is a dict of arrays keyed by LOCATION_LOAD_FIELDS, in id
+    order. Raises ValueError with a list of messages.
+    """
+    if data.get('state'):
+        queryset = LocationData.objects.filter(state=data['state']).order_by('district')
+        rows = list(queryset.values_list('pk', *LOCATION_LOAD_FIELDS)[:max_rows + 1 if max_rows else None])
+        if not rows:
+            raise ValueError([f'No locations found for state {data["state"]}'])
+        if max_rows is not None and len(rows) > max_rows:
+            raise ValueError([f'State has more than {max_rows} locations'])
+        ids = [row[0] for row in rows]
+        values = [row[1:] for row in rows]
+    elif 'location_ids' in data:
+        ids = _parse_ids(data['location_ids'], 'location_id', max_rows or float('inf'))
+        rows = _fetch_rows(LocationData.objects, ids, LOCATION_LOAD_FIELDS)
+        missing = [pk for pk in ids if pk not in rows]
+        if missing:
+            raise ValueError([f'Unknown location_id: {missing[:20]}'])
+        values = [rows[pk] for pk in ids]
+    else:
+        raise ValueError(['location_ids or state is required'])
+
+    matrix = np.array(values, dtype=np.float64).reshape(len(ids), len(LOCATION_LOAD_FIELDS))
+    return ids, {field: matrix[:, i] for i, field in enumerate(LOCATION_LOAD_FIELDS)}
+
+
+def geometry_columns(data, max_rows=None):
+    """
+    Return (ids, columns) for the geometries of a loads payload.
+
+    data gives either stored "geometry_ids" or inline "geometries" in any
+    form accepted by parse_geometry_batch (ids are then None). columns
+    holds overall_width and num_girders arrays. Raises ValueError with a
+    list of messages.
+    """
+    if 'geometry_ids' in data:
+        ids = _parse_ids(data['geometry_ids'], 'geometry_id', max_rows or float('inf'))
+        rows = _fetch_rows(GeometryData.objects, ids, ('overall_width', 'num_girders'))
+        missing = [pk for pk in ids if pk not in rows]
+        if missing:
+            raise ValueError([f'Unknown geometry_id: {missing[:20]}'])
+        matrix = np.array([rows[pk] for pk in ids], dtype=np.float64)
+        overall_width, num_girders = matrix[:, 0], matrix[:, 1]
+    elif 'geometries' in data:
+        columns = parse_geometry_batch(data['geometries'], max_rows=max_rows)
+        ids = [None] * len(columns['carriageway_width'])
+        overall_width = columns['carriageway_width'] + OVERALL_WIDTH_ALLOWANCE
+        num_girders = columns['num_girders'].astype(np.float64)
+    else:
+        raise ValueError(['geometry_ids or geometries is required'])
+
+    if (num_girders < 1).any():
+        raise ValueError(['num_girders must be at least 1 for every geometry'])
+    return ids, {'overall_width': overall_width, 'num_girders': num_girders}
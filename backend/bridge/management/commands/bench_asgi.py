@@ -0,0 +1,210 @@
+import asyncio
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import AsyncClient, Client, override_settings
+
+from bridge.models import GeometryData, LocationData, MaterialInput
+from bridge.writer import record_writer
+
+# name: (sync path, async path, method)
+ENDPOINTS = {
+    'by_district': ('/api/locations/by_district/', '/api/async/locations/by_district/', 'get'),
+    'materials': ('/api/materials/', '/api/async/materials/', 'get'),
+    'geometry': ('/api/geometry/validate/', '/api/async/geometry/validate/', 'post'),
+    'submit': ('/api/submit/', '/api/async/submit/', 'post'),
+}
+
+
+def geometry_payload(index):
+    # Distinct inputs, so every request runs the rules and writes a row
+    return {
+        'carriageway_width': round(7.5 + index * 0.0001, 6),
+        'girder_spacing': 2.5,
+        'num_girders': 4,
+        'deck_overhang_width': 2.5,
+    }
+
+
+def submit_payload(index):
+    return {
+        'structure_type': 'Highway',
+        'materials': {
+            'girder_steel': 'E250',
+            'cross_bracing_steel': 'E250',
+            'deck_concrete': 'M25',
+        },
+    }
+
+
+class Command(BaseCommand):
+    """
+    Management command to compare the sync (WSGI) and async (ASGI) views.
+
+    The same requests are sent to each DRF endpoint through the WSGI test
+    client, one thread per connection, and to its /api/async/ counterpart
+    through the ASGI test client as concurrent coroutines on one event
+    loop. Both paths run the full middleware stack in-process, so the
+    numbers compare request handling, not the network or server. Rows
+    created by the run are deleted afterwards.
+
+    Usage: python manage.py bench_asgi --connections 500 --requests 5000
+    """
+    help = 'Compare sync WSGI and async ASGI latency/throughput under concurrent connections'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--connections',
+            type=int,
+            default=500,
+            help='Concurrent connections (default: 500)',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=5000,
+            help='Requests per endpoint and path (default: 5000)',
+        )
+        parser.add_argument(
+            '--endpoint',
+            choices=list(ENDPOINTS) + ['all'],
+            default='all',
+            help='Endpoint(s) to load (default: all)',
+        )
+        parser.add_argument(
+            '--mode',
+            choices=['sync', 'buffered'],
+            default='sync',
+            help='Write mode for geometry/submit: sync stores each record, buffered uses the background writer',
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Keep the rows created by the run',
+        )
+
+    def request_args(self, name, index, options):
+        method = ENDPOINTS[name][2]
+        if name == 'by_district':
+            return method, self.location, None
+        if name == 'materials':
+            return method, {}, None
+        payload = geometry_payload(index) if name == 'geometry' else submit_payload(index)
+        payload['sync'] = options['mode'] == 'sync'
+        return method, payload, 'application/json'
+
+    def run_sync(self, name, options):
+        url = ENDPOINTS[name][0]
+        connections = options['connections']
+        total = options['requests']
+        per_client = [range(i, total, connections) for i in range(connections)]
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+
+        def worker(indexes):
+            client = Client()
+            local_latencies = []
+            local_errors = 0
+            try:
+                for index in indexes:
+                    method, data, content_type = self.request_args(name, index, options)
+                    kwargs = {'content_type': content_type} if content_type else {}
+                    started = time.perf_counter()
+                    try:
+                        response = getattr(client, method)(url, data, **kwargs)
+                        ok = response.status_code < 400
+                    except Exception:
+                        ok = False
+                    local_latencies.append(time.perf_counter() - started)
+                    local_errors += 0 if ok else 1
+            finally:
+                connection.close()
+            with lock:
+                latencies.extend(local_latencies)
+                errors.append(local_errors)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            list(executor.map(worker, per_client))
+        return time.perf_counter() - started, latencies, sum(errors)
+
+    def run_async(self, name, options):
+        url = ENDPOINTS[name][1]
+        connections = options['connections']
+        total = options['requests']
+        latencies = []
+        errors = 0
+
+        async def worker(indexes):
+            nonlocal errors
+            client = AsyncClient()
+            for index in indexes:
+                # Offset past the sync run so geometry inputs are new here too
+                method, data, content_type = self.request_args(name, total + index, options)
+                kwargs = {'content_type': content_type} if content_type else {}
+                started = time.perf_counter()
+                try:
+                    response = await getattr(client, method)(url, data, **kwargs)
+                    ok = response.status_code < 400
+                except Exception:
+                    ok = False
+                latencies.append(time.perf_counter() - started)
+                errors += 0 if ok else 1
+
+        async def main():
+            await asyncio.gather(*(
+                worker(range(i, total, connections)) for i in range(connections)
+            ))
+
+        started = time.perf_counter()
+        asyncio.run(main())
+        return time.perf_counter() - started, latencies, errors
+
+    def report(self, name, path, result):
+        elapsed, latencies, errors = result
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        self.stdout.write(
+            f'{name:>11}  {path:>5}  {len(latencies):>8}  {errors:>6}  '
+            f'{len(latencies) / elapsed:>8,.0f}  {statistics.median(latencies) * 1000:>8.1f}  {p99 * 1000:>8.1f}'
+        )
+
+    def handle(self, *args, **options):
+        location = LocationData.objects.values('state', 'district').first()
+        if location is None:
+            self.stdout.write(self.style.WARNING('No locations found; run seed_locations first'))
+            return
+        self.location = location
+
+        self.stdout.write(
+            f'Profile: {settings.DB_PROFILE}, {options["connections"]} connections, '
+            f'{options["requests"]} requests per path, {options["mode"]} writes'
+        )
+        self.stdout.write(
+            f'{"endpoint":>11}  {"path":>5}  {"requests":>8}  {"errors":>6}  '
+            f'{"req/s":>8}  {"p50 ms":>8}  {"p99 ms":>8}'
+        )
+
+        last_ids = {
+            model: model.objects.order_by('-id').values_list('id', flat=True).first() or 0
+            for model in (GeometryData, MaterialInput)
+        }
+        names = list(ENDPOINTS) if options['endpoint'] == 'all' else [options['endpoint']]
+        # The ASGI test client always sends Host: testserver
+        hosts = override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'])
+        try:
+            with hosts:
+                for name in names:
+                    self.report(name, 'wsgi', self.run_sync(name, options))
+                    self.report(name, 'asgi', self.run_async(name, options))
+        finally:
+            record_writer.flush()
+            if not options['keep']:
+                for model, last_id in last_ids.items():
+                    model.objects.filter(id__gt=last_id).delete()
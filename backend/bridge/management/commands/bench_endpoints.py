@@ -0,0 +1,222 @@
+import json
+import platform
+import statistics
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+
+from bridge.benchmarks import (
+    ROUTES,
+    QueryCounter,
+    bench_context,
+    route_request,
+    seed_designs,
+    seed_geometry,
+    seed_locations,
+    seed_materials,
+)
+from bridge.cache import location_cache, validation_memo
+
+DEFAULT_BASELINE = Path(__file__).resolve().parents[2] / 'benchmark_baseline.json'
+
+
+class Command(BaseCommand):
+    """
+    Management command to benchmark every API route and guard against regressions.
+
+    For each LocationData size, synthetic locations, geometries, material
+    inputs and design submissions (one per material input) are seeded inside a transaction that is rolled back, so
+    the database is left unchanged. Each route then gets one request on a
+    cold location cache, whose SQL queries are counted against the route's
+    max_queries (bridge/benchmarks.py), followed by --requests timed
+    requests through the test client.
+
+    The run fails if a route exceeds its query limit, returns an error, or
+    its median latency is more than --threshold slower than the baseline
+    file (and at least --min-delta-ms slower, to ignore noise on fast
+    routes). Baselines are machine-specific: record one with
+    --update-baseline on the machine that runs the comparison.
+
+    Usage: python manage.py bench_endpoints [--rows 10 10000 500000] [--update-baseline]
+    """
+    help = 'Benchmark all API routes with query-count and latency regression guards'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            nargs='+',
+            default=[10, 10000, 500000],
+            help='LocationData sizes to benchmark (default: 10 10000 500000)',
+        )
+        parser.add_argument(
+            '--geometry-rows',
+            type=int,
+            default=100000,
+            help='GeometryData rows seeded for each size (default: 100000)',
+        )
+        parser.add_argument(
+            '--material-rows',
+            type=int,
+            default=100000,
+            help='MaterialInput rows seeded for each size (default: 100000)',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=30,
+            help='Timed requests per route (default: 30)',
+        )
+        parser.add_argument(
+            '--route',
+            action='append',
+            choices=[route.name for route in ROUTES],
+            help='Only benchmark this route (repeatable)',
+        )
+        parser.add_argument(
+            '--baseline',
+            default=str(DEFAULT_BASELINE),
+            help='Baseline JSON file (default: bridge/benchmark_baseline.json)',
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.5,
+            help='Allowed median latency increase over the baseline (default: 0.5 = 50%%)',
+        )
+        parser.add_argument(
+            '--min-delta-ms',
+            type=float,
+            default=2.0,
+            help='Ignore latency increases smaller than this many ms (default: 2)',
+        )
+        parser.add_argument(
+            '--update-baseline',
+            action='store_true',
+            help='Write this run to the baseline file instead of comparing',
+        )
+        parser.add_argument(
+            '--output',
+            help='Also write this run\'s results to this JSON file',
+        )
+
+    def measure(self, client, route, context, requests):
+        location_cache.invalidate()
+        queries = QueryCounter()
+        with connection.execute_wrapper(queries):
+            response = route_request(client, route, 0, context)
+        errors = int(response.status_code >= 400)
+
+        latencies = []
+        started = time.perf_counter()
+        for i in range(1, requests + 1):
+            request_started = time.perf_counter()
+            response = route_request(client, route, i, context)
+            latencies.append(time.perf_counter() - request_started)
+            errors += int(response.status_code >= 400)
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            'queries': queries.count,
+            'max_queries': route.max_queries,
+            'errors': errors,
+            'p50_ms': round(statistics.median(latencies) * 1000, 3),
+            'p95_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 3),
+            'rps': round(len(latencies) / elapsed, 1),
+        }
+
+    def run_size(self, rows, routes, options):
+        results = {}
+        with transaction.atomic():
+            seeding = time.perf_counter()
+            seed_locations(rows)
+            seed_geometry(options['geometry_rows'])
+            seed_materials(options['material_rows'])
+            seed_designs(options['material_rows'])
+            location_cache.invalidate()
+            validation_memo.clear()
+            self.stdout.write(f'\n{rows} locations (seeded in {time.perf_counter() - seeding:.1f}s)')
+            self.stdout.write(
+                f'{"route":>27}  {"queries":>7}  {"errors":>6}  {"p50 ms":>8}  {"p95 ms":>8}  {"req/s":>8}'
+            )
+
+            client = Client()
+            context = bench_context()
+            for route in routes:
+                result = self.measure(client, route, context, options['requests'])
+                results[route.name] = result
+                self.stdout.write(
+                    f'{route.name:>27}  {result["queries"]:>3}/{route.max_queries:<3}  {result["errors"]:>6}  '
+                    f'{result["p50_ms"]:>8.2f}  {result["p95_ms"]:>8.2f}  {result["rps"]:>8,.0f}'
+                )
+
+            transaction.set_rollback(True)
+        location_cache.invalidate()
+        validation_memo.clear()
+        return results
+
+    def failures(self, run, baseline, options):
+        failures = []
+        for size, results in run['results'].items():
+            for name, result in results.items():
+                label = f'{name} @ {size} rows'
+                if result['queries'] > result['max_queries']:
+                    failures.append(f'{label}: {result["queries"]} queries (limit {result["max_queries"]})')
+                if result['errors']:
+                    failures.append(f'{label}: {result["errors"]} error responses')
+
+                previous = baseline.get('results', {}).get(size, {}).get(name)
+                if previous is None:
+                    continue
+                limit = previous['p50_ms'] * (1 + options['threshold'])
+                if result['p50_ms'] > limit and result['p50_ms'] - previous['p50_ms'] >= options['min_delta_ms']:
+                    failures.append(
+                        f'{label}: p50 {result["p50_ms"]:.2f} ms vs baseline {previous["p50_ms"]:.2f} ms'
+                    )
+        return failures
+
+    def handle(self, *args, **options):
+        routes = [route for route in ROUTES if not options['route'] or route.name in options['route']]
+        run = {
+            'meta': {
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'db_profile': settings.DB_PROFILE,
+                'requests': options['requests'],
+                'geometry_rows': options['geometry_rows'],
+                'material_rows': options['material_rows'],
+            },
+            'results': {},
+        }
+
+        # Writes are stored before responding so query counts are deterministic
+        with override_settings(
+            WRITE_BUFFER_ENABLED=False,
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+        ):
+            for rows in options['rows']:
+                run['results'][str(rows)] = self.run_size(rows, routes, options)
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(run, indent=2) + '\n')
+
+        # Query limits and errors are checked even when recording a new baseline
+        baseline_path = Path(options['baseline'])
+        if options['update_baseline'] or not baseline_path.exists():
+            baseline = {}
+        else:
+            baseline = json.loads(baseline_path.read_text())
+        failures = self.failures(run, baseline, options)
+        if failures:
+            raise CommandError('Benchmark regressions:\n' + '\n'.join(f'- {failure}' for failure in failures))
+
+        if options['update_baseline']:
+            baseline_path.write_text(json.dumps(run, indent=2) + '\n')
+            self.stdout.write(self.style.SUCCESS(f'\nBaseline written to {baseline_path}'))
+        else:
+            self.stdout.write(self.style.SUCCESS('\nNo regressions against the baseline'))
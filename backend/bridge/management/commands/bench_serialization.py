@@ -0,0 +1,94 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from bridge.cache import LOCATION_FIELDS
+from bridge.models import LocationData
+from bridge.renderers import FastJSONRenderer, orjson
+from bridge.serializers import LocationDataSerializer
+
+
+def serializer_path(queryset):
+    """Old list path: ModelSerializer(many=True) rendered by JSONRenderer."""
+    data = LocationDataSerializer(queryset, many=True).data
+    return JSONRenderer().render(data)
+
+
+def values_path(queryset):
+    """Fast list path: .values() dicts rendered by FastJSONRenderer."""
+    data = list(queryset.values(*LOCATION_FIELDS))
+    return FastJSONRenderer().render(data)
+
+
+class Command(BaseCommand):
+    """
+    Management command to compare location list serialization paths.
+
+    Synthetic rows are inserted inside a transaction that is rolled back,
+    so the database is left unchanged.
+
+    Usage: python manage.py bench_serialization [--rows 1000 10000 100000] [--repeat 3]
+    """
+    help = 'Benchmark ModelSerializer vs .values() + FastJSONRenderer for location lists'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            nargs='+',
+            default=[1000, 10000, 100000],
+            help='Row counts to benchmark (default: 1000 10000 100000)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Runs per path; the best time is reported (default: 3)',
+        )
+
+    def best_time(self, func, queryset, repeat):
+        best = float('inf')
+        size = 0
+        for _ in range(repeat):
+            started = time.perf_counter()
+            size = len(func(queryset))
+            best = min(best, time.perf_counter() - started)
+        return best, size
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'JSON backend for the fast path: {"orjson" if orjson else "json (orjson not installed)"}'
+        )
+        self.stdout.write(
+            f'{"rows":>8}  {"serializer (s)":>14}  {"values (s)":>10}  {"speedup":>7}  {"bytes":>10}'
+        )
+
+        for rows in options['rows']:
+            with transaction.atomic():
+                LocationData.objects.bulk_create(
+                    [
+                        LocationData(
+                            state=f'Bench State {i % 36}',
+                            district=f'Bench District {i}',
+                            basic_wind_speed=44,
+                            seismic_zone='III',
+                            seismic_factor=0.16,
+                            temperature_max=40,
+                            temperature_min=10,
+                        )
+                        for i in range(rows)
+                    ],
+                    batch_size=5000,
+                )
+                queryset = LocationData.objects.filter(state__startswith='Bench State ')
+
+                old, old_size = self.best_time(serializer_path, queryset, options['repeat'])
+                new, new_size = self.best_time(values_path, queryset, options['repeat'])
+
+                transaction.set_rollback(True)
+
+            self.stdout.write(
+                f'{rows:>8}  {old:>14.4f}  {new:>10.4f}  {old / new:>6.1f}x  {new_size:>10}'
+            )
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bridge.cache import LOCATION_FIELDS, location_snapshot
+from bridge.models import LocationData
+from bridge.snapshot import Snapshot, write_snapshot
+
+
+class Command(BaseCommand):
+    """
+    Management command to write the memory-mapped LocationData snapshot.
+
+    Running servers pick up the new file within
+    LOCATION_SNAPSHOT_CHECK_INTERVAL seconds (see bridge/snapshot.py).
+    Run it after changing LocationData outside Django (raw SQL, another
+    tool); changes made through Django rebuild the snapshot by themselves.
+
+    Usage: python manage.py build_location_snapshot [--path snapshots/locations.snap]
+    """
+    help = 'Write LocationData to the memory-mapped columnar snapshot file'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            help='Snapshot file to write (default: LOCATION_SNAPSHOT_PATH)',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path'] or location_snapshot.path
+        if path is None:
+            raise CommandError('Set LOCATION_SNAPSHOT_PATH or pass --path')
+
+        started = time.perf_counter()
+        write_snapshot(path, LocationData.objects.all(), LOCATION_FIELDS, location_snapshot.order)
+        elapsed = time.perf_counter() - started
+
+        snapshot = Snapshot(path)
+        size = snapshot.identity[3]
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {len(snapshot)} location(s) to {path} '
+            f'({size / 1024:,.1f} KiB, version {snapshot.version}, {elapsed:.2f}s)'
+        ))
@@ -0,0 +1,103 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from bridge.retention import compact_geometry
+
+
+class Command(BaseCommand):
+    """
+    Management command to prune and archive old or invalid GeometryData rows.
+
+    Rows referenced by a DesignSubmission are always kept. The others are
+    removed when unused (not stored or reused) for --older-than days or,
+    with --invalid, when they failed validation. Each batch is archived to a gzip JSON-lines file per
+    creation date and deleted in its own short transaction (see
+    bridge/retention.py). Defaults come from the GEOMETRY_RETENTION_*
+    settings.
+
+    Usage: python manage.py compact_geometry [--older-than 90] [--invalid] [--dry-run]
+    """
+    help = 'Archive and delete unreferenced GeometryData rows that are old or invalid'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than',
+            type=int,
+            default=getattr(settings, 'GEOMETRY_RETENTION_DAYS', None),
+            help='Remove rows last used more than this many days ago (default: GEOMETRY_RETENTION_DAYS)',
+        )
+        parser.add_argument(
+            '--invalid',
+            action='store_true',
+            default=getattr(settings, 'GEOMETRY_RETENTION_INVALID', False),
+            help='Also remove invalid rows of any age (default: GEOMETRY_RETENTION_INVALID)',
+        )
+        parser.add_argument(
+            '--keep-invalid',
+            dest='invalid',
+            action='store_false',
+            help='Do not select invalid rows by validity alone',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=getattr(settings, 'GEOMETRY_RETENTION_BATCH_SIZE', 1000),
+            help='Rows archived and deleted per transaction (default: GEOMETRY_RETENTION_BATCH_SIZE)',
+        )
+        parser.add_argument(
+            '--archive-dir',
+            default=getattr(settings, 'GEOMETRY_ARCHIVE_DIR', None),
+            help='Directory for the compressed archive (default: GEOMETRY_ARCHIVE_DIR)',
+        )
+        parser.add_argument(
+            '--no-archive',
+            dest='archive_dir',
+            action='store_const',
+            const=None,
+            help='Delete without writing an archive',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.0,
+            help='Seconds to sleep between batches, to leave room for other writers (default: 0)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Count matching rows without archiving or deleting',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        if options['older_than'] is not None and options['older_than'] < 0:
+            raise CommandError('--older-than must not be negative')
+
+        started = time.perf_counter()
+        try:
+            stats = compact_geometry(
+                older_than_days=options['older_than'],
+                invalid=options['invalid'],
+                batch_size=options['batch_size'],
+                archive_dir=options['archive_dir'],
+                pause=options['pause'],
+                dry_run=options['dry_run'],
+            )
+        except ValueError as e:
+            raise CommandError(f'{e} (use --older-than and/or --invalid)')
+        elapsed = time.perf_counter() - started
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(
+                f'{stats["matched"]} geometry row(s) would be removed ({elapsed:.2f}s)'
+            ))
+            return
+
+        archived = f', {stats["archived"]} archived to {options["archive_dir"]}' if stats['archived'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {stats["deleted"]} geometry row(s) in {stats["batches"]} batch(es){archived} '
+            f'({elapsed:.2f}s)'
+        ))
@@ -0,0 +1,218 @@
+import csv
+import json
+import math
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from bridge.cache import location_cache, location_snapshot
+from bridge.models import LocationData
+
+TEXT_FIELDS = ('state', 'district', 'seismic_zone')
+NUMBER_FIELDS = (
+    'basic_wind_speed',
+    'seismic_factor',
+    'temperature_max',
+    'temperature_min',
+)
+# Optional; rows without them keep any coordinates already stored
+COORDINATE_FIELDS = ('latitude', 'longitude')
+UPDATE_FIELDS = [
+    'basic_wind_speed',
+    'seismic_zone',
+    'seismic_factor',
+    'temperature_max',
+    'temperature_min',
+    # Moves the table version, so running servers drop their cached rows
+    'updated_at',
+]
+
+
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        yield from csv.DictReader(f)
+
+
+def read_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_parquet(path):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise CommandError('Parquet import requires pyarrow (pip install pyarrow)')
+    for batch in pq.ParquetFile(path).iter_batches():
+        yield from batch.to_pylist()
+
+
+READERS = {
+    'csv': read_csv,
+    'jsonl': read_jsonl,
+    'parquet': read_parquet,
+}
+
+
+def clean_row(row):
+    """Validate one input row and return LocationData field values."""
+    values = {}
+    for field in TEXT_FIELDS:
+        value = str(row.get(field) or '').strip()
+        if not value:
+            raise ValueError(f'{field} is required')
+        max_length = LocationData._meta.get_field(field).max_length
+        if len(value) > max_length:
+            raise ValueError(f'{field} is longer than {max_length} characters')
+        values[field] = value
+    for field in NUMBER_FIELDS:
+        try:
+            values[field] = float(row.get(field))
+        except (TypeError, ValueError):
+            raise ValueError(f'{field} must be a number, got {row.get(field)!r}')
+        if not math.isfinite(values[field]):
+            raise ValueError(f'{field} must be finite, got {row.get(field)!r}')
+    if values['temperature_min'] > values['temperature_max']:
+        raise ValueError('temperature_min is greater than temperature_max')
+
+    coordinates = [row.get(field) for field in COORDINATE_FIELDS]
+    if any(value not in (None, '') for value in coordinates):
+        try:
+            latitude, longitude = (float(value) for value in coordinates)
+        except (TypeError, ValueError):
+            raise ValueError(f'latitude and longitude must both be numbers, got {coordinates!r}')
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValueError(f'coordinates out of range: {latitude}, {longitude}')
+        values['latitude'] = latitude
+        values['longitude'] = longitude
+    return values
+
+
+class Command(BaseCommand):
+    """
+    Management command to import location data from a file.
+
+    The file is streamed in fixed-size chunks; each chunk is validated and
+    upserted on (state, district) inside its own transaction, so memory use
+    does not depend on the file size and existing rows are updated in place.
+    Upserted rows get a new updated_at, so running servers drop their cached
+    locations within LOCATION_CHECK_INTERVAL seconds (see bridge/cache.py);
+    no restart is needed.
+
+    Usage: python manage.py import_locations zones.csv [--chunk-size 5000] [--dry-run]
+    """
+    help = 'Stream location data from CSV, JSONL or Parquet and upsert it on (state, district)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import')
+        parser.add_argument(
+            '--format',
+            choices=sorted(READERS),
+            help='Input format (default: from the file extension)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='Rows per validation/upsert chunk (default: 5000)',
+        )
+        parser.add_argument(
+            '--max-errors',
+            type=int,
+            default=100,
+            help='Abort after this many invalid rows (default: 100)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate the file without writing to the database',
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.is_file():
+            raise CommandError(f'File not found: {path}')
+
+        file_format = options['format'] or path.suffix.lstrip('.').lower()
+        if file_format == 'ndjson':
+            file_format = 'jsonl'
+        if file_format not in READERS:
+            raise CommandError(
+                f'Unknown format {file_format!r}; use --format with one of {", ".join(sorted(READERS))}'
+            )
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+
+        dry_run = options['dry_run']
+        rows = READERS[file_format](path)
+        line = 0
+        imported = 0
+        invalid = 0
+        started = time.perf_counter()
+
+        while True:
+            chunk = list(islice(rows, options['chunk_size']))
+            if not chunk:
+                break
+
+            # Keyed on (state, district) so repeated rows in a chunk upsert once
+            records = {}
+            for row in chunk:
+                line += 1
+                try:
+                    values = clean_row(row)
+                except ValueError as e:
+                    invalid += 1
+                    self.stdout.write(self.style.WARNING(f'  Row {line}: {e}'))
+                    if invalid >= options['max_errors']:
+                        raise CommandError(
+                            f'Aborted after {invalid} invalid rows; '
+                            f'{imported} rows were already imported'
+                        )
+                    continue
+                records[(values['state'], values['district'])] = LocationData(**values)
+
+            if not dry_run and records:
+                located = [record for record in records.values() if record.latitude is not None]
+                unlocated = [record for record in records.values() if record.latitude is None]
+                with transaction.atomic():
+                    for batch, update_fields in (
+                        (located, UPDATE_FIELDS + list(COORDINATE_FIELDS)),
+                        (unlocated, UPDATE_FIELDS),
+                    ):
+                        if batch:
+                            LocationData.objects.bulk_create(
+                                batch,
+                                update_conflicts=True,
+                                unique_fields=['state', 'district'],
+                                update_fields=update_fields,
+                            )
+            imported += len(records)
+
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'  {line} rows read, {imported} {"valid" if dry_run else "upserted"} ({line / elapsed:,.0f} rows/s)'
+            )
+
+        if not dry_run:
+            # bulk_create does not send post_save, so clear the cache explicitly;
+            # servers notice the new updated_at within LOCATION_CHECK_INTERVAL
+            location_cache.invalidate()
+            if location_snapshot.path:
+                # The scheduled rebuild would not outlive this command
+                location_snapshot.rebuild()
+
+        elapsed = time.perf_counter() - started
+        rate = line / elapsed if elapsed else 0
+        verb = 'Validated' if dry_run else 'Imported'
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{verb} {imported} location(s) from {line} row(s) in {elapsed:.2f}s '
+                f'({rate:,.0f} rows/s), {invalid} invalid'
+            )
+        )
@@ -0,0 +1,156 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+
+from bridge.models import GeometryData, MaterialInput
+from bridge.writer import record_writer
+
+SUBMISSION = {
+    'structure_type': 'Highway',
+    'materials': {
+        'girder_steel': 'E250',
+        'cross_bracing_steel': 'E250',
+        'deck_concrete': 'M25',
+    },
+}
+
+
+def geometry_payload(index):
+    """A distinct valid geometry per request, so each one stores a row instead of hitting the memo."""
+    carriageway_width = 7.5 + index * 1e-6
+    return {
+        'carriageway_width': carriageway_width,
+        'girder_spacing': (carriageway_width + 2.5) / 4,
+        'num_girders': 4,
+        'deck_overhang_width': 2.5,
+    }
+
+
+# name -> (url, payload(request index), model)
+ENDPOINTS = {
+    'geometry': ('/api/geometry/validate/', geometry_payload, GeometryData),
+    'submit': ('/api/submit/', lambda index: SUBMISSION, MaterialInput),
+}
+
+
+class Command(BaseCommand):
+    """
+    Management command to measure write throughput under concurrent clients.
+
+    Each client is a thread with its own database connection posting to the
+    endpoint through the Django test client, so the numbers reflect database
+    lock contention for the profile selected by DB_PROFILE. Geometry
+    payloads differ per request, so every request stores a row rather than
+    answering from the validation memo. Rows created by the run are deleted
+    afterwards.
+
+    Usage: DB_PROFILE=sqlite python manage.py loadtest_writes --clients 32 --requests 2000
+    """
+    help = 'Load test /api/geometry/validate/ and /api/submit/ with concurrent clients'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=32, help='Concurrent clients (default: 32)')
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=2000,
+            help='Requests per endpoint, spread over the clients (default: 2000)',
+        )
+        parser.add_argument(
+            '--endpoint',
+            choices=['geometry', 'submit', 'both'],
+            default='both',
+            help='Endpoint(s) to load (default: both)',
+        )
+        parser.add_argument(
+            '--mode',
+            choices=['sync', 'buffered'],
+            default='sync',
+            help='sync stores each record before responding; buffered uses the background writer',
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Keep the rows created by the run',
+        )
+
+    def client(self):
+        hosts = [host for host in settings.ALLOWED_HOSTS if host != '*']
+        host = hosts[0].lstrip('.') if hosts else 'localhost'
+        return Client(HTTP_HOST=host)
+
+    def run_endpoint(self, name, options):
+        url, payload, model = ENDPOINTS[name]
+        if options['mode'] == 'sync':
+            url += '?sync=true'
+
+        clients = options['clients']
+        total = options['requests']
+        per_client = [total // clients + (1 if i < total % clients else 0) for i in range(clients)]
+        # Each client numbers its requests from its own offset, so indexes never repeat
+        offsets = [sum(per_client[:i]) for i in range(clients)]
+        last_id = model.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+
+        def worker(offset, count):
+            client = self.client()
+            local_latencies = []
+            local_errors = 0
+            try:
+                for index in range(offset, offset + count):
+                    started = time.perf_counter()
+                    try:
+                        response = client.post(url, payload(index), content_type='application/json')
+                        ok = response.status_code < 400
+                    except Exception:
+                        ok = False
+                    local_latencies.append(time.perf_counter() - started)
+                    local_errors += 0 if ok else 1
+            finally:
+                connection.close()
+            with lock:
+                latencies.extend(local_latencies)
+                errors.append(local_errors)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as executor:
+            list(executor.map(worker, offsets, per_client))
+        if options['mode'] == 'buffered':
+            record_writer.flush()
+        elapsed = time.perf_counter() - started
+
+        stored = model.objects.filter(id__gt=last_id).count()
+        if not options['keep']:
+            model.objects.filter(id__gt=last_id).delete()
+
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        self.stdout.write(
+            f'{name:>9}  {total:>8}  {stored:>7}  {sum(errors):>6}  '
+            f'{stored / elapsed:>10,.0f}  {statistics.median(latencies) * 1000:>8.1f}  {p99 * 1000:>8.1f}'
+        )
+
+    def handle(self, *args, **options):
+        database = settings.DATABASES['default']
+        self.stdout.write(
+            f'Profile: {settings.DB_PROFILE} ({database["ENGINE"].rsplit(".", 1)[-1]}, '
+            f'CONN_MAX_AGE={database.get("CONN_MAX_AGE", 0)}), '
+            f'{options["clients"]} clients, {options["mode"]} writes'
+        )
+        self.stdout.write(
+            f'{"endpoint":>9}  {"requests":>8}  {"stored":>7}  {"errors":>6}  '
+            f'{"writes/s":>10}  {"p50 ms":>8}  {"p99 ms":>8}'
+        )
+
+        names = ['geometry', 'submit'] if options['endpoint'] == 'both' else [options['endpoint']]
+        for name in names:
+            self.run_endpoint(name, options)
@@ -1,4 +1,6 @@
 from django.core.management.base import BaseCommand
+from django.utils import timezone
+from bridge.cache import location_cache, location_snapshot
 from bridge.models import LocationData
 
 
@@ -22,6 +24,8 @@ class Command(BaseCommand):
                 'seismic_factor': 0.24,
                 'temperature_max': 45,
                 'temperature_min': 5,
+                'latitude': 28.6139,
+                'longitude': 77.209,
             },
             {
                 'state': 'Uttar Pradesh',
@@ -31,6 +35,8 @@ class Command(BaseCommand):
                 'seismic_factor': 0.16,
                 'temperature_max': 43,
                 'temperature_min': 7,
+                'latitude': 26.8467,
+                'longitude': 80.9462,
             },
             {
                 'state': 'Punjab',
@@ -40,6 +46,8 @@ class Command(BaseCommand):
                 'seismic_factor': 0.24,
                 'temperature_max': 44,
                 'temperature_min': 2,
+                'latitude': 31.634,
+                'longitude': 74.8723,
             },
             {
                 'state': 'Haryana',
@@ -49,6 +57,8 @@ class Command(BaseCommand):
                 'seismic_factor': 0.24,
                 'temperature_max': 44,
                 'temperature_min': 5,
+                'latitude': 28.4595,
+                'longitude': 77.0266,
             },
             {
                 'state': 'Himachal Pradesh',
@@ -58,6 +68,8 @@ class Command(BaseCommand):
                 'seismic_factor': 0.24,
                 'temperature_max': 28,
                 'temperature_min': -2,
+                'latitude': 31.1048,
+                'longitude': 77.1734,
             },
 
             # --- West India ---
@@ -69,6 +81,8 @@ class Command(BaseCommand):
                 'seismic_factor': 0.16,
                 'temperature_max': 34,
                 'temperature_min': 22,
+                'latitude': 19.076,
+                'longitude': 72.8777,
             },
             {
                 'state': 'Gujarat',
@@ -78,6 +92,8 @@ class Command(BaseCommand):
                 'seismic_factor': 0.16,
                 'temperature_max': 43,
                 'temperature_min': 10,
+                'latitude': 23.0225,
+                'longitude': 72.5714,
             },
             {
                 'state': 'Rajasthan',
@@ -87,6 +103,8 @@ class Command(BaseCommand):
                 'seismic_factor': 0.10,
                 'temperature_max': 46,
                 'temperature_min': 8,
+                'latitude': 26.9124,
+                'longitude': 75.7873,
             },
             {
                 'state': 'Goa',
@@ -96,6 +114,8 @@ class Command(BaseCommand):
                 'seismic_factor': 0.16,
                 'temperature_max': 33,
                 'temperature_min': 21,
+                'latitude': 15.4909,
+                'longitude': 73.8278,
             },
 
             # --- South India ---
@@ -107,6 +127,8 @@ class Command(BaseCommand):
                 'seismic_factor': 0.10,
                 'temperature_max': 38,
                 'temperature_min': 25,
+                'latitude': 13.0827,
+                'longitude': 80.2707,
             },
             {
                 'state': 'Karnataka',
@@ -116,6 +138,8 @@ class Command(BaseCommand):
                 'seismic_factor': 0.10,
                 'temperature_max': 30,
                 'temperature_min': 15,
+                'latitude': 12.9716,
+                'longitude': 77.5946,
             },
             {
                 'state': 'Kerala',
@@ -125,6 +149,8 @@ class Command(BaseCommand):
                 'seismic_factor': 0.16,
                 'temperature_max': 32,
                 'temperature_min': 23,
+                'latitude': 8.5241,
+                'longitude': 76.9366,
             },
             {
                 'state': 'Telangana',
@@ -134,6 +160,8 @@ class Command(BaseCommand):
                 'seismic_factor': 0.10,
                 'temperature_max': 39,
                 'temperature_min': 17,
+                'latitude': 17.385,
+                'longitude': 78.4867,
             },
             {
                 'state': 'Andhra Pradesh',
@@ -143,6 +171,8 @@ class Command(BaseCommand):
                 'seismic_factor': 0.10,
                 'temperature_max': 37,
                 'temperature_min': 22,
+                'latitude': 17.6868,
+                'longitude': 83.2185,
             },
 
             # --- East India ---
@@ -154,6 +184,8 @@ class Command(BaseCommand):
                 'seismic_factor': 0.16,
                 'temperature_max': 38,
                 'temperature_min': 12,
+                'latitude': 22.5726,
+                'longitude': 88.3639,
             },
             {
                 'state': 'Odisha',
@@ -163,6 +195,8 @@ class Command(BaseCommand):
                 'seismic_factor': 0.16,
                 'temperature_max': 40,
                 'temperature_min': 14,
+                'latitude': 20.2961,
+                'longitude': 85.8245,
             },
             {
                 'state': 'Bihar',
@@ -172,6 +206,8 @@ class Command(BaseCommand):
                 'seismic_factor': 0.24,
                 'temperature_max': 42,
                 'temperature_min': 8,
+                'latitude': 25.5941,
+                'longitude': 85.1376,
             },
             {
                 'state': 'Jharkhand',
@@ -181,6 +217,8 @@ class Command(BaseCommand):
                 'seismic_factor': 0.16,
                 'temperature_max': 38,
                 'temperature_min': 9,
+                'latitude': 23.3441,
+                'longitude': 85.3096,
             },
             {
                 'state': 'Assam',
@@ -190,6 +228,8 @@ class Command(BaseCommand):
                 'seismic_factor': 0.36,
                 'temperature_max': 36,
                 'temperature_min': 12,
+                'latitude': 26.1445,
+                'longitude': 91.7362,
             },
 
             # --- Central India ---
@@ -201,6 +241,8 @@ class Command(BaseCommand):
                 'seismic_factor': 0.16,
                 'temperature_max': 42,
                 'temperature_min': 9,
+                'latitude': 23.2599,
+                'longitude': 77.4126,
             },
             {
                 'state': 'Chhattisgarh',
@@ -210,6 +252,8 @@ class Command(BaseCommand):
                 'seismic_factor': 0.10,
                 'temperature_max': 40,
                 'temperature_min': 13,
+                'latitude': 21.2514,
+                'longitude': 81.6296,
             },
 
             # --- North-East India ---
@@ -221,6 +265,8 @@ class Command(BaseCommand):
                 'seismic_factor': 0.36,
                 'temperature_max': 28,
                 'temperature_min': 8,
+                'latitude': 25.5788,
+                'longitude': 91.8933,
             },
             {
                 'state': 'Tripura',
@@ -230,6 +276,8 @@ class Command(BaseCommand):
                 'seismic_factor': 0.36,
                 'temperature_max': 35,
                 'temperature_min': 11,
+                'latitude': 23.8315,
+                'longitude': 91.2868,
             },
             {
                 'state': 'Nagaland',
@@ -239,6 +287,8 @@ class Command(BaseCommand):
                 'seismic_factor': 0.36,
                 'temperature_max': 30,
                 'temperature_min': 6,
+                'latitude': 25.6751,
+                'longitude': 94.1086,
             },
             {
                 'state': 'Manipur',
@@ -248,6 +298,8 @@ class Command(BaseCommand):
                 'seismic_factor': 0.36,
                 'temperature_max': 33,
                 'temperature_min': 8,
+                'latitude': 24.817,
+                'longitude': 93.9368,
             },
             {
                 'state': 'Mizoram',
@@ -257,6 +309,8 @@ class Command(BaseCommand):
                 'seismic_factor': 0.36,
                 'temperature_max': 31,
                 'temperature_min': 7,
+                'latitude': 23.7271,
+                'longitude': 92.7176,
             },
             {
                 'state': 'Arunachal Pradesh',
@@ -266,6 +320,8 @@ class Command(BaseCommand):
                 'seismic_factor': 0.36,
                 'temperature_max': 34,
                 'temperature_min': 10,
+                'latitude': 27.0844,
+                'longitude': 93.6053,
             },
         ]
 
@@ -278,6 +334,7 @@ class Command(BaseCommand):
                     f'LocationData table already contains {existing_count} records. Skipping seeding.'
                 )
             )
+            self.fill_coordinates(locations_data)
             return
 
         # Create LocationData objects
@@ -285,6 +342,11 @@ class Command(BaseCommand):
             created_locations = LocationData.objects.bulk_create([
                 LocationData(**location_data) for location_data in locations_data
             ])
+            # bulk_create does not send post_save, so clear the cache explicitly
+            location_cache.invalidate()
+            if location_snapshot.path:
+                # The scheduled rebuild would not outlive this command
+                location_snapshot.rebuild()
             
             self.stdout.write(
                 self.style.SUCCESS(
@@ -303,3 +365,23 @@ class Command(BaseCommand):
             self.stdout.write(
                 self.style.ERROR(f'Error seeding location data: {str(e)}')
             )
+
+    def fill_coordinates(self, locations_data):
+        """Add coordinates to seeded districts stored before they had any."""
+        updated = 0
+        for location_data in locations_data:
+            updated += LocationData.objects.filter(
+                state=location_data['state'],
+                district=location_data['district'],
+                latitude__isnull=True,
+            ).update(
+                latitude=location_data['latitude'],
+                longitude=location_data['longitude'],
+                updated_at=timezone.now(),
+            )
+        if updated:
+            # update() does not send post_save, so clear the cache explicitly
+            location_cache.invalidate()
+            if location_snapshot.path:
+                location_snapshot.rebuild()
+            self.stdout.write(self.style.SUCCESS(f'Added coordinates to {updated} existing location(s).'))
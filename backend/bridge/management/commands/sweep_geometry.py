@@ -0,0 +1,100 @@
+import os
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from bridge.sweep import grid_shape, make_axis, sweep, write_npz
+
+
+class Command(BaseCommand):
+    """
+    Management command to compute the geometry feasibility grid.
+
+    Evaluates the validation rules over carriageway widths x girder spacings
+    x overhangs x girder counts in parallel and writes the validity surface
+    as a bit-packed .npz (see bridge/sweep.py for the format).
+
+    Usage: python manage.py sweep_geometry grid.npz [--workers 8] [--scaling]
+    """
+    help = 'Sweep the geometry rules over a parameter grid and write a bit-packed .npz'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', nargs='?', help='Output .npz file')
+        parser.add_argument(
+            '--carriageway', type=float, nargs=3, default=[4.25, 23.75, 0.05],
+            metavar=('START', 'STOP', 'STEP'),
+            help='Carriageway width axis in metres (default: 4.25 23.75 0.05)',
+        )
+        parser.add_argument(
+            '--spacing', type=float, nargs=3, default=[0.5, 6.0, 0.05],
+            metavar=('START', 'STOP', 'STEP'),
+            help='Girder spacing axis in metres (default: 0.5 6.0 0.05)',
+        )
+        parser.add_argument(
+            '--overhang', type=float, nargs=3, default=[0.0, 3.0, 0.05],
+            metavar=('START', 'STOP', 'STEP'),
+            help='Deck overhang axis in metres (default: 0.0 3.0 0.05)',
+        )
+        parser.add_argument(
+            '--girders', type=int, nargs=2, default=[2, 20],
+            metavar=('MIN', 'MAX'),
+            help='Girder count range (default: 2 20)',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help='Worker processes (default: CPU count)',
+        )
+        parser.add_argument(
+            '--scaling', action='store_true',
+            help='Time the sweep with 1, 2, 4, ... workers up to --workers',
+        )
+
+    def run_sweep(self, axes, workers):
+        started = time.perf_counter()
+        valid = sweep(axes, workers=workers)
+        elapsed = time.perf_counter() - started
+        return valid, elapsed
+
+    def handle(self, *args, **options):
+        try:
+            axes = {
+                'carriageway_width': make_axis(*options['carriageway']),
+                'girder_spacing': make_axis(*options['spacing']),
+                'deck_overhang_width': make_axis(*options['overhang']),
+                'num_girders': make_axis(options['girders'][0], options['girders'][1], 1, integer=True),
+            }
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        shape = grid_shape(axes)
+        points = int(np.prod(shape))
+        workers = options['workers'] or os.cpu_count() or 1
+        self.stdout.write(f'Grid {" x ".join(map(str, shape))} = {points:,} points')
+
+        if options['scaling']:
+            counts = []
+            count = 1
+            while count < workers:
+                counts.append(count)
+                count *= 2
+            counts.append(workers)
+            self.stdout.write(f'{"workers":>7}  {"seconds":>8}  {"points/s":>14}  {"speedup":>7}')
+            baseline = None
+            for count in counts:
+                valid, elapsed = self.run_sweep(axes, count)
+                baseline = baseline or elapsed
+                self.stdout.write(
+                    f'{count:>7}  {elapsed:>8.3f}  {points / elapsed:>14,.0f}  {baseline / elapsed:>6.2f}x'
+                )
+        else:
+            valid, elapsed = self.run_sweep(axes, workers)
+            self.stdout.write(
+                f'{workers} worker(s): {elapsed:.3f}s ({points / elapsed:,.0f} points/s)'
+            )
+
+        self.stdout.write(f'{int(valid.sum()):,} feasible point(s)')
+
+        if options['output']:
+            write_npz(options['output'], axes, valid)
+            self.stdout.write(self.style.SUCCESS(f'Wrote {options["output"]}'))
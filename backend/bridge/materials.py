@@ -0,0 +1,193 @@
+"""
+Materials catalog: steel and concrete grades with their design properties.
+
+SteelGrade and ConcreteGrade rows are read into an immutable
+MaterialRegistry. Server processes load it at startup (wsgi.py/asgi.py
+start registry_refresher) and re-read the grade tables every
+MATERIALS_CHECK_INTERVAL seconds in a background thread, so grades
+changed by another worker process are picked up without any request
+waiting on a query. A grade saved or deleted in this process reloads the
+registry once the change commits (signals.py). A reload builds a new
+registry and swaps it in with one assignment (only if its content version
+changed), so readers never see a partial catalog. Lookups such as
+material_registry().steel['E350'].fy are dict reads with no queries.
+
+Processes that do not start the refresher (manage.py commands, tests)
+load the registry on first use instead; BridgeConfig.ready() only resets
+it, since it also runs before the test database exists. Async code uses
+amaterial_registry(), which does that first load in a worker thread.
+
+- SteelProperties, ConcreteProperties: Immutable property records
+- MaterialRegistry: Grade maps, dropdown options and a content version
+  (the ETag of GET /api/materials/)
+- DEFAULT_STEEL, DEFAULT_CONCRETE: The catalog migration 0007 seeds; also
+  used while the grade tables do not exist yet (before migrate)
+- load_registry(): Rebuild the registry from the database
+- reset_registry(): Forget the registry; the next material_registry() reloads it
+- material_registry(), amaterial_registry(): The current registry
+- registry_refresher: Startup load and periodic re-reads in server processes
+
+Settings:
+- MATERIALS_CHECK_INTERVAL: Seconds between background re-reads of the grade tables
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+from .models import ConcreteGrade, SteelGrade
+
+logger = logging.getLogger(__name__)
+
+SteelProperties = namedtuple('SteelProperties', 'grade fy fu elastic_modulus density thermal_coefficient')
+ConcreteProperties = namedtuple('ConcreteProperties', 'grade fck ecm density thermal_coefficient')
+
+# IS 2062 yield/ultimate strengths (MPa); E = 200 GPa, 7850 kg/m³, 12e-6 /°C
+DEFAULT_STEEL = (
+    SteelProperties('E250', 250, 410, 200000, 7850, 12e-6),
+    SteelProperties('E350', 350, 490, 200000, 7850, 12e-6),
+    SteelProperties('E450', 450, 570, 200000, 7850, 12e-6),
+)
+
+# IRC 112 Table 6.5 secant moduli (MPa); reinforced concrete at 2500 kg/m³, 10e-6 /°C
+DEFAULT_CONCRETE = (
+    ConcreteProperties('M25', 25, 30000, 2500, 10e-6),
+    ConcreteProperties('M30', 30, 31000, 2500, 10e-6),
+    ConcreteProperties('M35', 35, 32000, 2500, 10e-6),
+    ConcreteProperties('M40', 40, 33000, 2500, 10e-6),
+    ConcreteProperties('M45', 45, 34000, 2500, 10e-6),
+    ConcreteProperties('M50', 50, 35000, 2500, 10e-6),
+    ConcreteProperties('M55', 55, 36000, 2500, 10e-6),
+    ConcreteProperties('M60', 60, 37000, 2500, 10e-6),
+)
+
+
+class MaterialRegistry:
+    """Read-only snapshot of the materials catalog."""
+
+    __slots__ = ('steel', 'concrete', 'options', 'version')
+
+    def __init__(self, steel, concrete):
+        set_attribute = super().__setattr__
+        set_attribute('steel', MappingProxyType({grade.grade: grade for grade in steel}))
+        set_attribute('concrete', MappingProxyType({grade.grade: grade for grade in concrete}))
+        # Payload of GET /api/materials/; serialized as-is, never modified
+        set_attribute('options', {
+            'steel_options': list(self.steel),
+            'concrete_options': list(self.concrete),
+            'steel_grades': [grade._asdict() for grade in self.steel.values()],
+            'concrete_grades': [grade._asdict() for grade in self.concrete.values()],
+        })
+        set_attribute('version', hashlib.sha1(
+            json.dumps(self.options, sort_keys=True).encode('utf-8')
+        ).hexdigest()[:16])
+
+    def __setattr__(self, name, value):
+        raise AttributeError('MaterialRegistry is immutable; call load_registry() to replace it')
+
+    def steel_choices(self):
+        """[{"value", "label"}] dropdown entries, e.g. E250 (250 MPa)."""
+        return [{'value': grade.grade, 'label': f'{grade.grade} ({grade.fy:g} MPa)'} for grade in self.steel.values()]
+
+    def concrete_choices(self):
+        return [{'value': grade.grade, 'label': f'{grade.grade} ({grade.fck:g} MPa)'} for grade in self.concrete.values()]
+
+
+_registry = None
+
+
+def load_registry():
+    """
+    Read the grade tables into a new registry and make it current.
+
+    If the tables cannot be read, the current registry is kept; without
+    one (e.g. during the first migrate) the default catalog is used.
+    """
+    global _registry
+    try:
+        steel = [
+            SteelProperties(*row)
+            for row in SteelGrade.objects.order_by('fy', 'grade').values_list(*SteelProperties._fields)
+        ]
+        concrete = [
+            ConcreteProperties(*row)
+            for row in ConcreteGrade.objects.order_by('fck', 'grade').values_list(*ConcreteProperties._fields)
+        ]
+    except DatabaseError:
+        if _registry is not None:
+            logger.warning('Could not read the materials catalog; keeping version %s', _registry.version)
+            return _registry
+        steel, concrete = [], []
+    registry = MaterialRegistry(steel or DEFAULT_STEEL, concrete or DEFAULT_CONCRETE)
+    # Keep the current object (and what was derived from it) when nothing changed
+    if _registry is None or registry.version != _registry.version:
+        _registry = registry
+    return _registry
+
+
+def reset_registry():
+    """Forget the current registry without querying; the next material_registry() loads it."""
+    global _registry
+    _registry = None
+
+
+def material_registry():
+    """Return the current registry, loading it if this process has not done so yet."""
+    return _registry or load_registry()
+
+
+async def amaterial_registry():
+    """Async material_registry(): a first load runs in a worker thread, not on the event loop."""
+    return _registry or await sync_to_async(load_registry)()
+
+
+class RegistryRefresher:
+    """Loads the registry now and re-reads it every MATERIALS_CHECK_INTERVAL seconds in a thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.refreshes = 0
+        self.failed = 0
+
+    def start(self):
+        """Load the registry and start the refresh thread (idempotent)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self.refresh()
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name='bridge-materials-refresh', daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def refresh(self):
+        try:
+            load_registry()
+            self.refreshes += 1
+        except Exception:
+            self.failed += 1
+            logger.exception('Materials catalog refresh failed')
+        finally:
+            connections.close_all()
+
+    def _run(self):
+        while not self._stop.wait(getattr(settings, 'MATERIALS_CHECK_INTERVAL', 30.0)):
+            self.refresh()
+
+
+registry_refresher = RegistryRefresher()
@@ -0,0 +1,270 @@
+"""
+In-process request metrics in the Prometheus text exposition format.
+
+MetricsMiddleware (bridge/middleware.py) times every request and
+record_query, installed as a database execute wrapper on each new
+connection (see signals.py), counts the SQL it issues. Both feed the
+module-level registry, which /metrics renders together with the hit/miss
+counters of the location cache, the validation memo and the buffered
+writer.
+
+Series:
+- bridge_http_requests_total{view,method,status}: Counter
+- bridge_http_request_duration_seconds{view,method}: Histogram
+- bridge_http_response_size_bytes{view}: Histogram of bytes sent (after
+  compression; streamed bodies are counted when the stream ends)
+- bridge_http_compression_input_bytes_total{view,encoding},
+  bridge_http_compression_output_bytes_total{view,encoding}: Counters of
+  body bytes before and after CompressionMiddleware
+- bridge_db_queries_total{view}, bridge_db_query_duration_seconds_total{view}: Counters
+- bridge_cache_hits_total{cache}, bridge_cache_misses_total{cache},
+  bridge_cache_hit_ratio{cache}: Location cache and validation memo
+- bridge_write_buffer_*: Background writer counters
+- bridge_coalesce_leaders_total{view}, bridge_coalesced_requests_total{view},
+  bridge_coalesce_timeouts_total{view}, bridge_coalesce_in_flight: Request
+  coalescing (coalesce.py); coalesced requests were answered with another
+  request's response
+- bridge_location_snapshot_rows, bridge_location_snapshot_swaps_total,
+  bridge_location_snapshot_rebuilds_total: Location snapshot file in use
+
+Requests are labelled by URL name (e.g. "location-by-state"), not path,
+so the number of series stays bounded. Values are per process; with
+several workers, scrape each one or aggregate in Prometheus.
+
+Overhead is a perf_counter pair per request and per query, and one lock
+acquisition per request.
+"""
+
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+
+from .cache import location_cache, validation_memo
+from .coalesce import coalescer
+from .writer import record_writer
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+# Query counters of the request being handled. asgiref copies the context
+# into sync_to_async threads, so async views are counted too.
+_current_queries = contextvars.ContextVar('bridge_metrics_queries', default=None)
+
+
+class QueryCounter:
+    __slots__ = ('count', 'seconds')
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper adding each query to the current request's counters."""
+    counter = _current_queries.get()
+    if counter is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        counter.seconds += time.perf_counter() - started
+        counter.count += 1
+
+
+def start_request():
+    """Begin counting queries for a request; returns the counter and a reset token."""
+    counter = QueryCounter()
+    return counter, _current_queries.set(counter)
+
+
+def end_request(token):
+    _current_queries.reset(token)
+
+
+class Histogram:
+    """Cumulative-on-render bucket counts plus sum and count."""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Per-view request, latency, size and query metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.durations = {}
+        self.sizes = {}
+        self.queries = {}
+        self.query_seconds = {}
+        self.compression = {}
+
+    def observe(self, view, method, status, seconds, size, queries, query_seconds):
+        with self._lock:
+            key = (view, method, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+            histogram = self.durations.get((view, method))
+            if histogram is None:
+                histogram = self.durations[(view, method)] = Histogram(DURATION_BUCKETS)
+            histogram.observe(seconds)
+
+            if size is not None:
+                self._observe_size(view, size)
+
+            self.queries[view] = self.queries.get(view, 0) + queries
+            self.query_seconds[view] = self.query_seconds.get(view, 0.0) + query_seconds
+
+    def observe_size(self, view, size):
+        """Record the size of a streamed body once it has been sent."""
+        with self._lock:
+            self._observe_size(view, size)
+
+    def _observe_size(self, view, size):
+        histogram = self.sizes.get(view)
+        if histogram is None:
+            histogram = self.sizes[view] = Histogram(SIZE_BUCKETS)
+        histogram.observe(size)
+
+    def observe_compression(self, view, encoding, input_size, output_size):
+        with self._lock:
+            key = (view, encoding)
+            totals = self.compression.get(key, (0, 0))
+            self.compression[key] = (totals[0] + input_size, totals[1] + output_size)
+
+    def reset(self):
+        with self._lock:
+            self.requests.clear()
+            self.durations.clear()
+            self.sizes.clear()
+            self.queries.clear()
+            self.query_seconds.clear()
+            self.compression.clear()
+
+    def render(self):
+        """Return every series in the Prometheus text format."""
+        lines = []
+        with self._lock:
+            _counter(lines, 'bridge_http_requests_total', 'HTTP requests handled.', (
+                ({'view': view, 'method': method, 'status': status}, value)
+                for (view, method, status), value in sorted(self.requests.items())
+            ))
+            _histogram(lines, 'bridge_http_request_duration_seconds', 'Request latency.', (
+                ({'view': view, 'method': method}, histogram)
+                for (view, method), histogram in sorted(self.durations.items())
+            ))
+            _histogram(lines, 'bridge_http_response_size_bytes', 'Response body bytes sent.', (
+                ({'view': view}, histogram) for view, histogram in sorted(self.sizes.items())
+            ))
+            _counter(lines, 'bridge_http_compression_input_bytes_total', 'Body bytes before compression.', (
+                ({'view': view, 'encoding': encoding}, totals[0])
+                for (view, encoding), totals in sorted(self.compression.items())
+            ))
+            _counter(lines, 'bridge_http_compression_output_bytes_total', 'Body bytes after compression.', (
+                ({'view': view, 'encoding': encoding}, totals[1])
+                for (view, encoding), totals in sorted(self.compression.items())
+            ))
+            _counter(lines, 'bridge_db_queries_total', 'SQL queries issued.', (
+                ({'view': view}, value) for view, value in sorted(self.queries.items())
+            ))
+            _counter(lines, 'bridge_db_query_duration_seconds_total', 'Time spent in SQL queries.', (
+                ({'view': view}, value) for view, value in sorted(self.query_seconds.items())
+            ))
+
+        caches = {'location': location_cache.stats(), 'geometry_memo': validation_memo.stats()}
+        _counter(lines, 'bridge_cache_hits_total', 'Cache hits.', (
+            ({'cache': name}, stats['hits']) for name, stats in caches.items()
+        ))
+        _counter(lines, 'bridge_cache_misses_total', 'Cache misses.', (
+            ({'cache': name}, stats['misses']) for name, stats in caches.items()
+        ))
+        _gauge(lines, 'bridge_cache_hit_ratio', 'Cache hits / lookups.', (
+            ({'cache': name}, stats['hit_ratio']) for name, stats in caches.items()
+        ))
+
+        coalescing = sorted(coalescer.stats().items())
+        for name, key, help_text in (
+            ('bridge_coalesce_leaders_total', 'leaders', 'Requests that ran their view for others to share.'),
+            ('bridge_coalesced_requests_total', 'coalesced', 'Requests answered with an in-flight identical request\'s response.'),
+            ('bridge_coalesce_timeouts_total', 'timeouts', 'Requests that stopped waiting and ran their view.'),
+        ):
+            _counter(lines, name, help_text, (({'view': view}, counts[key]) for view, counts in coalescing))
+        _gauge(lines, 'bridge_coalesce_in_flight', 'Coalesced computations in flight.', [({}, coalescer.in_flight())])
+
+        snapshot = caches['location']['snapshot']
+        _gauge(lines, 'bridge_location_snapshot_rows', 'Rows in the mapped location snapshot.', [({}, snapshot['rows'])])
+        _counter(lines, 'bridge_location_snapshot_swaps_total', 'Location snapshot files opened.', [({}, snapshot['swaps'])])
+        _counter(lines, 'bridge_location_snapshot_rebuilds_total', 'Location snapshots written by this process.', [
+            ({}, snapshot['rebuilds'])
+        ])
+
+        writer = record_writer.stats()
+        for name, help_text in (
+            ('queued', 'Records queued for the background writer.'),
+            ('written', 'Records written by the background writer.'),
+            ('failed', 'Records dropped after repeated write failures.'),
+            ('batches', 'Bulk inserts performed by the background writer.'),
+        ):
+            _counter(lines, f'bridge_write_buffer_{name}_total', help_text, [({}, writer[name])])
+        _gauge(lines, 'bridge_write_buffer_pending', 'Records waiting to be written.', [({}, writer['pending'])])
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels.items()
+    )
+    return '{' + pairs + '}'
+
+
+def _value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _series(lines, kind, name, help_text, samples):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} {kind}')
+    for labels, value in samples:
+        lines.append(f'{name}{_labels(labels)} {_value(value)}')
+
+
+def _counter(lines, name, help_text, samples):
+    _series(lines, 'counter', name, help_text, samples)
+
+
+def _gauge(lines, name, help_text, samples):
+    _series(lines, 'gauge', name, help_text, samples)
+
+
+def _histogram(lines, name, help_text, samples):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} histogram')
+    for labels, histogram in samples:
+        cumulative = 0
+        for bound, count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else _value(bound)
+            lines.append(f'{name}_bucket{_labels({**labels, "le": le})} {cumulative}')
+        lines.append(f'{name}_sum{_labels(labels)} {_value(histogram.sum)}')
+        lines.append(f'{name}_count{_labels(labels)} {histogram.count}')
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,205 @@
+"""
+Middleware for OSDAG Bridge Module.
+
+Middleware:
+- MetricsMiddleware: Records per-view request metrics (see metrics.py)
+- CompressionMiddleware: Negotiated zstd/br/gzip response compression
+  (see compression.py)
+"""
+
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from . import metrics
+from .compression import ENCODERS, is_compressible, negotiate
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else 'unmatched'
+
+
+def _wrap_stream(response, process, finish, on_close):
+    """
+    Pass a streaming response's chunks through process(chunk), then append finish().
+
+    on_close(size_in, size_out) receives the byte counts when the stream
+    ends or is closed early. Async streams stay async.
+    """
+    sizes = [0, 0]
+
+    def wrapped(content):
+        try:
+            for chunk in content:
+                sizes[0] += len(chunk)
+                data = process(chunk)
+                if data:
+                    sizes[1] += len(data)
+                    yield data
+            data = finish()
+            if data:
+                sizes[1] += len(data)
+                yield data
+        finally:
+            on_close(*sizes)
+
+    async def wrapped_async(content):
+        try:
+            async for chunk in content:
+                sizes[0] += len(chunk)
+                data = process(chunk)
+                if data:
+                    sizes[1] += len(data)
+                    yield data
+            data = finish()
+            if data:
+                sizes[1] += len(data)
+                yield data
+        finally:
+            on_close(*sizes)
+
+    if response.is_async:
+        response.streaming_content = wrapped_async(response.streaming_content)
+    else:
+        response.streaming_content = wrapped(response.streaming_content)
+
+
+class MetricsMiddleware:
+    """
+    Time each request and count its SQL queries.
+
+    Place it first in MIDDLEWARE so the timing covers the rest of the
+    stack. Works under both WSGI and ASGI. Disable with METRICS_ENABLED.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'METRICS_ENABLED', True)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+        started = time.perf_counter()
+        counter, token = metrics.start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        self.record(request, response, time.perf_counter() - started, counter)
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+        started = time.perf_counter()
+        counter, token = metrics.start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        self.record(request, response, time.perf_counter() - started, counter)
+        return response
+
+    def record(self, request, response, seconds, counter):
+        view = _view_name(request)
+        if response.streaming:
+            # The body is only known once it has been sent
+            _wrap_stream(
+                response, bytes, bytes,
+                lambda size_in, size_out: metrics.registry.observe_size(view, size_out)
+            )
+            size = None
+        else:
+            size = len(response.content)
+        metrics.registry.observe(
+            view, request.method, response.status_code, seconds, size,
+            counter.count, counter.seconds
+        )
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with the best encoding the client accepts.
+
+    zstd and br are used when their packages are installed, gzip always
+    (see compression.py). Only text-like bodies of at least
+    COMPRESSION_MIN_SIZE bytes are compressed, and a body is sent as-is
+    if compressing does not make it smaller. Streaming responses (e.g.
+    /api/locations/export/) are compressed chunk by chunk.
+
+    Place it right after MetricsMiddleware, so metrics see the bytes
+    actually sent. Disable with COMPRESSION_ENABLED.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'COMPRESSION_ENABLED', True)
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.process(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process(request, await self.get_response(request))
+
+    def process(self, request, response):
+        if (
+            not self.enabled
+            or response.status_code < 200
+            or response.status_code in (204, 304)
+            or response.has_header('Content-Encoding')
+            or 'no-transform' in response.get('Cache-Control', '')
+            or not is_compressible(response.get('Content-Type'))
+        ):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        # The representation depends on Accept-Encoding from here on
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+        encoder = ENCODERS[encoding]
+        view = _view_name(request)
+
+        if response.streaming:
+            stream = encoder.stream()
+            _wrap_stream(
+                response, stream.compress, stream.finish,
+                lambda size_in, size_out: metrics.registry.observe_compression(view, encoding, size_in, size_out)
+            )
+            del response['Content-Length']
+        else:
+            content = response.content
+            compressed = encoder.compress(content)
+            if len(compressed) >= len(content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+            metrics.registry.observe_compression(view, encoding, len(content), len(compressed))
+
+        # The bytes changed, so a strong validator would no longer be valid
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
+
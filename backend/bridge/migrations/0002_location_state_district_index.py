@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-17 20:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bridge', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='locationdata',
+            index=models.Index(fields=['state', 'district'], name='location_state_district_idx'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2 on 2026-10-17 20:14
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def geometry_key(carriageway_width, girder_spacing, num_girders, deck_overhang_width):
+    """Frozen copy of bridge.geometry.geometry_key as of this migration."""
+    normalized = '|'.join((
+        f'{float(carriageway_width) + 0.0:.6f}',
+        f'{float(girder_spacing) + 0.0:.6f}',
+        f'{int(num_girders):d}',
+        f'{float(deck_overhang_width) + 0.0:.6f}',
+    ))
+    return hashlib.sha256(normalized.encode('ascii')).hexdigest()
+
+
+def fill_input_hash(apps, schema_editor):
+    """Hash existing rows; later duplicates of the same inputs keep a NULL hash."""
+    GeometryData = apps.get_model('bridge', 'GeometryData')
+    seen = set()
+    batch = []
+    for geometry in GeometryData.objects.order_by('id').iterator(chunk_size=2000):
+        key = geometry_key(
+            geometry.carriageway_width,
+            geometry.girder_spacing,
+            geometry.num_girders,
+            geometry.deck_overhang_width
+        )
+        if key in seen:
+            continue
+        seen.add(key)
+        geometry.input_hash = key
+        batch.append(geometry)
+        if len(batch) == 2000:
+            GeometryData.objects.bulk_update(batch, ['input_hash'])
+            batch = []
+    if batch:
+        GeometryData.objects.bulk_update(batch, ['input_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bridge', '0002_location_state_district_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='geometrydata',
+            name='input_hash',
+            field=models.CharField(editable=False, max_length=64, null=True, unique=True),
+        ),
+        migrations.RunPython(fill_input_hash, migrations.RunPython.noop),
+    ]
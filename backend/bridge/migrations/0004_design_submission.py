@@ -0,0 +1,31 @@
+# Generated by Django 4.2 on 2026-10-17 20:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bridge', '0003_geometry_input_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DesignSubmission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('structure_type', models.CharField(choices=[('Highway', 'Highway'), ('Other', 'Other')], default='Highway', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('geometry', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='submissions', to='bridge.geometrydata')),
+                ('location', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='submissions', to='bridge.locationdata')),
+                ('materials', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submissions', to='bridge.materialinput')),
+            ],
+            options={
+                'verbose_name': 'Design Submission',
+                'verbose_name_plural': 'Design Submissions',
+                'ordering': ['-id'],
+            },
+        ),
+    ]
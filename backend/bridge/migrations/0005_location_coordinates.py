@@ -0,0 +1,23 @@
+# Generated by Django 4.2 on 2026-10-17 20:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bridge', '0004_design_submission'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='locationdata',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='locationdata',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-17 20:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bridge', '0005_location_coordinates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='geometrydata',
+            index=models.Index(fields=['valid', 'created_at'], name='geometry_valid_created_idx'),
+        ),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 4.2 on 2026-10-17 20:57
+
+from django.db import migrations, models
+
+# Frozen copy of bridge.materials.DEFAULT_STEEL / DEFAULT_CONCRETE at the time of this migration
+STEEL = [
+    # grade, fy, fu (MPa)
+    ('E250', 250, 410),
+    ('E350', 350, 490),
+    ('E450', 450, 570),
+]
+CONCRETE = [
+    # grade, fck, ecm (MPa)
+    ('M25', 25, 30000),
+    ('M30', 30, 31000),
+    ('M35', 35, 32000),
+    ('M40', 40, 33000),
+    ('M45', 45, 34000),
+    ('M50', 50, 35000),
+    ('M55', 55, 36000),
+    ('M60', 60, 37000),
+]
+
+
+def seed_catalog(apps, schema_editor):
+    SteelGrade = apps.get_model('bridge', 'SteelGrade')
+    ConcreteGrade = apps.get_model('bridge', 'ConcreteGrade')
+    SteelGrade.objects.bulk_create([SteelGrade(grade=grade, fy=fy, fu=fu) for grade, fy, fu in STEEL])
+    ConcreteGrade.objects.bulk_create(
+        [ConcreteGrade(grade=grade, fck=fck, ecm=ecm) for grade, fck, ecm in CONCRETE]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bridge', '0006_geometry_valid_created_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConcreteGrade',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grade', models.CharField(max_length=10, unique=True)),
+                ('fck', models.FloatField()),
+                ('ecm', models.FloatField()),
+                ('density', models.FloatField(default=2500)),
+                ('thermal_coefficient', models.FloatField(default=1e-05)),
+            ],
+            options={
+                'verbose_name': 'Concrete Grade',
+                'verbose_name_plural': 'Concrete Grades',
+                'ordering': ['fck', 'grade'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SteelGrade',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grade', models.CharField(max_length=10, unique=True)),
+                ('fy', models.FloatField()),
+                ('fu', models.FloatField()),
+                ('elastic_modulus', models.FloatField(default=200000)),
+                ('density', models.FloatField(default=7850)),
+                ('thermal_coefficient', models.FloatField(default=1.2e-05)),
+            ],
+            options={
+                'verbose_name': 'Steel Grade',
+                'verbose_name_plural': 'Steel Grades',
+                'ordering': ['fy', 'grade'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='materialinput',
+            name='cross_bracing_steel',
+            field=models.CharField(default='E250', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='materialinput',
+            name='deck_concrete',
+            field=models.CharField(default='M25', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='materialinput',
+            name='girder_steel',
+            field=models.CharField(default='E250', max_length=10),
+        ),
+        migrations.RunPython(seed_catalog, migrations.RunPython.noop),
+    ]
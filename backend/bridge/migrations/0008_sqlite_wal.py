@@ -0,0 +1,30 @@
+# Generated by Django 4.2 on 2026-10-18 09:12
+
+from django.db import migrations
+
+
+def enable_wal(apps, schema_editor):
+    """
+    Switch an SQLite database to the WAL journal.
+
+    The journal mode is stored in the database file, so it is set once
+    here instead of on every connection (bridge/signals.py).
+    """
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA journal_mode = WAL')
+
+
+class Migration(migrations.Migration):
+    # SQLite cannot change the journal mode inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('bridge', '0007_materials_catalog'),
+    ]
+
+    operations = [
+        migrations.RunPython(enable_wal, migrations.RunPython.noop),
+    ]
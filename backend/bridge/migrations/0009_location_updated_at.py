@@ -0,0 +1,20 @@
+# Generated by Django 4.2 on 2026-10-18 09:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bridge', '0008_sqlite_wal'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='locationdata',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
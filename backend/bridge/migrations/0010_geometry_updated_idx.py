@@ -0,0 +1,21 @@
+# Generated by Django 4.2 on 2026-10-17 21:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bridge', '0009_location_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='geometrydata',
+            index=models.Index(fields=['updated_at'], name='geometry_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='geometrydata',
+            index=models.Index(fields=['valid', 'updated_at'], name='geometry_valid_updated_idx'),
+        ),
+    ]
@@ -4,11 +4,16 @@ Django models for OSDAG Bridge Module Group Design Tool.
 Models:
 - LocationData: Stores environmental reference data (wind speed, seismic zone, temperature)
 - GeometryData: Stores geometric parameters from ModifyGeometryModal
+- SteelGrade: Structural steel grades with their design properties
+- ConcreteGrade: Concrete grades with their design properties
 - MaterialInput: Stores selected material grades (steel, concrete)
+- DesignSubmission: A submitted design linking location, geometry and materials
 """
 
 from django.db import models
 
+from .geometry import geometry_key
+
 
 class LocationData(models.Model):
     """
@@ -22,6 +27,9 @@ class LocationData(models.Model):
     - seismic_factor: Seismic acceleration factor
     - temperature_max: Maximum temperature in °C
     - temperature_min: Minimum temperature in °C
+    - latitude, longitude: Coordinates in degrees (optional, for nearest lookup)
+    - updated_at: Timestamp when record was last updated (part of the table
+      version, see bridge.snapshot.table_version)
     """
     state = models.CharField(max_length=100)
     district = models.CharField(max_length=100)
@@ -30,12 +38,18 @@ class LocationData(models.Model):
     seismic_factor = models.FloatField()
     temperature_max = models.FloatField()
     temperature_min = models.FloatField()
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['state', 'district']
         verbose_name = 'Location Data'
         verbose_name_plural = 'Location Data'
         unique_together = ('state', 'district')
+        indexes = [
+            models.Index(fields=['state', 'district'], name='location_state_district_idx'),
+        ]
     
     def __str__(self):
         return f"{self.district}, {self.state}"
@@ -52,8 +66,9 @@ class GeometryData(models.Model):
     - deck_overhang_width: Deck overhang width in meters
     - overall_width: Calculated as carriageway_width + 5
     - valid: Whether the geometry satisfies validation constraints
+    - input_hash: Content hash of the normalized inputs (see geometry.geometry_key)
     - created_at: Timestamp when record was created
-    - updated_at: Timestamp when record was last updated
+    - updated_at: Timestamp when record was last updated or reused (see retention.touch_geometry)
     """
     carriageway_width = models.FloatField()
     girder_spacing = models.FloatField()
@@ -61,6 +76,7 @@ class GeometryData(models.Model):
     deck_overhang_width = models.FloatField()
     overall_width = models.FloatField()
     valid = models.BooleanField(default=False)
+    input_hash = models.CharField(max_length=64, unique=True, null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -68,9 +84,83 @@ class GeometryData(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Geometry Data'
         verbose_name_plural = 'Geometry Data'
+        indexes = [
+            # Valid listings by date
+            models.Index(fields=['valid', 'created_at'], name='geometry_valid_created_idx'),
+            # Retention pruning by last use (updated_at <, and valid=False, updated_at <)
+            models.Index(fields=['updated_at'], name='geometry_updated_idx'),
+            models.Index(fields=['valid', 'updated_at'], name='geometry_valid_updated_idx'),
+        ]
     
     def __str__(self):
         return f"Geometry (Width: {self.carriageway_width}m, Girders: {self.num_girders})"
+    
+    def compute_input_hash(self):
+        return geometry_key(
+            self.carriageway_width,
+            self.girder_spacing,
+            self.num_girders,
+            self.deck_overhang_width
+        )
+    
+    def save(self, *args, **kwargs):
+        if self.input_hash is None:
+            self.input_hash = self.compute_input_hash()
+        super().save(*args, **kwargs)
+
+
+class SteelGrade(models.Model):
+    """
+    A structural steel grade (IS 2062) in the materials catalog.
+    
+    Fields:
+    - grade: Grade designation (e.g., 'E250')
+    - fy: Yield strength in MPa
+    - fu: Ultimate tensile strength in MPa
+    - elastic_modulus: Modulus of elasticity E in MPa
+    - density: Unit mass in kg/m³
+    - thermal_coefficient: Coefficient of thermal expansion per °C
+    """
+    grade = models.CharField(max_length=10, unique=True)
+    fy = models.FloatField()
+    fu = models.FloatField()
+    elastic_modulus = models.FloatField(default=200000)
+    density = models.FloatField(default=7850)
+    thermal_coefficient = models.FloatField(default=12e-6)
+    
+    class Meta:
+        ordering = ['fy', 'grade']
+        verbose_name = 'Steel Grade'
+        verbose_name_plural = 'Steel Grades'
+    
+    def __str__(self):
+        return f"{self.grade} ({self.fy:g} MPa)"
+
+
+class ConcreteGrade(models.Model):
+    """
+    A concrete grade (IRC 112) in the materials catalog.
+    
+    Fields:
+    - grade: Grade designation (e.g., 'M25')
+    - fck: Characteristic cube strength in MPa
+    - ecm: Secant modulus of elasticity in MPa
+    - density: Unit mass of reinforced concrete in kg/m³
+    - thermal_coefficient: Coefficient of thermal expansion per °C
+    """
+    grade = models.CharField(max_length=10, unique=True)
+    fck = models.FloatField()
+    ecm = models.FloatField()
+    density = models.FloatField(default=2500)
+    thermal_coefficient = models.FloatField(default=10e-6)
+    
+    class Meta:
+        ordering = ['fck', 'grade']
+        verbose_name = 'Concrete Grade'
+        verbose_name_plural = 'Concrete Grades'
+    
+    def __str__(self):
+        return f"{self.grade} ({self.fck:g} MPa)"
 
 
 class MaterialInput(models.Model):
@@ -78,51 +168,86 @@ class MaterialInput(models.Model):
     Stores selected material grades for bridge design.
     
     Fields:
-    - girder_steel: Girder steel grade (E250, E350, E450)
-    - cross_bracing_steel: Cross-bracing steel grade (E250, E350, E450)
-    - deck_concrete: Deck concrete grade (M25-M60)
+    - girder_steel: Girder steel grade (a SteelGrade.grade, e.g. E250)
+    - cross_bracing_steel: Cross-bracing steel grade (a SteelGrade.grade)
+    - deck_concrete: Deck concrete grade (a ConcreteGrade.grade, e.g. M25)
     - created_at: Timestamp when record was created
     - updated_at: Timestamp when record was last updated
     """
-    STEEL_CHOICES = [
-        ('E250', 'E250 (250 MPa)'),
-        ('E350', 'E350 (350 MPa)'),
-        ('E450', 'E450 (450 MPa)'),
-    ]
+    # Valid grades come from the materials catalog (bridge.materials), not field choices
+    girder_steel = models.CharField(max_length=10, default='E250')
+    cross_bracing_steel = models.CharField(max_length=10, default='E250')
+    deck_concrete = models.CharField(max_length=10, default='M25')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
-    CONCRETE_CHOICES = [
-        ('M25', 'M25 (25 MPa)'),
-        ('M30', 'M30 (30 MPa)'),
-        ('M35', 'M35 (35 MPa)'),
-        ('M40', 'M40 (40 MPa)'),
-        ('M45', 'M45 (45 MPa)'),
-        ('M50', 'M50 (50 MPa)'),
-        ('M55', 'M55 (55 MPa)'),
-        ('M60', 'M60 (60 MPa)'),
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Material Input'
+        verbose_name_plural = 'Material Inputs'
+    
+    def __str__(self):
+        return f"Materials (Girder: {self.girder_steel}, Concrete: {self.deck_concrete})"
+
+
+class DesignSubmissionQuerySet(models.QuerySet):
+    def with_related(self):
+        return self.select_related('location', 'geometry', 'materials')
+
+
+class DesignSubmission(models.Model):
+    """
+    A submitted bridge design.
+    
+    Fields:
+    - structure_type: Structure type (Highway, Other)
+    - location: Project location (optional)
+    - geometry: Validated geometry (optional)
+    - materials: Selected material grades
+    - created_at: Timestamp when record was created
+    - updated_at: Timestamp when record was last updated
+    
+    Load full designs with DesignSubmission.objects.with_related(), which
+    joins all three references in the same query.
+    """
+    STRUCTURE_CHOICES = [
+        ('Highway', 'Highway'),
+        ('Other', 'Other'),
     ]
     
-    girder_steel = models.CharField(
-        max_length=10,
-        choices=STEEL_CHOICES,
-        default='E250'
+    structure_type = models.CharField(
+        max_length=20,
+        choices=STRUCTURE_CHOICES,
+        default='Highway'
     )
-    cross_bracing_steel = models.CharField(
-        max_length=10,
-        choices=STEEL_CHOICES,
-        default='E250'
+    location = models.ForeignKey(
+        LocationData,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='submissions'
     )
-    deck_concrete = models.CharField(
-        max_length=10,
-        choices=CONCRETE_CHOICES,
-        default='M25'
+    geometry = models.ForeignKey(
+        GeometryData,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='submissions'
+    )
+    materials = models.ForeignKey(
+        MaterialInput,
+        on_delete=models.CASCADE,
+        related_name='submissions'
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = DesignSubmissionQuerySet.as_manager()
+    
     class Meta:
-        ordering = ['-created_at']
-        verbose_name = 'Material Input'
-        verbose_name_plural = 'Material Inputs'
+        ordering = ['-id']
+        verbose_name = 'Design Submission'
+        verbose_name_plural = 'Design Submissions'
     
     def __str__(self):
-        return f"Materials (Girder: {self.girder_steel}, Concrete: {self.deck_concrete})"
+        return f"Design #{self.pk} ({self.structure_type})"
@@ -0,0 +1,157 @@
+"""
+Pagination classes for OSDAG Bridge Module API endpoints.
+
+Classes:
+- LocationKeysetPagination: Keyset (cursor) pagination on (state, district, id)
+- DesignCursorPagination: Newest-first cursor pagination on the primary key
+"""
+
+import base64
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class LocationKeysetPagination(BasePagination):
+    """
+    Keyset pagination matching LocationData.Meta.ordering.
+
+    Each page is fetched with a WHERE (state, district, id) > last-seen
+    predicate (< first-seen, in reverse, for "previous") served by the
+    (state, district) index, so deep pages cost the same as the first one
+    (no OFFSET scan). There is no total count: counting would scan the
+    table on every page.
+
+    Query parameters:
+    - cursor: Opaque position returned in "next" or "previous"
+    - page_size: Rows per page (default PAGE_SIZE, at most max_page_size)
+
+    Response:
+    {
+        "next": "http://.../api/locations/?cursor=...",
+        "previous": null,
+        "results": [...]
+    }
+    """
+    ordering = ('state', 'district', 'id')
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        page_size = api_settings.PAGE_SIZE or 10
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return page_size
+        return min(max(requested, 1), self.max_page_size)
+
+    def encode_cursor(self, position, reverse=False):
+        raw = json.dumps(position + ['before'] if reverse else position, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, request):
+        """Return (state, district, id, reverse) from the cursor parameter, or None."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            if not isinstance(position, list):
+                raise ValueError(position)
+            # "previous" cursors end with "before": rows before the position
+            reverse = position[3:] == ['before']
+            state, district, pk = position[:3] if reverse else position
+        except (TypeError, ValueError, OverflowError):
+            raise NotFound(self.invalid_cursor_message)
+        # Floats (1e999 is inf) and ids beyond a 64-bit column are not positions
+        if type(pk) is not int or not -2 ** 63 <= pk < 2 ** 63:
+            raise NotFound(self.invalid_cursor_message)
+        return str(state), str(district), pk, reverse
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        position = self.decode_cursor(request)
+        reverse = position is not None and position[3]
+        if reverse:
+            queryset = queryset.order_by(*(f'-{field}' for field in self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            state, district, pk, _ = position
+            lookup = 'lt' if reverse else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'state__{lookup}': state}) |
+                Q(**{'state': state, f'district__{lookup}': district}) |
+                Q(**{'state': state, 'district': district, f'id__{lookup}': pk})
+            )
+
+        # One extra row tells us whether there is a page beyond this one
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        # The cursor row itself lies on the other side of this page
+        has_next = has_more if not reverse else True
+        has_previous = has_more if reverse else position is not None
+        self.next_position = self._position(rows[-1]) if has_next and rows else None
+        self.previous_position = self._position(rows[0]) if has_previous and rows else None
+        return rows
+
+    def _position(self, row):
+        if isinstance(row, dict):
+            return [row['state'], row['district'], row['id']]
+        return [row.state, row.district, row.id]
+
+    def _link(self, position, reverse):
+        if position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(position, reverse)
+        )
+
+    def get_next_link(self):
+        return self._link(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        return self._link(self.previous_position, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class DesignCursorPagination(CursorPagination):
+    """
+    Cursor pagination for design submissions, newest first.
+    
+    Pages are fetched with WHERE id < last-seen on the primary key index.
+    page_size goes up to 10000 so large exports need few requests.
+    """
+    ordering = '-id'
+    page_size_query_param = 'page_size'
+    max_page_size = 10000
@@ -0,0 +1,43 @@
+"""
+Renderers for OSDAG Bridge Module API endpoints.
+
+Renderers:
+- FastJSONRenderer: JSONRenderer backed by orjson when it is installed
+- PassthroughRenderer: Lets views return their own (streaming) HttpResponse
+"""
+
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """
+    Render JSON with orjson, falling back to DRF's encoder.
+
+    orjson is used for compact output, with the same output as
+    JSONRenderer; indented output (requested through the Accept header)
+    and installs without orjson use JSONRenderer.
+    """
+    _default = JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Dates go through DRF's encoder, so UTC times still end in "Z"
+        return orjson.dumps(data, default=self._default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+
+
+class PassthroughRenderer(renderers.BaseRenderer):
+    """Accept any media type; the view supplies a finished response."""
+    media_type = '*/*'
+    format = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
@@ -0,0 +1,346 @@
+"""
+Retention for GeometryData.
+
+Every distinct validation input adds a GeometryData row and nothing else
+removes one. compact_geometry deletes rows that no DesignSubmission
+references and that were last used more than older_than_days ago, or
+are invalid and unused for a short grace period (so a design being
+submitted right now cannot lose its geometry). A row is used when it is
+stored or handed out again for repeated inputs: touch_geometry() moves its
+updated_at, at most every TOUCH_INTERVAL per row.
+
+- Rows are selected by primary key in batches of batch_size; each batch
+  is archived and deleted in its own short transaction, with an optional
+  pause between batches, so the SQLite write lock is never held for long
+- Archived rows are appended as JSON lines to gzip files partitioned by
+  creation date: <archive_dir>/geometry/YYYY/MM/geometry-YYYY-MM-DD.jsonl.gz
+  (a failed batch may leave rows in the archive that were not deleted,
+  never the reverse)
+- Deleting sends post_delete, so the validation memo of this process
+  forgets the rows; other processes see deletion_stamp() change and clear
+  theirs (see ValidationMemo)
+
+retention_scheduler runs the same compaction periodically in a background
+thread of the server process when GEOMETRY_RETENTION_ENABLED is set; it is
+started from wsgi.py/asgi.py so management commands never run it. Every
+worker process starts one, so each run first creates
+GEOMETRY_RETENTION_LOCK exclusively (RunLock) and is skipped while
+another process holds it. A lock file left behind by a process that died
+mid-run is taken over after LOCK_STALE_AFTER seconds; the takeover
+renames the stale file away first, so only one process can win it.
+
+Settings:
+- GEOMETRY_RETENTION_ENABLED: Run the periodic task in server processes
+- GEOMETRY_RETENTION_INTERVAL: Seconds between periodic runs
+- GEOMETRY_RETENTION_DAYS: Age after which unreferenced rows are removed (None: keep)
+- GEOMETRY_RETENTION_INVALID: Also remove unreferenced invalid rows of any age
+- GEOMETRY_RETENTION_BATCH_SIZE: Rows per archive/delete transaction
+- GEOMETRY_ARCHIVE_DIR: Archive directory (None: delete without archiving)
+- GEOMETRY_RETENTION_LOCK: Lock file shared by the server processes (None: no
+  locking, for deployments with a single process); "<lock>.deleted" next to it
+  is the deletion stamp
+"""
+
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import timedelta
+from itertools import groupby
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import GeometryData
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FIELDS = (
+    'id',
+    'carriageway_width',
+    'girder_spacing',
+    'num_girders',
+    'deck_overhang_width',
+    'overall_width',
+    'valid',
+    'input_hash',
+    'created_at',
+    'updated_at',
+)
+
+# Invalid rows used more recently than this are kept; a submission may be about to reference them
+INVALID_GRACE = timedelta(hours=1)
+
+# Reused rows get their updated_at moved at most this often; must stay well below INVALID_GRACE
+TOUCH_INTERVAL = timedelta(minutes=10)
+
+# A retention lock file older than this (seconds) belongs to a run that died
+LOCK_STALE_AFTER = 6 * 3600
+
+
+def prunable_geometry(older_than_days=None, invalid=False, now=None):
+    """
+    Unreferenced GeometryData rows selected for removal, by last use (updated_at).
+
+    Raises ValueError when neither criterion is given.
+    """
+    now = now or timezone.now()
+    criteria = Q()
+    if older_than_days is not None:
+        criteria |= Q(updated_at__lt=now - timedelta(days=older_than_days))
+    if invalid:
+        criteria |= Q(valid=False, updated_at__lt=now - INVALID_GRACE)
+    if not criteria:
+        raise ValueError('Give older_than_days and/or invalid to select rows')
+    return GeometryData.objects.filter(criteria, submissions__isnull=True)
+
+
+def touch_geometry(pks, now=None):
+    """
+    Mark reused GeometryData rows as used now, so retention keeps them.
+
+    Rows already touched within TOUCH_INTERVAL are left alone. Returns the
+    number of rows updated.
+    """
+    now = now or timezone.now()
+    return GeometryData.objects.filter(pk__in=pks, updated_at__lt=now - TOUCH_INTERVAL).update(updated_at=now)
+
+
+async def atouch_geometry(pks, now=None):
+    now = now or timezone.now()
+    return await GeometryData.objects.filter(pk__in=pks, updated_at__lt=now - TOUCH_INTERVAL).aupdate(
+        updated_at=now
+    )
+
+
+def needs_touch(updated_at, now=None):
+    """Whether a row last updated at updated_at is due for touch_geometry()."""
+    return updated_at < (now or timezone.now()) - TOUCH_INTERVAL
+
+
+def deletion_stamp():
+    """Path of the file compaction touches after deleting rows, or None without GEOMETRY_RETENTION_LOCK."""
+    path = getattr(settings, 'GEOMETRY_RETENTION_LOCK', None)
+    return Path(f'{path}.deleted') if path else None
+
+
+def archive_path(archive_dir, day):
+    return Path(archive_dir) / 'geometry' / f'{day:%Y}' / f'{day:%m}' / f'geometry-{day:%Y-%m-%d}.jsonl.gz'
+
+
+def write_archive(archive_dir, rows):
+    """Append rows (dicts of ARCHIVE_FIELDS) to their creation-date archive files."""
+    for day, day_rows in groupby(rows, key=lambda row: row['created_at'].date()):
+        path = archive_path(archive_dir, day)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Appending adds a gzip member; gzip readers see one continuous stream
+        with gzip.open(path, 'at', encoding='utf-8') as f:
+            for row in day_rows:
+                f.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+
+
+def compact_geometry(
+    older_than_days=None,
+    invalid=False,
+    batch_size=1000,
+    archive_dir=None,
+    pause=0.0,
+    dry_run=False,
+    stop=None,
+):
+    """
+    Archive and delete prunable GeometryData rows in bounded batches.
+
+    stop is an optional threading.Event checked between batches. Returns
+    {"matched", "archived", "deleted", "batches"}; with dry_run rows are
+    only counted.
+    """
+    queryset = prunable_geometry(older_than_days, invalid)
+    stats = {'matched': 0, 'archived': 0, 'deleted': 0, 'batches': 0}
+    last_id = 0
+
+    while stop is None or not stop.is_set():
+        ids = list(
+            queryset.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        last_id = ids[-1]
+        stats['matched'] += len(ids)
+        if dry_run:
+            continue
+
+        with transaction.atomic():
+            rows = list(queryset.filter(pk__in=ids).order_by('created_at', 'pk').values(*ARCHIVE_FIELDS))
+            if archive_dir and rows:
+                write_archive(archive_dir, rows)
+                stats['archived'] += len(rows)
+            # Re-check references at delete time, so a row referenced meanwhile is kept
+            _, deleted = queryset.filter(pk__in=[row['id'] for row in rows]).delete()
+        stats['deleted'] += deleted.get(GeometryData._meta.label, 0)
+        stats['batches'] += 1
+
+        if pause:
+            time.sleep(pause)
+
+    stamp = deletion_stamp()
+    if stamp is not None and stats['deleted']:
+        # Other processes drop memoized geometry ids when this changes
+        stamp.parent.mkdir(parents=True, exist_ok=True)
+        stamp.write_text(f'{time.time_ns()}\n')
+
+    return stats
+
+
+class RunLock:
+    """
+    Cross-process lock held by the existence of a file, created with O_EXCL.
+
+    acquire() does not wait: it returns False while another process holds
+    the lock. A file older than stale_after seconds is renamed to a name
+    unique to this process and checked to still be the stale file before
+    it is removed, so of several processes taking over at once only one
+    gets the lock. The file holds a token, and release() only removes a
+    file holding this lock's token.
+    """
+
+    def __init__(self, path, stale_after=LOCK_STALE_AFTER):
+        self.path = Path(path)
+        self.stale_after = stale_after
+        self.token = f'{os.getpid()}:{uuid.uuid4().hex}'
+
+    def acquire(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        for _ in range(3):
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    stale = self.path.stat()
+                except FileNotFoundError:
+                    # Released meanwhile
+                    continue
+                if time.time() - stale.st_mtime < self.stale_after or not self._break(stale):
+                    return False
+                continue
+            with os.fdopen(fd, 'w') as f:
+                f.write(f'{self.token}\n')
+            return True
+        return False
+
+    def _break(self, stale):
+        """Remove the stale lock file described by stale; False if a live lock replaced it."""
+        claimed = self.path.with_name(f'{self.path.name}.{uuid.uuid4().hex}.stale')
+        try:
+            os.rename(self.path, claimed)
+        except FileNotFoundError:
+            # Another process removed it first; race for the new file
+            return True
+        try:
+            current = claimed.stat()
+            if (current.st_ino, current.st_mtime_ns) != (stale.st_ino, stale.st_mtime_ns):
+                # Another process took over between stat() and rename(): put its lock back
+                try:
+                    os.link(claimed, self.path)
+                except FileExistsError:
+                    pass
+                return False
+            logger.warning(
+                'Taking over stale lock %s (%.0fs old)', self.path, time.time() - stale.st_mtime
+            )
+            return True
+        finally:
+            claimed.unlink(missing_ok=True)
+
+    def release(self):
+        try:
+            held = self.path.read_text().strip()
+        except FileNotFoundError:
+            return
+        if held == self.token:
+            self.path.unlink(missing_ok=True)
+
+
+class RetentionScheduler:
+    """Background thread running compact_geometry every GEOMETRY_RETENTION_INTERVAL seconds."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.runs = 0
+        self.skipped = 0
+        self.deleted = 0
+        self.failed = 0
+
+    def start(self):
+        """Start the thread if GEOMETRY_RETENTION_ENABLED is set (idempotent)."""
+        if not getattr(settings, 'GEOMETRY_RETENTION_ENABLED', False):
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name='bridge-geometry-retention', daemon=True
+                )
+                self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run_once(self):
+        """
+        Compact once with the configured settings and return the stats.
+
+        Returns None without compacting while another process holds
+        GEOMETRY_RETENTION_LOCK.
+        """
+        path = getattr(settings, 'GEOMETRY_RETENTION_LOCK', None)
+        lock = RunLock(path) if path else None
+        if lock is not None and not lock.acquire():
+            self.skipped += 1
+            return None
+        try:
+            stats = compact_geometry(
+                older_than_days=getattr(settings, 'GEOMETRY_RETENTION_DAYS', None),
+                invalid=getattr(settings, 'GEOMETRY_RETENTION_INVALID', False),
+                batch_size=getattr(settings, 'GEOMETRY_RETENTION_BATCH_SIZE', 1000),
+                archive_dir=getattr(settings, 'GEOMETRY_ARCHIVE_DIR', None),
+                pause=0.05,
+                stop=self._stop,
+            )
+        finally:
+            if lock is not None:
+                lock.release()
+            connections.close_all()
+        self.runs += 1
+        self.deleted += stats['deleted']
+        return stats
+
+    def stats(self):
+        return {'runs': self.runs, 'skipped': self.skipped, 'deleted': self.deleted, 'failed': self.failed}
+
+    def _run(self):
+        interval = getattr(settings, 'GEOMETRY_RETENTION_INTERVAL', 3600)
+        while not self._stop.wait(interval):
+            try:
+                stats = self.run_once()
+                if stats is None:
+                    logger.info('Geometry retention skipped: another process is running it')
+                else:
+                    logger.info('Geometry retention: %s', stats)
+            except Exception:
+                self.failed += 1
+                logger.exception('Geometry retention run failed')
+
+
+retention_scheduler = RetentionScheduler()
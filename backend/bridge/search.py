@@ -0,0 +1,205 @@
+"""
+Search-as-you-type over district names.
+
+Every district is indexed under its normalized name (lower case, accents
+and punctuation removed), under each word of the name, and under the
+other names of its ALIAS_GROUPS entry (e.g. "Gurgaon" for Gurugram):
+
+- Prefix trie: each node keeps the best MAX_PREFIX_MATCHES entries below
+  it, so a prefix lookup is one walk of len(query) nodes. There is one
+  trie over all districts and one per state, so a state-scoped query is
+  never cut short by matches in other states
+- Trigram index: trigram -> entry ids, used when the prefixes do not fill
+  the result list, to tolerate misspellings ("Gurgram", "Banglore")
+
+Results are ranked exact name > name prefix > word prefix > trigram
+similarity (Jaccard), then by shorter name. DistrictSearch builds both
+indexes lazily on the first query and rebuilds them after location_cache
+is invalidated, so queries never touch the database otherwise (with a
+location snapshot, the names are read from the shared file).
+"""
+
+import re
+import unicodedata
+
+from .cache import location_cache
+from .models import LocationData
+
+# Official and common historical/alternate spellings of the same district
+ALIAS_GROUPS = (
+    ('Gurugram', 'Gurgaon'),
+    ('Bengaluru', 'Bangalore'),
+    ('Mumbai', 'Bombay'),
+    ('Chennai', 'Madras'),
+    ('Kolkata', 'Calcutta'),
+    ('Thiruvananthapuram', 'Trivandrum'),
+    ('Visakhapatnam', 'Vishakhapatnam', 'Vizag'),
+    ('Kochi', 'Cochin', 'Ernakulam'),
+    ('Pune', 'Poona'),
+    ('Vadodara', 'Baroda'),
+    ('Mysuru', 'Mysore'),
+    ('Mangaluru', 'Mangalore'),
+    ('Belagavi', 'Belgaum'),
+    ('Kalaburagi', 'Gulbarga'),
+    ('Prayagraj', 'Allahabad'),
+    ('Varanasi', 'Benares', 'Banaras'),
+    ('Puducherry', 'Pondicherry'),
+    ('Thoothukudi', 'Tuticorin'),
+    ('Tiruchirappalli', 'Trichy', 'Tiruchi'),
+    ('Panaji', 'Panjim'),
+    ('Kanpur', 'Cawnpore'),
+    ('Shimla', 'Simla'),
+    ('Nuh', 'Mewat'),
+    ('Ayodhya', 'Faizabad'),
+)
+
+MAX_PREFIX_MATCHES = 50
+MIN_SIMILARITY = 0.3
+
+# Rank tiers, highest first; trigram matches score their similarity (0-1)
+EXACT_SCORE = 4.0
+PREFIX_SCORE = 3.0
+WORD_PREFIX_SCORE = 2.0
+
+
+def normalize(text):
+    """Lower-case ASCII form of a name with punctuation collapsed to single spaces."""
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', text.lower()).split())
+
+
+def trigrams(text):
+    """Character trigrams of a normalized name, padded so short names still have some."""
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class DistrictSearch:
+    """Prefix trie plus trigram index over LocationData district names."""
+
+    def __init__(self):
+        # (generation, index), replaced as a whole so readers never see a mix
+        self._state = None
+
+    def _build(self):
+        snapshot = location_cache.snapshot()
+        if snapshot is not None:
+            rows = snapshot.rows(fields=('id', 'state', 'district'))
+        else:
+            rows = list(LocationData.objects.order_by('state', 'district').values('id', 'state', 'district'))
+        aliases = {}
+        for group in ALIAS_GROUPS:
+            for name in group:
+                aliases[normalize(name)] = [alias for alias in group if alias != name]
+
+        # One entry per (row, indexed name); alias is the spelling that matched, if any
+        entries = []
+        for row in rows:
+            entries.append((row, normalize(row['district']), None))
+            for alias in aliases.get(normalize(row['district']), ()):
+                entries.append((row, normalize(alias), alias))
+
+        # None -> trie over every district, state -> trie over that state's
+        tries = {None: {}}
+        grams = {}
+        for position, (row, key, alias) in enumerate(entries):
+            words = key.split(' ')
+            starts = [key] + [' '.join(words[i:]) for i in range(1, len(words))]
+            for trie in (tries[None], tries.setdefault(row['state'], {})):
+                for depth, start in enumerate(starts):
+                    node = trie
+                    for char in start:
+                        node = node.setdefault(char, {})
+                        node.setdefault('', []).append((len(key), position, depth == 0))
+            for gram in trigrams(key):
+                grams.setdefault(gram, []).append(position)
+
+        # Keep each node's best matches: whole-name prefixes first, then shorter names
+        stack = list(tries.values())
+        while stack:
+            node = stack.pop()
+            for char, child in node.items():
+                if char == '':
+                    continue
+                child[''] = sorted(
+                    set(child['']), key=lambda match: (not match[2], match[0], match[1])
+                )[:MAX_PREFIX_MATCHES]
+                stack.append(child)
+
+        sizes = [len(trigrams(key)) for _, key, _ in entries]
+        return entries, tries, grams, sizes
+
+    def _current(self):
+        state = self._state
+        generation = location_cache.generation
+        if state is None or state[0] != generation:
+            state = (generation, *self._build())
+            self._state = state
+        return state[1:]
+
+    def search(self, query, limit=10, state=None):
+        """
+        Return up to limit ranked matches for query.
+
+        Each match is {"id", "state", "district", "score", "alias"}, where
+        alias is the alternate spelling that matched (or None).
+        """
+        entries, tries, grams, sizes = self._current()
+        key = normalize(query)
+        if not key:
+            return []
+
+        scores = {}
+
+        def offer(position, score):
+            row = entries[position][0]
+            if state is not None and row['state'] != state:
+                return
+            # A row matched under several names keeps its best one
+            if score > scores.get(row['id'], (0, None))[0]:
+                scores[row['id']] = (score, position)
+
+        node = tries.get(state, {})
+        for char in key:
+            node = node.get(char)
+            if node is None:
+                break
+        else:
+            for length, position, whole in node['']:
+                if whole:
+                    exact = entries[position][1] == key
+                    offer(position, EXACT_SCORE if exact else PREFIX_SCORE + len(key) / length)
+                else:
+                    offer(position, WORD_PREFIX_SCORE + len(key) / length)
+
+        if len(scores) < limit and len(key) >= 3:
+            query_grams = trigrams(key)
+            shared = {}
+            for gram in query_grams:
+                for position in grams.get(gram, ()):
+                    shared[position] = shared.get(position, 0) + 1
+            for position, count in shared.items():
+                similarity = count / (len(query_grams) + sizes[position] - count)
+                if similarity >= MIN_SIMILARITY:
+                    offer(position, similarity)
+
+        ranked = sorted(
+            scores.values(),
+            key=lambda match: (-match[0], len(entries[match[1]][1]), entries[match[1]][0]['district'])
+        )[:limit]
+        return [
+            {
+                'id': entries[position][0]['id'],
+                'state': entries[position][0]['state'],
+                'district': entries[position][0]['district'],
+                'score': round(score, 3),
+                'alias': entries[position][2],
+            }
+            for score, position in ranked
+        ]
+
+    def __len__(self):
+        return len(self._current()[0])
+
+
+district_search = DistrictSearch()
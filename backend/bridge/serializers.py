@@ -5,10 +5,12 @@ Serializers:
 - LocationDataSerializer: Serializes LocationData model
 - GeometryDataSerializer: Serializes GeometryData model
 - MaterialInputSerializer: Serializes MaterialInput model
+- DesignSubmissionSerializer: Serializes DesignSubmission with nested references
 """
 
 from rest_framework import serializers
-from .models import LocationData, GeometryData, MaterialInput
+from .materials import material_registry
+from .models import LocationData, GeometryData, MaterialInput, DesignSubmission
 
 
 class LocationDataSerializer(serializers.ModelSerializer):
@@ -25,6 +27,8 @@ class LocationDataSerializer(serializers.ModelSerializer):
             'seismic_factor',
             'temperature_max',
             'temperature_min',
+            'latitude',
+            'longitude',
         ]
         read_only_fields = ['id']
 
@@ -51,23 +55,6 @@ class GeometryDataSerializer(serializers.ModelSerializer):
 class MaterialInputSerializer(serializers.ModelSerializer):
     """Serializer for MaterialInput model."""
     
-    STEEL_OPTIONS = [
-        {'value': 'E250', 'label': 'E250 (250 MPa)'},
-        {'value': 'E350', 'label': 'E350 (350 MPa)'},
-        {'value': 'E450', 'label': 'E450 (450 MPa)'},
-    ]
-    
-    CONCRETE_OPTIONS = [
-        {'value': 'M25', 'label': 'M25 (25 MPa)'},
-        {'value': 'M30', 'label': 'M30 (30 MPa)'},
-        {'value': 'M35', 'label': 'M35 (35 MPa)'},
-        {'value': 'M40', 'label': 'M40 (40 MPa)'},
-        {'value': 'M45', 'label': 'M45 (45 MPa)'},
-        {'value': 'M50', 'label': 'M50 (50 MPa)'},
-        {'value': 'M55', 'label': 'M55 (55 MPa)'},
-        {'value': 'M60', 'label': 'M60 (60 MPa)'},
-    ]
-    
     class Meta:
         model = MaterialInput
         fields = [
@@ -80,9 +67,49 @@ class MaterialInputSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
     
+    def _validate_grade(self, value, grades):
+        if value not in grades:
+            raise serializers.ValidationError(f'Must be one of {list(grades)}')
+        return value
+    
+    def validate_girder_steel(self, value):
+        return self._validate_grade(value, material_registry().steel)
+    
+    def validate_cross_bracing_steel(self, value):
+        return self._validate_grade(value, material_registry().steel)
+    
+    def validate_deck_concrete(self, value):
+        return self._validate_grade(value, material_registry().concrete)
+    
     def to_representation(self, instance):
-        """Add options to serialized data."""
+        """Add options to serialized data (single instances only, not per list row)."""
         ret = super().to_representation(instance)
-        ret['steel_options'] = self.STEEL_OPTIONS
-        ret['concrete_options'] = self.CONCRETE_OPTIONS
+        if self.parent is None:
+            registry = material_registry()
+            ret['steel_options'] = registry.steel_choices()
+            ret['concrete_options'] = registry.concrete_choices()
         return ret
+
+
+class DesignSubmissionSerializer(serializers.ModelSerializer):
+    """
+    Serializer for DesignSubmission with location, geometry and materials nested.
+    
+    Use with DesignSubmission.objects.with_related() so the nested objects
+    come from the same query.
+    """
+    location = LocationDataSerializer(read_only=True)
+    geometry = GeometryDataSerializer(read_only=True)
+    materials = MaterialInputSerializer(read_only=True)
+    
+    class Meta:
+        model = DesignSubmission
+        fields = [
+            'id',
+            'structure_type',
+            'location',
+            'geometry',
+            'materials',
+            'created_at',
+        ]
+        read_only_fields = fields
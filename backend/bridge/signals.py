@@ -0,0 +1,63 @@
+"""
+Signal handlers for OSDAG Bridge Module.
+
+Handlers:
+- invalidate_location_cache: Clears cached LocationData when a row changes
+- forget_geometry: Drops a deleted GeometryData row from the validation memo
+- reload_materials: Rebuilds the materials registry after a grade changes
+- configure_sqlite: Applies settings.SQLITE_PRAGMAS to new SQLite connections
+- instrument_connection: Installs the metrics query counter on new connections
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import metrics
+from .cache import location_cache, validation_memo
+from .materials import load_registry
+from .models import ConcreteGrade, GeometryData, LocationData, SteelGrade
+
+
+@receiver(post_save, sender=LocationData)
+@receiver(post_delete, sender=LocationData)
+def invalidate_location_cache(sender, **kwargs):
+    """Drop cached location data after any LocationData write."""
+    location_cache.invalidate()
+
+
+@receiver(post_delete, sender=GeometryData)
+def forget_geometry(sender, instance, **kwargs):
+    """Stop answering repeated validations with a row that no longer exists."""
+    if instance.input_hash:
+        validation_memo.discard(instance.input_hash)
+
+
+@receiver(post_save, sender=SteelGrade)
+@receiver(post_delete, sender=SteelGrade)
+@receiver(post_save, sender=ConcreteGrade)
+@receiver(post_delete, sender=ConcreteGrade)
+def reload_materials(sender, **kwargs):
+    """Swap in a registry with the changed grade once the change is committed."""
+    transaction.on_commit(load_registry)
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """Tune each new SQLite connection (synchronous, mmap, busy timeout, foreign keys)."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    """Count each connection's queries towards the current request's metrics."""
+    # The wrapper list outlives reconnects, so install it only once
+    if metrics.record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(metrics.record_query)
@@ -0,0 +1,395 @@
+"""
+Memory-mapped columnar snapshots of reference tables.
+
+A snapshot is one read-only file holding a table sorted by its order
+fields, one array per column, so every worker process maps the same
+pages from the OS page cache instead of loading its own copy from the
+database:
+
+    magic (8 bytes) | header length (uint32 LE) | JSON header | column arrays
+
+The header records the content version, row count, fields and, for each
+array, its dtype, length and offset from the first 64-byte boundary after
+the header. Columns are stored by kind:
+
+- int: int64 values
+- float: float64 values, NaN for NULL
+- category: uint16 codes into a list of values kept in the header, for
+  columns with few distinct values (state, seismic_zone)
+- text: int64 offsets into a UTF-8 blob (district)
+
+Readers wrap the arrays with np.frombuffer over the mmap (no copy) and
+build row dicts only for the rows a request needs. The header also keeps
+the row range of each value of the first order field (e.g. a state), and
+rows are sorted by the second one within it, so lookups are a range read
+and a binary search.
+
+Writers build the new file next to the old one and os.replace() it, so a
+reader sees either file, never a mix. SnapshotStore re-stats the path at
+most every check_interval seconds and opens the new file when it changed;
+mappings of the old file stay valid while anything still uses them.
+
+- table_version(queryset), atable_version(queryset): Cheap version stamp of a table
+- write_snapshot(path, queryset, fields, order): Write a snapshot file
+- Snapshot: Read-only view of a snapshot file
+- SnapshotStore: The current snapshot at a configured path, plus rebuilds
+"""
+
+import hashlib
+import json
+import logging
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.db import connections, models, transaction
+from django.db.models import Count, Max
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'BRSNAP01'
+ALIGNMENT = 64
+MAX_CATEGORIES = 65535
+
+
+def _align(position):
+    return -(-position // ALIGNMENT) * ALIGNMENT
+
+
+def _column_kind(field, values):
+    if isinstance(field, (models.AutoField, models.BigAutoField, models.IntegerField)):
+        if None in values:
+            raise ValueError(f'{field.name}: nullable integer columns are not supported')
+        return 'int'
+    if isinstance(field, models.FloatField):
+        return 'float'
+    distinct = set(values)
+    if len(distinct) <= min(MAX_CATEGORIES, len(values) // 2):
+        return 'category'
+    if None in distinct:
+        raise ValueError(f'{field.name}: nullable text columns are not supported')
+    return 'text'
+
+
+def _encode_column(kind, values):
+    """Return (header entry, {array name: ndarray}) for one column."""
+    if kind == 'int':
+        return {'kind': kind}, {'values': np.array(values, dtype='<i8')}
+    if kind == 'float':
+        array = np.array([math.nan if value is None else value for value in values], dtype='<f8')
+        return {'kind': kind, 'null': None in values}, {'values': array}
+    if kind == 'category':
+        categories = sorted(set(values), key=lambda value: (value is None, value or ''))
+        codes = {value: code for code, value in enumerate(categories)}
+        return {'kind': kind, 'categories': categories}, {
+            'codes': np.array([codes[value] for value in values], dtype='<u2')
+        }
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype='<i8')
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return {'kind': kind}, {
+        'offsets': offsets,
+        'data': np.frombuffer(b''.join(encoded), dtype='u1'),
+    }
+
+
+def _version_aggregates(model):
+    aggregates = {'rows': Count('pk'), 'last_id': Max('pk')}
+    if any(field.name == 'updated_at' for field in model._meta.concrete_fields):
+        aggregates['updated_at'] = Max('updated_at')
+    return aggregates
+
+
+def _version_digest(stamp):
+    return hashlib.sha1(repr(sorted(stamp.items())).encode('utf-8')).hexdigest()[:16]
+
+
+def table_version(queryset):
+    """
+    Version of a table from one aggregate query: row count, highest id and
+    latest updated_at (when the model has one).
+
+    Inserts raise the id, deletes lower the count and saves move
+    updated_at, so any change through the ORM changes the version; writes
+    that bypass auto_now (queryset.update) must set updated_at themselves.
+    """
+    return _version_digest(queryset.aggregate(**_version_aggregates(queryset.model)))
+
+
+async def atable_version(queryset):
+    return _version_digest(await queryset.aaggregate(**_version_aggregates(queryset.model)))
+
+
+def write_snapshot(path, queryset, fields, order):
+    """
+    Write queryset's rows to a snapshot file at path and return its version.
+
+    fields must include "id". Rows are sorted by the order fields in Python
+    (not by the database collation), so Snapshot's binary search agrees
+    with the file. The version is table_version(), which
+    LocationCache.version() computes too, so ETags do not change when a
+    worker switches to the file.
+    """
+    fields = list(fields)
+    with transaction.atomic():
+        # Rows and version from the same transaction
+        rows = list(queryset.order_by('id').values_list(*fields))
+        version = table_version(queryset)
+
+    positions = [fields.index(name) for name in order]
+    rows.sort(key=lambda row: tuple(row[position] for position in positions))
+
+    partition = {}
+    for index, row in enumerate(rows):
+        partition.setdefault(row[positions[0]], [index, index])[1] = index + 1
+
+    columns = {}
+    arrays = []
+    offset = 0
+    for position, name in enumerate(fields):
+        values = [row[position] for row in rows]
+        kind = _column_kind(queryset.model._meta.get_field(name), values)
+        entry, column_arrays = _encode_column(kind, values)
+        entry['arrays'] = {}
+        for array_name, array in column_arrays.items():
+            entry['arrays'][array_name] = [array.dtype.str, len(array), offset]
+            arrays.append((offset, array))
+            offset = _align(offset + array.nbytes)
+        columns[name] = entry
+
+    header = json.dumps({
+        'version': version,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'rows': len(rows),
+        'fields': fields,
+        'order': list(order),
+        'partition': partition,
+        'columns': columns,
+    }, separators=(',', ':')).encode('utf-8')
+    start = _align(len(MAGIC) + 4 + len(header))
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    try:
+        with open(temporary, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack('<I', len(header)))
+            f.write(header)
+            for array_offset, array in arrays:
+                f.write(b'\0' * (start + array_offset - f.tell()))
+                f.write(array.tobytes())
+            # Pad to the end of the layout, so empty arrays still lie inside the file
+            f.write(b'\0' * (start + offset - f.tell()))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, path)
+    finally:
+        if temporary.exists():
+            temporary.unlink()
+    return version
+
+
+class Snapshot:
+    """Read-only, memory-mapped view of a snapshot file."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.identity = (stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f'{path} is not a snapshot file')
+        (length,) = struct.unpack_from('<I', self._mmap, len(MAGIC))
+        header = json.loads(self._mmap[len(MAGIC) + 4:len(MAGIC) + 4 + length])
+        start = _align(len(MAGIC) + 4 + length)
+
+        self.version = header['version']
+        self.created_at = header['created_at']
+        self.fields = tuple(header['fields'])
+        self.order = tuple(header['order'])
+        self._rows = header['rows']
+        self._partition = header['partition']
+        self._columns = header['columns']
+        self._arrays = {
+            name: {
+                array_name: np.frombuffer(self._mmap, dtype=dtype, count=count, offset=start + offset)
+                for array_name, (dtype, count, offset) in entry['arrays'].items()
+            }
+            for name, entry in self._columns.items()
+        }
+
+    def __len__(self):
+        return self._rows
+
+    def array(self, name):
+        """The values of an int or float column as a read-only ndarray over the file."""
+        return self._arrays[name]['values']
+
+    def values(self, name, start=0, stop=None):
+        """Python values of one column for rows start..stop (NULLs as None)."""
+        stop = self._rows if stop is None else stop
+        entry = self._columns[name]
+        arrays = self._arrays[name]
+        kind = entry['kind']
+        if kind == 'int':
+            return arrays['values'][start:stop].tolist()
+        if kind == 'float':
+            values = arrays['values'][start:stop].tolist()
+            if entry['null']:
+                values = [None if value != value else value for value in values]
+            return values
+        if kind == 'category':
+            categories = entry['categories']
+            return [categories[code] for code in arrays['codes'][start:stop].tolist()]
+        offsets = arrays['offsets'][start:stop + 1].tolist()
+        if len(offsets) < 2:
+            return []
+        # One copy of the range, then cheap bytes slices
+        base = offsets[0]
+        data = arrays['data'][base:offsets[-1]].tobytes()
+        return [
+            data[begin - base:end - base].decode('utf-8')
+            for begin, end in zip(offsets, offsets[1:])
+        ]
+
+    def rows(self, start=0, stop=None, fields=None):
+        """Row dicts (fields in file order by default) for rows start..stop."""
+        fields = fields or self.fields
+        columns = [self.values(name, start, stop) for name in fields]
+        return [dict(zip(fields, row)) for row in zip(*columns)]
+
+    def take(self, positions, fields=None):
+        """Row dicts for the given row positions."""
+        return [self.rows(position, position + 1, fields)[0] for position in positions]
+
+    def partition(self, value):
+        """(start, stop) row range of a value of the first order field."""
+        bounds = self._partition.get(value)
+        return tuple(bounds) if bounds else (0, 0)
+
+    def partitions(self):
+        """Values of the first order field in file order."""
+        return list(self._partition)
+
+    def find(self, value, key):
+        """The row whose order fields equal (value, key), or None."""
+        start, stop = self.partition(value)
+        name = self.order[1]
+        while start < stop:
+            middle = (start + stop) // 2
+            if self.values(name, middle, middle + 1)[0] < key:
+                start = middle + 1
+            else:
+                stop = middle
+        end = self.partition(value)[1]
+        if start < end and self.values(name, start, start + 1)[0] == key:
+            return self.rows(start, start + 1)[0]
+        return None
+
+
+class SnapshotStore:
+    """
+    The snapshot file at settings.<path_setting>, reopened when it is replaced.
+
+    current() returns None when the setting is unset or the file does not
+    exist yet, so callers fall back to the database.
+    """
+
+    def __init__(self, queryset, fields, order, path_setting, check_interval=1.0, rebuild_delay=1.0):
+        self.queryset = queryset
+        self.fields = tuple(fields)
+        self.order = tuple(order)
+        self.path_setting = path_setting
+        self.check_interval = check_interval
+        self.rebuild_delay = rebuild_delay
+        self._lock = threading.Lock()
+        # (checked_at, path, snapshot), replaced as a whole
+        self._state = (float('-inf'), None, None)
+        self._timer = None
+        self.swaps = 0
+        self.rebuilds = 0
+
+    @property
+    def path(self):
+        path = getattr(settings, self.path_setting, None)
+        return Path(path) if path else None
+
+    def current(self):
+        """Return the current Snapshot or None; re-stats the file at most every check_interval."""
+        checked_at, path, snapshot = self._state
+        if time.monotonic() - checked_at < self.check_interval and path == self.path:
+            return snapshot
+        return self._reload()
+
+    def _reload(self, force=False):
+        with self._lock:
+            now = time.monotonic()
+            checked_at, path, snapshot = self._state
+            if not force and now - checked_at < self.check_interval and path == self.path:
+                return snapshot
+            path = self.path
+            try:
+                stat = os.stat(path) if path else None
+            except FileNotFoundError:
+                stat = None
+            if stat is None:
+                snapshot = None
+            elif snapshot is None or snapshot.identity != (
+                stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size
+            ):
+                try:
+                    snapshot = Snapshot(path)
+                    self.swaps += 1
+                except (OSError, ValueError):
+                    logger.exception('Could not open snapshot %s', path)
+                    snapshot = None
+            self._state = (now, path, snapshot)
+            return snapshot
+
+    def rebuild(self):
+        """Write a new snapshot from the database now and return it."""
+        path = self.path
+        if path is None:
+            raise ValueError(f'settings.{self.path_setting} is not set')
+        write_snapshot(path, self.queryset.all(), self.fields, self.order)
+        self.rebuilds += 1
+        return self._reload(force=True)
+
+    def schedule_rebuild(self):
+        """Rebuild after rebuild_delay seconds in a background thread; calls meanwhile are merged."""
+        if self.path is None:
+            return
+        with self._lock:
+            if self._timer is not None:
+                return
+            self._timer = threading.Timer(self.rebuild_delay, self._scheduled_rebuild)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _scheduled_rebuild(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self.rebuild()
+        except Exception:
+            logger.exception('Snapshot rebuild failed')
+        finally:
+            connections.close_all()
+
+    def stats(self):
+        snapshot = self._state[2]
+        return {
+            'version': snapshot.version if snapshot else None,
+            'rows': len(snapshot) if snapshot else 0,
+            'swaps': self.swaps,
+            'rebuilds': self.rebuilds,
+        }
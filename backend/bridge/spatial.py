@@ -0,0 +1,171 @@
+"""
+Nearest-location lookup for GPS coordinates.
+
+Locations with a latitude and longitude are placed on the unit sphere as
+3-D points and indexed with a KD-tree. Straight-line (chord) distance
+between unit vectors grows with great-circle distance, so the k nearest
+points in 3-D are the k nearest on the Earth, and the haversine distance
+follows from the chord: d = 2R * asin(chord / 2).
+
+- KDTree: Static KD-tree over an (n, 3) array, built with median splits
+  in O(n log n); nearest(point, k) visits O(log n) nodes for small k
+- LocationIndex: KDTree over LocationData rows, built lazily on the first
+  lookup and rebuilt after location_cache is invalidated (any LocationData
+  write, import or seed), so lookups never touch the database otherwise;
+  with a location snapshot the coordinates are read from the shared file
+"""
+
+import heapq
+
+import numpy as np
+
+from .cache import LOCATION_FIELDS, location_cache
+from .models import LocationData
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def to_unit_vectors(latitude, longitude):
+    """Convert degrees of latitude/longitude to points on the unit sphere."""
+    lat = np.radians(np.asarray(latitude, dtype=np.float64))
+    lon = np.radians(np.asarray(longitude, dtype=np.float64))
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def chord_to_km(chord):
+    """Great-circle distance in km for a chord length on the unit sphere."""
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(np.asarray(chord) / 2, 1.0))
+
+
+class KDTree:
+    """
+    Static KD-tree stored as a reordered point array.
+
+    The node for points[lo:hi] is its median at (lo + hi) // 2, split on
+    axes[median]; the halves on either side are its children. Ranges of at
+    most leaf_size points are scanned directly.
+    """
+
+    def __init__(self, points, leaf_size=16):
+        points = np.asarray(points, dtype=np.float64)
+        self.leaf_size = leaf_size
+        self.order = np.arange(len(points))
+        self.axes = np.zeros(len(points), dtype=np.int8)
+        self._build(points, 0, len(points))
+        self.points = points[self.order]
+
+    def __len__(self):
+        return len(self.order)
+
+    def _build(self, points, lo, hi):
+        if hi - lo <= self.leaf_size:
+            return
+        block = points[self.order[lo:hi]]
+        axis = int(np.argmax(block.max(axis=0) - block.min(axis=0)))
+        mid = (hi - lo) // 2
+        self.order[lo:hi] = self.order[lo:hi][np.argpartition(block[:, axis], mid)]
+        self.axes[lo + mid] = axis
+        self._build(points, lo, lo + mid)
+        self._build(points, lo + mid + 1, hi)
+
+    def nearest(self, point, k=1):
+        """Return (positions, distances) of the k nearest points, closest first."""
+        point = np.asarray(point, dtype=np.float64)
+        k = min(k, len(self))
+        # Max-heap of (-squared distance, position) holding the best k so far
+        heap = []
+
+        def offer(position, distance):
+            if len(heap) < k:
+                heapq.heappush(heap, (-distance, position))
+            elif distance < -heap[0][0]:
+                heapq.heapreplace(heap, (-distance, position))
+
+        def search(lo, hi):
+            if hi - lo <= self.leaf_size:
+                if hi > lo:
+                    distances = ((self.points[lo:hi] - point) ** 2).sum(axis=1)
+                    for offset, distance in enumerate(distances.tolist()):
+                        offer(lo + offset, distance)
+                return
+            mid = (lo + hi) // 2
+            axis = self.axes[mid]
+            diff = point[axis] - self.points[mid, axis]
+            offer(mid, float(((self.points[mid] - point) ** 2).sum()))
+            near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+            search(*near)
+            if len(heap) < k or diff * diff < -heap[0][0]:
+                search(*far)
+
+        if k > 0:
+            search(0, len(self))
+        best = sorted((-distance, position) for distance, position in heap)
+        positions = np.array([self.order[position] for _, position in best], dtype=np.int64)
+        distances = np.sqrt(np.array([distance for distance, _ in best], dtype=np.float64))
+        return positions, distances
+
+
+class LocationIndex:
+    """KD-tree over every located LocationData row, kept in step with location_cache."""
+
+    def __init__(self):
+        # (generation, tree, rows), replaced as a whole so readers never see a mix
+        self._state = None
+
+    def _build(self):
+        snapshot = location_cache.snapshot()
+        if snapshot is not None:
+            latitude = snapshot.array('latitude')
+            longitude = snapshot.array('longitude')
+            positions = np.flatnonzero(~(np.isnan(latitude) | np.isnan(longitude)))
+            points = to_unit_vectors(latitude[positions], longitude[positions]).reshape(len(positions), 3)
+            return KDTree(points), _SnapshotRows(snapshot, positions)
+
+        rows = list(
+            LocationData.objects.filter(latitude__isnull=False, longitude__isnull=False)
+            .order_by('id')
+            .values(*LOCATION_FIELDS)
+        )
+        points = to_unit_vectors(
+            [row['latitude'] for row in rows],
+            [row['longitude'] for row in rows],
+        ).reshape(len(rows), 3)
+        return KDTree(points), rows
+
+    def _current(self):
+        state = self._state
+        generation = location_cache.generation
+        if state is None or state[0] != generation:
+            state = (generation, *self._build())
+            self._state = state
+        return state[1], state[2]
+
+    def nearest(self, latitude, longitude, k=1):
+        """Return the k nearest location rows, each with its distance_km."""
+        tree, rows = self._current()
+        positions, chords = tree.nearest(to_unit_vectors(latitude, longitude), k)
+        return [
+            {**rows[position], 'distance_km': round(distance, 3)}
+            for position, distance in zip(positions.tolist(), chord_to_km(chords).tolist())
+        ]
+
+    def __len__(self):
+        return len(self._current()[1])
+
+
+class _SnapshotRows:
+    """Rows of a snapshot by tree position, built only when a lookup returns them."""
+
+    def __init__(self, snapshot, positions):
+        self.snapshot = snapshot
+        self.positions = positions
+
+    def __getitem__(self, position):
+        return self.snapshot.take([int(self.positions[position])])[0]
+
+    def __len__(self):
+        return len(self.positions)
+
+
+location_index = LocationIndex()
+
@@ -0,0 +1,229 @@
+"""
+Parameter-space sweep of the geometry validation rules.
+
+A sweep evaluates validate_geometry_batch over the full outer grid
+carriageway_width x girder_spacing x deck_overhang_width x num_girders.
+The grid is partitioned into boxes of at most BLOCK_POINTS points,
+splitting the carriageway axis first and the following axes when one
+carriageway value alone exceeds the block, and the boxes are evaluated
+with NumPy broadcasting in a ProcessPoolExecutor; the resulting validity
+surface is stored as a bit-packed boolean array. The pool is created on
+the first parallel sweep and reused by later ones (it is replaced only
+when a different worker count is asked for, and shut down at exit), so
+an HTTP request does not fork a fresh set of processes. Its workers are
+started by a forkserver (spawn where that is unavailable), never forked
+from the threaded server process.
+
+Output format (.npz, see write_npz):
+- carriageway_width, girder_spacing, deck_overhang_width, num_girders: axes
+- shape: grid shape in the axis order above
+- valid_bits: np.packbits of the C-ordered boolean grid
+
+Load it back with:
+    data = np.load(path)
+    valid = np.unpackbits(data['valid_bits'], count=data['shape'].prod()).reshape(data['shape']).astype(bool)
+"""
+
+import atexit
+import io
+import itertools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from .geometry import validate_geometry_batch
+
+AXES = ('carriageway_width', 'girder_spacing', 'deck_overhang_width', 'num_girders')
+
+# Grid points evaluated in one NumPy call; bounds the memory of a block
+BLOCK_POINTS = 1_000_000
+
+# Below this many points a process pool costs more than it saves
+PARALLEL_THRESHOLD = 1_000_000
+
+# Longest single axis accepted by make_axis
+MAX_AXIS_LENGTH = 1_000_000
+
+# Default axes: (start, stop, step) in metres, girder counts as (min, max).
+# 79 x 111 x 61 x 19 = 10.2M points, within GeometrySweepView.max_points
+DEFAULT_AXES = {
+    'carriageway_width': (4.25, 23.75, 0.25),
+    'girder_spacing': (0.5, 6.0, 0.05),
+    'deck_overhang_width': (0.0, 3.0, 0.05),
+    'num_girders': (2, 20),
+}
+
+
+def make_axis(start, stop, step, integer=False):
+    """Inclusive axis from start to stop in steps of step."""
+    if step <= 0:
+        raise ValueError('step must be > 0')
+    if stop < start:
+        raise ValueError('stop must be >= start')
+    count = int(np.floor((stop - start) / step + 1e-9)) + 1
+    if count > MAX_AXIS_LENGTH:
+        raise ValueError(f'axis has {count} points; the limit is {MAX_AXIS_LENGTH}')
+    axis = start + step * np.arange(count)
+    if integer:
+        return axis.astype(np.int64)
+    return np.round(axis, 9)
+
+
+def parse_axes(data):
+    """
+    Build sweep axes from a request payload.
+
+    Each axis is optional and given as [start, stop, step] (num_girders as
+    [min, max]); missing axes use DEFAULT_AXES. Raises ValueError.
+    """
+    axes = {}
+    for name in AXES:
+        bounds = data.get(name, DEFAULT_AXES[name])
+        if not isinstance(bounds, (list, tuple)):
+            raise ValueError(f'{name} must be a list of numbers')
+        try:
+            if name == 'num_girders':
+                low, high = (int(value) for value in bounds)
+                axes[name] = make_axis(low, high, 1, integer=True)
+            else:
+                start, stop, step = (float(value) for value in bounds)
+                axes[name] = make_axis(start, stop, step)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f'{name}: {e}')
+    return axes
+
+
+def grid_shape(axes):
+    return tuple(len(axes[name]) for name in AXES)
+
+
+def evaluate_block(carriageway_width, girder_spacing, deck_overhang_width, num_girders):
+    """Validity of one block of the grid, shape (len(cw), len(s), len(o), len(n))."""
+    return validate_geometry_batch(
+        carriageway_width[:, None, None, None],
+        girder_spacing[None, :, None, None],
+        num_girders[None, None, None, :],
+        deck_overhang_width[None, None, :, None],
+    )['valid']
+
+
+def _evaluate_block_args(args):
+    return evaluate_block(*args)
+
+
+_pool_lock = threading.Lock()
+_pool = None
+_pool_workers = None
+
+
+def _mp_context():
+    """forkserver where available, else spawn: forking a threaded server can copy held locks."""
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(method)
+
+
+def _executor(workers):
+    """The shared process pool, (re)created for this worker count."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context())
+            _pool_workers = workers
+        return _pool
+
+
+@atexit.register
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def sweep(axes, workers=None):
+    """
+    Evaluate the rules over the whole grid and return a 4-D boolean array.
+
+    axes maps each name in AXES to a 1-D array. workers is the number of
+    processes (default: os.cpu_count()); small grids run in-process.
+    """
+    carriageway_width = np.asarray(axes['carriageway_width'], dtype=np.float64)
+    girder_spacing = np.asarray(axes['girder_spacing'], dtype=np.float64)
+    deck_overhang_width = np.asarray(axes['deck_overhang_width'], dtype=np.float64)
+    num_girders = np.asarray(axes['num_girders'], dtype=np.int64)
+
+    shape = grid_shape(axes)
+    total_points = int(np.prod(shape))
+    workers = workers or os.cpu_count() or 1
+
+    # Enough blocks to keep every worker busy, each within BLOCK_POINTS
+    boxes = grid_blocks(shape, workers * 4 if workers > 1 else 1)
+    grid = (carriageway_width, girder_spacing, deck_overhang_width, num_girders)
+    tasks = [tuple(axis[part] for axis, part in zip(grid, box)) for box in boxes]
+
+    if workers == 1 or total_points < PARALLEL_THRESHOLD:
+        parts = [_evaluate_block_args(task) for task in tasks]
+    else:
+        try:
+            parts = list(_executor(workers).map(_evaluate_block_args, tasks))
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a fresh pool once
+            shutdown_pool()
+            parts = list(_executor(workers).map(_evaluate_block_args, tasks))
+
+    valid = np.empty(shape, dtype=bool)
+    for box, part in zip(boxes, parts):
+        valid[box] = part
+    return valid
+
+
+def grid_blocks(shape, blocks=1):
+    """
+    Split a grid of shape into at least blocks boxes (where the grid allows)
+    of at most BLOCK_POINTS points each; returns tuples of slices, one per axis.
+
+    Axes are split in order: the first as finely as needed, and the next
+    ones only when a single index of the earlier axes is still too large.
+    """
+    counts = []
+    boxes = 1
+    for index, length in enumerate(shape):
+        inner = int(np.prod(shape[index + 1:]))
+        per_block = BLOCK_POINTS // inner
+        if per_block == 0:
+            # One index of this axis is too large: split the next axes too
+            counts.append(length)
+            boxes *= length
+            continue
+        counts.append(min(length, max(-(-length // per_block), -(-blocks // boxes))))
+        counts.extend([1] * (len(shape) - index - 1))
+        break
+
+    ranges = []
+    for length, count in zip(shape, counts):
+        bounds = np.linspace(0, length, count + 1).round().astype(int)
+        ranges.append([slice(start, stop) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start])
+    return list(itertools.product(*ranges))
+
+
+def write_npz(file, axes, valid):
+    """Write axes and the bit-packed validity grid to file (path or file object)."""
+    np.savez(
+        file,
+        shape=np.asarray(valid.shape, dtype=np.int64),
+        valid_bits=np.packbits(valid.ravel()),
+        **{name: np.asarray(axes[name]) for name in AXES},
+    )
+
+
+def to_npz_bytes(axes, valid):
+    buffer = io.BytesIO()
+    write_npz(buffer, axes, valid)
+    return buffer.getvalue()
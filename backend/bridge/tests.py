@@ -1,3 +1,1139 @@
-from django.test import TestCase
+import asyncio
+import base64
+import csv
+import gzip
+import importlib
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import numpy as np
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+from django.test import (
+    Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings,
+)
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from .benchmarks import (
+    ROUTES,
+    QueryCounter,
+    bench_context,
+    route_request,
+    seed_designs,
+    seed_geometry,
+    seed_locations,
+    seed_materials,
+)
+from .cache import LOCATION_FIELDS, LocationCache, ValidationMemo, location_cache, location_snapshot, validation_memo
+from .coalesce import coalescer, request_key
+from .geometry import geometry_key, solve_geometry, validate_geometry
+from .loads import design_loads
+from .materials import load_registry, material_registry, reset_registry
+from .models import DesignSubmission, GeometryData, LocationData, MaterialInput, SteelGrade
+from .renderers import FastJSONRenderer
+from .retention import LOCK_STALE_AFTER, RetentionScheduler, RunLock, deletion_stamp, prunable_geometry
+from .search import district_search
+from .serializers import LocationDataSerializer, MaterialInputSerializer
+from .sweep import AXES, BLOCK_POINTS, evaluate_block, grid_blocks, grid_shape, parse_axes, sweep
+from .views import GeometrySweepView, LocationDataViewSet
+from .writer import BufferedWriter, record_writer
+
+
+@override_settings(WRITE_BUFFER_ENABLED=False)
+class RouteQueryCountTests(TestCase):
+    """
+    Every route in bridge/urls.py stays within its query budget.
+
+    The limits in bridge.benchmarks.ROUTES do not depend on table size, so
+    a few hundred seeded rows are enough to catch an N+1. The full latency
+    benchmark is the bench_endpoints management command.
+    """
+    rows = 300
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_locations(cls.rows)
+        seed_geometry(cls.rows)
+        seed_materials(cls.rows)
+        seed_designs(cls.rows)
+
+    def setUp(self):
+        location_cache.invalidate()
+        validation_memo.clear()
+        # Load the materials catalog outside the measured requests
+        material_registry()
+        self.context = bench_context()
+
+    def test_routes_within_query_budget(self):
+        for route in ROUTES:
+            with self.subTest(route=route.name):
+                location_cache.invalidate()
+                queries = QueryCounter()
+                with connection.execute_wrapper(queries):
+                    response = route_request(self.client, route, 0, self.context)
+                self.assertLess(response.status_code, 400)
+                self.assertLessEqual(queries.count, route.max_queries)
+
+    def test_cached_reference_routes_skip_the_database(self):
+        cached = {
+            'location-by-state', 'location-by-district', 'location-index', 'location-nearest',
+            'location-search',
+            'async-location-by-state', 'async-location-by-district',
+        }
+        for route in ROUTES:
+            if route.name not in cached:
+                continue
+            with self.subTest(route=route.name):
+                route_request(self.client, route, 0, self.context)
+                with self.assertNumQueries(0):
+                    route_request(self.client, route, 1, self.context)
+
+
+@override_settings(WRITE_BUFFER_ENABLED=False, COMPRESSION_MIN_SIZE=1024)
+class PayloadBudgetTests(TestCase):
+    """
+    Reference-data responses stay within their size budgets.
+
+    Each budget is (path, max bytes uncompressed, max bytes with gzip). A
+    failure means a payload grew (new fields, lost rounding) or stopped
+    being compressed; raise the budget only deliberately.
+    """
+    rows = 300
+    budgets = (
+        ('/api/locations/', 3000, 700),
+        ('/api/locations/?page_size=1000', 80000, 8000),
+        ('/api/materials/', 1500, 400),
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_locations(cls.rows)
+
+    def setUp(self):
+        location_cache.invalidate()
+
+    def test_payloads_within_budget(self):
+        for path, max_bytes, max_gzip_bytes in self.budgets:
+            with self.subTest(path=path):
+                plain = self.client.get(path)
+                self.assertEqual(plain.status_code, 200)
+                self.assertFalse(plain.has_header('Content-Encoding'))
+                self.assertLessEqual(len(plain.content), max_bytes)
+
+                compressed = self.client.get(path, HTTP_ACCEPT_ENCODING='gzip')
+                self.assertEqual(compressed['Content-Encoding'], 'gzip')
+                self.assertIn('Accept-Encoding', compressed['Vary'])
+                self.assertLessEqual(len(compressed.content), max_gzip_bytes)
+                self.assertEqual(json.loads(gzip.decompress(compressed.content)), plain.json())
+
+    def test_streamed_export_is_compressed(self):
+        plain = b''.join(self.client.get('/api/locations/export/').streaming_content)
+        response = self.client.get('/api/locations/export/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), plain)
+
+
+@override_settings(WRITE_BUFFER_ENABLED=False)
+class LocationSnapshotTests(TestCase):
+    """Lookups served from the memory-mapped snapshot match the database and skip it."""
+    rows = 300
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_locations(cls.rows)
+
+    def setUp(self):
+        location_cache.invalidate()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'locations.snap'
+
+    def test_snapshot_matches_database(self):
+        state = LocationData.objects.order_by('state').values_list('state', flat=True)[0]
+        rows = location_cache.get_state_locations(state)
+        expected = {
+            'version': location_cache.version(),
+            'index': location_cache.index(),
+            'location': location_cache.get_location(state, rows[-1]['district']),
+        }
+
+        with override_settings(LOCATION_SNAPSHOT_PATH=self.path):
+            location_snapshot.rebuild()
+            with self.assertNumQueries(0):
+                self.assertEqual(location_cache.get_state_locations(state), rows)
+                self.assertEqual(location_cache.version(), expected['version'])
+                self.assertEqual(location_cache.index(), expected['index'])
+                self.assertEqual(location_cache.get_location(state, rows[-1]['district']), expected['location'])
+                self.assertIsNone(location_cache.get_location(state, 'No Such District'))
+
+            # A change makes this process read the database until the file is rebuilt
+            LocationData.objects.filter(pk=rows[0]['id']).update(temperature_max=99.0)
+            location_cache.invalidate()
+            self.assertEqual(location_cache.get_state_locations(state)[0]['temperature_max'], 99.0)
+            location_snapshot.rebuild()
+            with self.assertNumQueries(0):
+                self.assertEqual(location_cache.get_state_locations(state)[0]['temperature_max'], 99.0)
+
+
+class CoalescingTests(SimpleTestCase):
+    """Concurrent identical reads run the view once and share its response."""
+    clients = 8
+
+    def setUp(self):
+        coalescer.reset()
+
+    def test_concurrent_requests_share_one_response(self):
+        calls = []
+
+        def slow_registry():
+            calls.append(1)
+            # Keep the leader in flight until the other requests have joined it
+            time.sleep(0.2)
+            return material_registry()
+
+        responses = [None] * self.clients
+
+        def fetch(index):
+            responses[index] = Client().get('/api/materials/')
+
+        threads = [threading.Thread(target=fetch, args=(i,)) for i in range(self.clients)]
+        with mock.patch('bridge.views.material_registry', slow_registry):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(calls), 1)
+        bodies = {response.content for response in responses}
+        self.assertEqual(len(bodies), 1)
+        self.assertTrue(all(response.status_code == 200 for response in responses))
+        self.assertEqual(len({response['ETag'] for response in responses}), 1)
+        self.assertEqual(
+            coalescer.stats()['MaterialOptionsView'],
+            {'leaders': 1, 'coalesced': self.clients - 1, 'timeouts': 0}
+        )
+
+    def test_concurrent_viewset_requests_share_one_response(self):
+        calls = []
+
+        def slow_state_locations(state):
+            calls.append(state)
+            time.sleep(0.2)
+            return [{'id': 1, 'state': state, 'district': 'Mumbai'}]
+
+        responses = [None] * self.clients
+
+        def fetch(index):
+            responses[index] = Client().get('/api/locations/by_state/', {'state': 'Maharashtra'})
+
+        threads = [threading.Thread(target=fetch, args=(i,)) for i in range(self.clients)]
+        with mock.patch.object(location_cache, 'version', return_value='v1'), \
+                mock.patch.object(location_cache, 'get_state_locations', slow_state_locations):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(calls, ['Maharashtra'])
+        self.assertEqual(len({response.content for response in responses}), 1)
+        self.assertTrue(all(response.status_code == 200 for response in responses))
+        self.assertEqual(
+            coalescer.stats()['LocationDataViewSet.by_state'],
+            {'leaders': 1, 'coalesced': self.clients - 1, 'timeouts': 0}
+        )
+
+    @override_settings(ALLOWED_HOSTS=['a.example', 'b.example'])
+    def test_requests_for_other_hosts_are_not_shared(self):
+        factory = RequestFactory()
+        keys = {
+            request_key(factory.get('/api/locations/', HTTP_HOST=host, secure=secure), 'view')
+            for host in ('a.example', 'b.example') for secure in (False, True)
+        }
+        self.assertEqual(len(keys), 4)
+
+        calls = []
+
+        def slow_state_locations(state):
+            calls.append(state)
+            time.sleep(0.2)
+            return []
+
+        def fetch(host):
+            Client().get('/api/locations/by_state/', {'state': 'Goa'}, HTTP_HOST=host)
+
+        threads = [threading.Thread(target=fetch, args=(host,)) for host in ('a.example', 'b.example') * 3]
+        with mock.patch.object(location_cache, 'version', return_value='v1'), \
+                mock.patch.object(location_cache, 'get_state_locations', slow_state_locations):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(calls, ['Goa', 'Goa'])
+        self.assertEqual(coalescer.stats()['LocationDataViewSet.by_state']['leaders'], 2)
+
+    def test_async_waiters_share_one_result(self):
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return b'payload'
+
+        async def run():
+            return await asyncio.gather(*(coalescer.ado('key', compute, 'test') for _ in range(self.clients)))
+
+        results = asyncio.run(run())
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([leader for _, leader in results].count(True), 1)
+        self.assertEqual({result for result, _ in results}, {b'payload'})
+        self.assertEqual(coalescer.stats()['test']['coalesced'], self.clients - 1)
+        self.assertEqual(coalescer.in_flight(), 0)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'SQLite profile')
+class SQLiteProfileTests(TestCase):
+    def test_connections_get_the_configured_pragmas(self):
+        # synchronous=NORMAL reads back as 1, foreign_keys=ON as 1
+        expected = {'synchronous': 1, 'busy_timeout': 20000, 'foreign_keys': 1}
+        with connection.cursor() as cursor:
+            for name, value in expected.items():
+                with self.subTest(pragma=name):
+                    cursor.execute(f'PRAGMA {name}')
+                    self.assertEqual(cursor.fetchone()[0], value)
+        # Persistent modes are set once by a migration, not per connection
+        self.assertNotIn('journal_mode', settings.SQLITE_PRAGMAS)
+
+    def test_migration_switches_the_file_to_wal(self):
+        migration = importlib.import_module('bridge.migrations.0008_sqlite_wal')
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'db.sqlite3'
+            database = SQLiteDatabaseWrapper({**connection.settings_dict, 'NAME': str(path)})
+            try:
+                migration.enable_wal(None, SimpleNamespace(connection=database))
+            finally:
+                database.close()
+            with sqlite3.connect(path) as check:
+                self.assertEqual(check.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+
+
+class AsyncViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = LocationData.objects.create(
+            state='Maharashtra', district='Mumbai', basic_wind_speed=44, seismic_zone='III',
+            seismic_factor=0.16, temperature_max=38, temperature_min=16,
+        )
+
+    def setUp(self):
+        # Cold, as in a process that has not started registry_refresher
+        reset_registry()
+        self.addCleanup(reset_registry)
+        location_cache.invalidate()
+        validation_memo.clear()
+
+    async def test_materials_with_a_cold_registry(self):
+        response = await self.async_client.get('/api/async/materials/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('E250', response.json()['steel_options'])
+
+    async def test_submit_with_a_cold_registry(self):
+        response = await self.async_client.post('/api/async/submit/', {
+            'location_id': self.location.id,
+            'materials': {'girder_steel': 'E350', 'deck_concrete': 'M30'},
+            'sync': True,
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        design = await DesignSubmission.objects.select_related('materials').aget(id=response.json()['design_id'])
+        self.assertEqual((design.location_id, design.materials.girder_steel), (self.location.id, 'E350'))
+
+    async def test_by_state_revalidates_with_etag(self):
+        response = await self.async_client.get('/api/async/locations/by_state/', {'state': 'Maharashtra'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['district'] for row in response.json()], ['Mumbai'])
+
+        response = await self.async_client.get(
+            '/api/async/locations/by_state/', {'state': 'Maharashtra'},
+            headers={'If-None-Match': response['ETag']},
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_repeated_validation_reuses_the_stored_row(self):
+        payload = {
+            'carriageway_width': 7.5, 'girder_spacing': 2.5, 'num_girders': 4,
+            'deck_overhang_width': 2.5, 'sync': True,
+        }
+        ids = []
+        for _ in range(2):
+            response = await self.async_client.post(
+                '/api/async/geometry/validate/', payload, content_type='application/json'
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.json()['valid'])
+            ids.append(response.json()['geometry_id'])
+        self.assertEqual(ids[0], ids[1])
+        self.assertEqual(await GeometryData.objects.acount(), 1)
+
+
+class MaterialRegistryTests(TestCase):
+    def setUp(self):
+        reset_registry()
+        self.addCleanup(reset_registry)
+
+    def test_lookups_never_query_once_loaded(self):
+        registry = material_registry()
+        # A queryset update sends no signals, like a write made by another process
+        SteelGrade.objects.filter(grade='E250').update(fy=260)
+        with override_settings(MATERIALS_CHECK_INTERVAL=0), self.assertNumQueries(0):
+            self.assertIs(material_registry(), registry)
+
+        # What the refresher thread runs every MATERIALS_CHECK_INTERVAL seconds
+        load_registry()
+        self.assertEqual(material_registry().steel['E250'].fy, 260)
+
+    def test_unchanged_catalog_keeps_the_registry(self):
+        registry = material_registry()
+        self.assertIs(load_registry(), registry)
+
+    def test_failed_read_keeps_the_registry(self):
+        registry = material_registry()
+        with mock.patch.object(SteelGrade.objects, 'order_by', side_effect=DatabaseError('locked')):
+            with self.assertLogs('bridge.materials', 'WARNING'):
+                self.assertIs(load_registry(), registry)
+
+
+class DesignLoadDetailTests(TestCase):
+    def setUp(self):
+        self.location = LocationData.objects.create(
+            state='Maharashtra', district='Mumbai', basic_wind_speed=44, seismic_zone='III',
+            seismic_factor=0.16, temperature_max=38, temperature_min=16,
+        )
+        self.geometry = GeometryData.objects.create(
+            carriageway_width=7.5, girder_spacing=2.5, num_girders=4, deck_overhang_width=2.5,
+            overall_width=12.5, valid=True,
+        )
+        self.materials = MaterialInput.objects.create(deck_concrete='M40')
+
+    def test_loads_of_a_stored_design(self):
+        design = DesignSubmission.objects.create(
+            location=self.location, geometry=self.geometry, materials=self.materials
+        )
+        response = self.client.get(f'/api/designs/{design.id}/loads/', {'risk_factor': 1.15})
+        self.assertEqual(response.status_code, 200)
+
+        factors = response.json()['factors']
+        self.assertEqual(factors['risk_factor'], 1.15)
+        self.assertEqual(factors['thermal_coefficient'], material_registry().concrete['M40'].thermal_coefficient)
+        self.assertEqual(response.json()['loads'], design_loads(self.location, self.geometry, factors))
+
+    def test_bad_factors_are_rejected(self):
+        base = {'location_ids': [self.location.id], 'geometry_ids': [self.geometry.id]}
+        for override in ({'deck_concrete': [1]}, {'deck_concrete': {'M40': 1}}, {'risk_factor': -1}):
+            with self.subTest(override=override):
+                response = self.client.post('/api/loads/', {**base, **override}, content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+        body = json.dumps(base)[:-1] + ', "gust_factor": 1e400}'
+        response = self.client.post('/api/loads/', body, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], ['gust_factor must be a finite number > 0'])
+
+        design = DesignSubmission.objects.create(
+            location=self.location, geometry=self.geometry, materials=self.materials
+        )
+        response = self.client.get(f'/api/designs/{design.id}/loads/', {'risk_factor': 'inf'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_design_without_geometry_is_rejected(self):
+        design = DesignSubmission.objects.create(location=self.location, materials=self.materials)
+        response = self.client.get(f'/api/designs/{design.id}/loads/')
+        self.assertEqual(response.status_code, 400)
+
+
+class LocationCacheTests(TestCase):
+    def test_unknown_states_are_not_cached(self):
+        location_cache.invalidate()
+        for i in range(20):
+            self.assertEqual(location_cache.get_state_locations(f'Nowhere {i}'), [])
+            self.assertIsNone(asyncio.run(location_cache.aget_location(f'Elsewhere {i}', 'X')))
+        self.assertEqual(location_cache._states, {})
+
+
+class LocationChangeTests(TestCase):
+    def test_check_picks_up_changes_from_other_processes(self):
+        LocationData.objects.create(
+            state='State C', district='Alpha', basic_wind_speed=39, seismic_zone='III',
+            seismic_factor=0.16, temperature_max=40, temperature_min=10,
+        )
+        location_cache.invalidate()
+        self.assertFalse(location_cache.check())
+        self.assertEqual(location_cache.get_location('State C', 'Alpha')['basic_wind_speed'], 39)
+        version = location_cache.version()
+
+        # As another process would: no signals, so no invalidate() here
+        LocationData.objects.filter(state='State C').update(
+            basic_wind_speed=50, updated_at=timezone.now() + timedelta(seconds=1)
+        )
+        self.assertEqual(location_cache.get_location('State C', 'Alpha')['basic_wind_speed'], 39)
+        self.assertTrue(location_cache.check())
+        self.assertEqual(location_cache.get_location('State C', 'Alpha')['basic_wind_speed'], 50)
+        self.assertNotEqual(location_cache.version(), version)
+        self.assertFalse(location_cache.check())
+
+    def test_version_is_one_query(self):
+        location_cache.invalidate()
+        with self.assertNumQueries(1):
+            location_cache.version()
+
+
+class KeysetCursorTests(TestCase):
+    def test_malformed_cursors_are_not_found(self):
+        positions = ('["A", "B", 1e999]', '["A", "B", 1.5]', '["A", "B", true]', '["A", "B", 99999999999999999999]')
+        for position in positions:
+            with self.subTest(position=position):
+                cursor = base64.urlsafe_b64encode(position.encode('ascii')).decode('ascii')
+                response = self.client.get('/api/locations/', {'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+
+    def test_next_and_previous_walk_every_row(self):
+        values = {
+            'basic_wind_speed': 39, 'seismic_zone': 'III', 'seismic_factor': 0.16,
+            'temperature_max': 40, 'temperature_min': 10,
+        }
+        LocationData.objects.bulk_create([
+            LocationData(state=f'State {i % 3}', district=f'District {i:02d}', **values) for i in range(11)
+        ])
+        expected = list(
+            LocationData.objects.order_by('state', 'district', 'id').values_list('state', 'district', 'id')
+        )
+
+        pages = []
+        url = '/api/locations/?page_size=3'
+        while url:
+            body = self.client.get(url).json()
+            pages.append([(row['state'], row['district'], row['id']) for row in body['results']])
+            self.assertEqual(body['previous'] is None, len(pages) == 1)
+            url = body['next']
+        self.assertEqual([row for page in pages for row in page], expected)
+        self.assertEqual([len(page) for page in pages], [3, 3, 3, 2])
+
+        # Back from the last page, one page at a time
+        url = body['previous']
+        for page in reversed(pages[:-1]):
+            body = self.client.get(url).json()
+            self.assertEqual([(row['state'], row['district'], row['id']) for row in body['results']], page)
+            self.assertIsNotNone(body['next'])
+            url = body['previous']
+        self.assertIsNone(url)
+
+
+class LocationExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        values = {
+            'basic_wind_speed': 39, 'seismic_zone': 'III', 'seismic_factor': 0.16,
+            'temperature_max': 40, 'temperature_min': 10,
+        }
+        LocationData.objects.bulk_create([
+            LocationData(state=state, district=f'District {i}', **values)
+            for state in ('Kerala', 'Goa') for i in range(5)
+        ] + [LocationData(state='Goa', district='Panaji, North', latitude=15.49, longitude=73.82, **values)])
+
+    def test_ndjson_streams_every_row_in_order(self):
+        with mock.patch.object(LocationDataViewSet, 'export_chunk_size', 4):
+            response = self.client.get('/api/locations/export/')
+            self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+            rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(rows, list(LocationData.objects.order_by('state', 'district', 'id').values(*LOCATION_FIELDS)))
+
+    def test_csv_is_filtered_and_quoted(self):
+        response = self.client.get('/api/locations/export/', {'output': 'csv', 'state': 'Goa'})
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('locations.csv', response['Content-Disposition'])
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode('utf-8'))))
+        self.assertEqual(tuple(rows[0]), LOCATION_FIELDS)
+        self.assertEqual(len(rows), 7)
+        self.assertEqual({row[1] for row in rows[1:]}, {'Goa'})
+        self.assertIn('Panaji, North', [row[2] for row in rows[1:]])
+
+    def test_unknown_output_is_rejected(self):
+        response = self.client.get('/api/locations/export/', {'output': 'xml'})
+        self.assertEqual(response.status_code, 400)
+
+
+class DistrictSearchTests(TestCase):
+    def test_state_scoped_prefix_is_not_crowded_out(self):
+        values = {
+            'basic_wind_speed': 39, 'seismic_zone': 'III', 'seismic_factor': 0.16,
+            'temperature_max': 40, 'temperature_min': 10,
+        }
+        LocationData.objects.bulk_create(
+            [LocationData(state='State A', district=f'Rai {i:02d}', **values) for i in range(60)]
+            + [LocationData(state='State B', district='Rampur Khas', **values)]
+        )
+        location_cache.invalidate()
+
+        results = district_search.search('ra', limit=10, state='State B')
+        self.assertEqual([result['district'] for result in results], ['Rampur Khas'])
+
+
+class SweepDefaultsTests(SimpleTestCase):
+    def test_default_grid_within_request_limit(self):
+        points = 1
+        for length in grid_shape(parse_axes({})):
+            points *= length
+        self.assertLessEqual(points, GeometrySweepView.max_points)
+
+    def test_blocks_are_bounded_on_every_axis(self):
+        shape = (1, 2000, 2000, 3)
+        boxes = grid_blocks(shape, 8)
+        sizes = [np.prod([part.stop - part.start for part in box]) for box in boxes]
+        self.assertLessEqual(max(sizes), BLOCK_POINTS)
+        self.assertEqual(sum(sizes), np.prod(shape))
+
+    def test_split_grid_matches_one_block(self):
+        axes = parse_axes({
+            'carriageway_width': [7.5, 7.5, 1], 'girder_spacing': [0.5, 6.0, 0.05],
+            'deck_overhang_width': [0.0, 3.0, 0.05], 'num_girders': [2, 20],
+        })
+        with mock.patch('bridge.sweep.BLOCK_POINTS', 500):
+            valid = sweep(axes, workers=1)
+        self.assertTrue(valid.any())
+        expected = evaluate_block(*(np.asarray(axes[name]) for name in AXES))
+        np.testing.assert_array_equal(valid, expected)
+
+
+class BufferedWriterTests(TransactionTestCase):
+    def test_duplicate_geometry_resolves_to_existing_row(self):
+        inputs = (7.5, 2.5, 4, 1.0)
+        key = geometry_key(*inputs)
+        fields = dict(zip(
+            ('carriageway_width', 'girder_spacing', 'num_girders', 'deck_overhang_width'), inputs
+        ))
+        existing = GeometryData.objects.create(overall_width=9.5, input_hash=key, **fields)
+
+        writer = BufferedWriter(flush_interval=0.01)
+        token = writer.submit(GeometryData(overall_width=9.5, input_hash=key, **fields))
+        writer.flush()
+        writer.shutdown()
+
+        self.assertEqual(writer.resolve(token), existing.pk)
+        self.assertEqual(writer.written, 0)
+        self.assertEqual(GeometryData.objects.filter(input_hash=key).count(), 1)
+
+    def test_bad_record_is_counted_and_the_rest_are_written(self):
+        writer = BufferedWriter(flush_interval=0.05)
+        tokens = []
+        with self.assertLogs('bridge.writer', 'WARNING'):
+            for i in range(4):
+                inputs = (7.5 + i, 2.5, 4, 1.0)
+                tokens.append(writer.submit(GeometryData(
+                    carriageway_width=inputs[0], girder_spacing=2.5, num_girders=4, deck_overhang_width=1.0,
+                    # NaN is stored as NULL, violating NOT NULL
+                    overall_width=float('nan') if i == 2 else inputs[0] + 5,
+                    input_hash=geometry_key(*inputs),
+                )))
+            writer.flush()
+            writer.shutdown()
+
+        self.assertEqual(GeometryData.objects.count(), 3)
+        self.assertEqual((writer.written, writer.failed), (3, 1))
+        self.assertIsNone(writer.resolve(tokens[2]))
+
+    def test_design_is_dropped_only_with_its_failed_materials(self):
+        writer = BufferedWriter(flush_interval=0.05)
+        good = MaterialInput(deck_concrete='M30')
+        bad = MaterialInput(deck_concrete=None)
+        with self.assertLogs('bridge.writer', 'WARNING'):
+            for material in (good, bad):
+                writer.submit(material)
+            kept = writer.submit(DesignSubmission(materials=good))
+            writer.submit(DesignSubmission(materials=bad))
+            writer.flush()
+            writer.shutdown()
+
+        self.assertEqual(list(DesignSubmission.objects.values_list('id', flat=True)), [writer.resolve(kept)])
+        self.assertEqual((writer.written, writer.failed), (2, 2))
+
+    def test_records_are_written_in_batches(self):
+        writer = BufferedWriter(batch_size=10, flush_interval=0.2)
+        tokens = [writer.submit(MaterialInput()) for _ in range(25)]
+        writer.flush()
+        self.assertEqual(MaterialInput.objects.count(), 25)
+        self.assertEqual((writer.written, writer.batches), (25, 3))
+        self.assertEqual(len({writer.resolve(token) for token in tokens}), 25)
+        writer.shutdown()
+
+    def test_partial_batch_is_written_after_the_flush_interval(self):
+        writer = BufferedWriter(flush_interval=0.05)
+        token = writer.submit(MaterialInput())
+        deadline = time.monotonic() + 5
+        while writer.resolve(token) is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertIsNotNone(writer.resolve(token))
+        writer.shutdown()
+
+    def test_shutdown_drains_the_queue(self):
+        writer = BufferedWriter(flush_interval=60)
+        tokens = [writer.submit(MaterialInput()) for _ in range(3)]
+        writer.shutdown(timeout=5)
+        self.assertEqual(MaterialInput.objects.count(), 3)
+        self.assertTrue(all(writer.resolve(token) for token in tokens))
+
+    @override_settings(WRITE_BUFFER_ENABLED=True)
+    def test_views_answer_before_the_write(self):
+        validation_memo.clear()
+        payload = {'carriageway_width': 7.5, 'girder_spacing': 2.5, 'num_girders': 4, 'deck_overhang_width': 2.5}
+        response = self.client.post('/api/geometry/validate/', payload, content_type='application/json')
+        self.assertEqual(response.status_code, 202)
+        self.assertIsNone(response.json()['geometry_id'])
+        token = response.json()['write_token']
+
+        record_writer.flush()
+        status = self.client.get(f'/api/writes/{token}/').json()
+        self.assertEqual(status, {'token': token, 'written': True, 'id': GeometryData.objects.get().id})
+
+        response = self.client.post('/api/submit/', {'geometry_id': status['id']}, content_type='application/json')
+        self.assertEqual(response.status_code, 202)
+        record_writer.flush()
+        self.assertEqual(
+            record_writer.resolve(response.json()['design_write_token']), DesignSubmission.objects.get().id
+        )
+
+        # Strict clients wait for the row
+        payload['num_girders'] = 5
+        response = self.client.post('/api/geometry/validate/?sync=true', payload, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['geometry_id'], GeometryData.objects.get(num_girders=5).id)
+
+
+class RetentionLockTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'retention.lock'
+
+    def test_run_is_skipped_while_another_process_holds_the_lock(self):
+        scheduler = RetentionScheduler()
+        other = RunLock(self.path)
+        self.assertTrue(other.acquire())
+        with override_settings(GEOMETRY_RETENTION_LOCK=self.path, GEOMETRY_ARCHIVE_DIR=None):
+            self.assertIsNone(scheduler.run_once())
+            other.release()
+            self.assertIsNotNone(scheduler.run_once())
+        self.assertEqual((scheduler.runs, scheduler.skipped), (1, 1))
+        self.assertFalse(self.path.exists())
+
+    def test_stale_lock_is_taken_over(self):
+        dead = RunLock(self.path)
+        self.assertTrue(dead.acquire())
+        self.assertFalse(RunLock(self.path).acquire())
+        old = time.time() - LOCK_STALE_AFTER - 60
+        os.utime(self.path, (old, old))
+        with self.assertLogs('bridge.retention', 'WARNING'):
+            self.assertTrue(RunLock(self.path).acquire())
+        # The process that died must not release the lock it lost
+        dead.release()
+        self.assertTrue(self.path.exists())
+        self.assertFalse(RunLock(self.path).acquire())
+        self.assertEqual(list(self.path.parent.iterdir()), [self.path])
+
+    def test_reused_geometry_is_kept(self):
+        payload = {'carriageway_width': 7.5, 'girder_spacing': 2.5, 'num_girders': 4, 'deck_overhang_width': 1.0}
+        validation_memo.clear()
+        response = self.client.post('/api/geometry/validate/?sync=true', payload, content_type='application/json')
+        geometry_id = response.json()['geometry_id']
+        old = timezone.now() - timedelta(days=30)
+        GeometryData.objects.filter(pk=geometry_id).update(created_at=old, updated_at=old)
+        self.assertTrue(prunable_geometry(older_than_days=7).filter(pk=geometry_id).exists())
+
+        # Reused from the database, then from the memo once TOUCH_INTERVAL passed
+        validation_memo.clear()
+        self.client.post('/api/geometry/validate/?sync=true', payload, content_type='application/json')
+        self.assertFalse(prunable_geometry(older_than_days=7).filter(pk=geometry_id).exists())
+        GeometryData.objects.filter(pk=geometry_id).update(updated_at=old)
+        with mock.patch('bridge.cache.time.monotonic', return_value=time.monotonic() + 3600):
+            self.client.post('/api/geometry/validate/?sync=true', payload, content_type='application/json')
+        self.assertFalse(prunable_geometry(older_than_days=7).filter(pk=geometry_id).exists())
+
+    def test_memo_is_cleared_when_another_process_deletes_rows(self):
+        memo = ValidationMemo(check_interval=0)
+        with override_settings(GEOMETRY_RETENTION_LOCK=self.path):
+            memo.put('key', {'geometry_id': 1})
+            self.assertIsNotNone(memo.get('key'))
+            deletion_stamp().write_text('1\n')
+            self.assertIsNone(memo.get('key'))
+
+
+class GeometryBatchTests(TestCase):
+    def test_valid_rows_are_stored_once(self):
+        row = {'carriageway_width': 7.5, 'girder_spacing': 2.5, 'num_girders': 4, 'deck_overhang_width': 2.5}
+        response = self.client.post(
+            '/api/geometry/validate/batch/',
+            [row, {**row, 'num_girders': 5}, row],
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual((body['count'], body['valid_count']), (3, 2))
+        self.assertEqual([result['valid'] for result in body['results']], [True, False, True])
+        self.assertEqual(body['results'][0]['geometry_id'], body['results'][2]['geometry_id'])
+        self.assertEqual(GeometryData.objects.count(), 2)
+
+    def test_invalid_rows_are_rejected_per_row(self):
+        body = (
+            '{"carriageway_width": [7.5, [1], 7.5, 7.5],'
+            ' "girder_spacing": [2.5, 2.5, 1e400, 2.5],'
+            ' "num_girders": [4, 4, 4, 1e30],'
+            ' "deck_overhang_width": [2.5, 2.5, 2.5, {"a": 1}]}'
+        )
+        response = self.client.post('/api/geometry/validate/batch/', body, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()['errors'],
+            [
+                'Row 1: carriageway_width must be a finite number',
+                'Row 2: girder_spacing must be a finite number',
+                'Row 3: num_girders must be a whole number between -2147483647 and 2147483647',
+                'Row 3: deck_overhang_width must be a finite number',
+            ],
+        )
+        self.assertFalse(GeometryData.objects.exists())
+
+
+class DesignBatchTests(TestCase):
+    def test_malformed_rows_are_reported_per_row(self):
+        rows = [
+            {'structure_type': 'Highway'},
+            {'materials': {'girder_steel': ['E250']}},
+            {'materials': {'deck_concrete': {'grade': 'M25'}}},
+            {'structure_type': ['Highway']},
+            {'location_id': 1e400},
+        ]
+        body = json.dumps(rows).replace('Infinity', '1e400')
+        response = self.client.post('/api/designs/bulk/', body, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['errors']
+        self.assertEqual([error.split(':')[0] for error in errors], ['Row 1', 'Row 2', 'Row 3', 'Row 4'])
+        self.assertFalse(DesignSubmission.objects.exists())
+
+
+class ImportLocationsTests(TestCase):
+    header = 'state,district,basic_wind_speed,seismic_zone,seismic_factor,temperature_max,temperature_min,latitude,longitude\n'
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'zones.csv'
+        self.existing = LocationData.objects.create(
+            state='Maharashtra', district='Mumbai', basic_wind_speed=39, seismic_zone='II',
+            seismic_factor=0.10, temperature_max=38, temperature_min=16, latitude=19.07, longitude=72.87,
+        )
+
+    def run_import(self, rows, *args):
+        self.path.write_text(self.header + ''.join(f'{row}\n' for row in rows), encoding='utf-8')
+        out = io.StringIO()
+        call_command('import_locations', str(self.path), *args, stdout=out)
+        return out.getvalue()
+
+    def test_rows_are_upserted_and_seen_by_other_processes(self):
+        other = LocationCache()
+        self.assertFalse(other.check())
+        self.run_import([
+            'Maharashtra,Mumbai,44,III,0.16,40,15,,',
+            'Kerala,Kochi,39,III,0.16,35,20,9.93,76.26',
+            'Kerala,Kochi,40,III,0.16,35,20,9.93,76.26',
+        ])
+        mumbai = LocationData.objects.get(pk=self.existing.pk)
+        self.assertEqual((mumbai.basic_wind_speed, mumbai.seismic_zone), (44, 'III'))
+        # Rows without coordinates keep the stored ones
+        self.assertEqual((mumbai.latitude, mumbai.longitude), (19.07, 72.87))
+        self.assertEqual(LocationData.objects.get(district='Kochi').basic_wind_speed, 40)
+        self.assertEqual(LocationData.objects.count(), 2)
+        self.assertTrue(other.check())
+
+    def test_dry_run_writes_nothing(self):
+        output = self.run_import(['Kerala,Kochi,39,III,0.16,35,20,,'], '--dry-run')
+        self.assertIn('Validated 1 location(s) from 1 row(s)', output)
+        self.assertNotIn('upserted', output)
+        self.assertFalse(LocationData.objects.filter(district='Kochi').exists())
+
+    def test_bad_rows_are_skipped_and_reported(self):
+        output = self.run_import([
+            'Kerala,,39,III,0.16,35,20,,',
+            'Kerala,Kochi,fast,III,0.16,35,20,,',
+            'Kerala,Kollam,nan,III,0.16,35,20,,',
+            'Kerala,Kannur,39,III,0.16,20,35,,',
+            'Kerala,Thrissur,39,III,0.16,35,20,91,76',
+            'Kerala,Alappuzha,39,III,0.16,35,20,,',
+        ])
+        for line in range(1, 6):
+            self.assertIn(f'Row {line}:', output)
+        self.assertIn('6 row(s)', output)
+        self.assertEqual(
+            list(LocationData.objects.filter(state='Kerala').values_list('district', flat=True)), ['Alappuzha']
+        )
+
+        with self.assertRaises(CommandError):
+            self.run_import(['Kerala,,39,III,0.16,35,20,,'] * 3, '--max-errors', '2')
+
+
+class LocationFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        values = {
+            'basic_wind_speed': 39, 'seismic_zone': 'III', 'seismic_factor': 0.16,
+            'temperature_max': 40, 'temperature_min': 10,
+        }
+        LocationData.objects.bulk_create([
+            LocationData(state=state, district=district, **values)
+            for state in ('Kerala', 'Tamil Nadu')
+            for district in ('Kochi', 'Kollam', 'Kottayam', 'Madurai', 'Salem')
+        ])
+
+    def setUp(self):
+        location_cache.invalidate()
+
+    def test_state_and_district_select_one_row(self):
+        location_cache.version()
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/locations/', {'state': 'Tamil Nadu', 'district': 'Kollam'})
+        results = response.json()['results']
+        self.assertEqual(
+            [(row['state'], row['district']) for row in results], [('Tamil Nadu', 'Kollam')]
+        )
+
+    def test_district_prefix_within_state(self):
+        response = self.client.get('/api/locations/', {'state': 'Kerala', 'search': 'Ko'})
+        self.assertEqual(
+            [(row['state'], row['district']) for row in response.json()['results']],
+            [('Kerala', 'Kochi'), ('Kerala', 'Kollam'), ('Kerala', 'Kottayam')],
+        )
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite query plan')
+    def test_lookup_uses_an_index(self):
+        plan = LocationData.objects.filter(state='Kerala', district__gte='Ko', district__lt='Ko\U0010ffff').explain()
+        self.assertIn('USING', plan)
+        self.assertNotIn('SCAN', plan)
+
+
+@override_settings(COMPRESSION_MIN_SIZE=1)
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        location_cache.invalidate()
+        material_registry()
+        self.location = LocationData.objects.create(
+            state='Kerala', district='Kochi', basic_wind_speed=39, seismic_zone='III',
+            seismic_factor=0.16, temperature_max=35, temperature_min=20,
+        )
+
+    def test_matching_etag_is_not_modified(self):
+        for path in ('/api/materials/', '/api/locations/', '/api/locations/by_state/?state=Kerala'):
+            with self.subTest(path=path):
+                response = self.client.get(path)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('max-age=3600', response['Cache-Control'])
+
+                with self.assertNumQueries(0):
+                    cached = self.client.get(path, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(cached.status_code, 304)
+                self.assertEqual(cached.content, b'')
+                self.assertEqual(cached['ETag'], response['ETag'])
+
+                # A compressed response's weak ETag still matches
+                compressed = self.client.get(path, HTTP_ACCEPT_ENCODING='gzip')
+                self.assertTrue(compressed['ETag'].startswith('W/'))
+                cached = self.client.get(path, HTTP_IF_NONE_MATCH=compressed['ETag'], HTTP_ACCEPT_ENCODING='gzip')
+                self.assertEqual(cached.status_code, 304)
+
+    def test_write_changes_the_etag(self):
+        etag = self.client.get('/api/locations/')['ETag']
+        self.location.basic_wind_speed = 44
+        self.location.save()
+        response = self.client.get('/api/locations/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_health_is_small_and_uncached(self):
+        response = self.client.get('/api/health/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'status': 'ok'})
+        self.assertEqual(response['Cache-Control'], 'no-store')
+
+
+class LocationIndexTests(TestCase):
+    values = {
+        'basic_wind_speed': 39, 'seismic_zone': 'III', 'seismic_factor': 0.16,
+        'temperature_max': 40, 'temperature_min': 10,
+    }
+
+    def setUp(self):
+        LocationData.objects.bulk_create([
+            LocationData(state='Kerala', district='Kollam', **self.values),
+            LocationData(state='Goa', district='Panaji', **self.values),
+            LocationData(state='Kerala', district='Kochi', **self.values),
+        ])
+        location_cache.invalidate()
+
+    def test_index_is_built_once_and_rebuilt_on_change(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/locations/index/')
+        self.assertEqual(response.json(), {'Goa': ['Panaji'], 'Kerala': ['Kochi', 'Kollam']})
+        self.assertEqual(list(response.json()), ['Goa', 'Kerala'])
+        with self.assertNumQueries(0):
+            self.client.get('/api/locations/index/')
+
+        LocationData.objects.create(state='Goa', district='Margao', **self.values)
+        response = self.client.get('/api/locations/index/')
+        self.assertEqual(response.json()['Goa'], ['Margao', 'Panaji'])
+
+
+class FastSerializationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        values = {'seismic_zone': 'III', 'temperature_max': 40, 'temperature_min': 10.5}
+        LocationData.objects.bulk_create([
+            LocationData(state='Kerala', district='Kochi', basic_wind_speed=39, seismic_factor=0.16,
+                         latitude=9.93, longitude=76.26, **values),
+            LocationData(state='Kerala', district='Kollam', basic_wind_speed=39.5, seismic_factor=0.24, **values),
+        ])
+
+    def setUp(self):
+        location_cache.invalidate()
+
+    def test_list_matches_the_model_serializer(self):
+        results = self.client.get('/api/locations/').json()['results']
+        queryset = LocationData.objects.order_by('state', 'district', 'id')
+        self.assertEqual(results, json.loads(json.dumps(LocationDataSerializer(queryset, many=True).data)))
+
+    def test_fast_renderer_matches_drf(self):
+        data = {
+            'rows': list(LocationData.objects.values(*LOCATION_FIELDS)),
+            'when': timezone.now(),
+            'amount': Decimal('1.25'),
+        }
+        self.assertEqual(json.loads(FastJSONRenderer().render(data)), json.loads(JSONRenderer().render(data)))
+
+    def test_material_rows_do_not_repeat_the_catalog(self):
+        materials = [MaterialInput.objects.create(), MaterialInput.objects.create(deck_concrete='M40')]
+        fields = {'id', 'girder_steel', 'cross_bracing_steel', 'deck_concrete', 'created_at', 'updated_at'}
+        for row in MaterialInputSerializer(materials, many=True).data:
+            self.assertEqual(set(row), fields)
+        # A single instance still carries the options for the form
+        self.assertEqual(
+            set(MaterialInputSerializer(materials[0]).data), fields | {'steel_options', 'concrete_options'}
+        )
+
+    def test_benchmark_command_runs(self):
+        out = io.StringIO()
+        call_command('bench_serialization', '--rows', '50', '--repeat', '1', stdout=out)
+        self.assertIn('50', out.getvalue())
+        self.assertEqual(LocationData.objects.count(), 2)
+
+
+class GeometrySolverTests(SimpleTestCase):
+    def test_matches_brute_force_enumeration(self):
+        bounds = {'spacing_min': 1.0, 'spacing_max': 4.0, 'spacing_step': 0.25, 'overhang_max': 2.0}
+        solution = solve_geometry(7.5, **bounds)
+        found = set(zip(
+            solution['girder_spacing'].tolist(),
+            solution['num_girders'].tolist(),
+            solution['deck_overhang_width'].tolist(),
+        ))
+
+        expected = set()
+        for step in range(13):
+            spacing = 1.0 + 0.25 * step
+            for girders in range(2, 21):
+                overhang = round(12.5 - girders * spacing, 6)
+                if 0 <= overhang <= 2.0 and validate_geometry(7.5, spacing, girders, overhang)[0]:
+                    expected.add((spacing, girders, overhang))
+        self.assertTrue(expected)
+        self.assertEqual(found, expected)
+
+        # Fewest girders first, then smallest overhang
+        ranks = list(zip(solution['num_girders'].tolist(), solution['deck_overhang_width'].tolist()))
+        self.assertEqual(ranks, sorted(ranks))
+
+    def test_overhang_target_ranking(self):
+        solution = solve_geometry(7.5, overhang_target=1.0)
+        deviation = np.abs(solution['deck_overhang_width'] - 1.0)
+        self.assertTrue((np.diff(np.round(deviation, 6)) >= 0).all())
+
+    def test_endpoint_pages_and_rejects_bad_bounds(self):
+        full = self.client.get('/api/geometry/solve/', {'carriageway_width': 7.5, 'page_size': 1000}).json()
+        page = self.client.get('/api/geometry/solve/', {'carriageway_width': 7.5, 'page': 2, 'page_size': 5}).json()
+        self.assertEqual(page['count'], full['count'])
+        self.assertEqual(page['results'], full['results'][5:10])
+        self.assertEqual(full['overall_width'], 12.5)
+
+        for params in (
+            {},
+            {'carriageway_width': 30},
+            {'carriageway_width': 7.5, 'spacing_step': 0},
+            {'carriageway_width': 7.5, 'num_girders_min': 5, 'num_girders_max': 2},
+            {'carriageway_width': 7.5, 'spacing_step': 'fine'},
+            {'carriageway_width': 7.5, 'spacing_step': 'nan'},
+            {'carriageway_width': 7.5, 'spacing_min': 'nan'},
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get('/api/geometry/solve/', params).status_code, 400)
+
+
+class MetricsTests(TestCase):
+    def scrape(self, **extra):
+        response = self.client.get('/metrics', **extra)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        samples = {}
+        for line in response.content.decode('utf-8').splitlines():
+            if line and not line.startswith('#'):
+                series, value = line.rsplit(' ', 1)
+                samples[series] = float(value)
+        return samples
+
+    def test_requests_queries_and_caches_are_counted(self):
+        LocationData.objects.create(
+            state='Kerala', district='Kochi', basic_wind_speed=39, seismic_zone='III',
+            seismic_factor=0.16, temperature_max=35, temperature_min=20,
+        )
+        location_cache.invalidate()
+        labels = 'view="location-by-state",method="GET"'
+        before = self.scrape()
+        for _ in range(2):
+            self.client.get('/api/locations/by_state/', {'state': 'Kerala'})
+        after = self.scrape()
+
+        def delta(series):
+            return after.get(series, 0) - before.get(series, 0)
+
+        self.assertEqual(delta(f'bridge_http_requests_total{{{labels},status="200"}}'), 2)
+        self.assertEqual(delta(f'bridge_http_request_duration_seconds_count{{{labels}}}'), 2)
+        self.assertEqual(delta(f'bridge_http_request_duration_seconds_bucket{{{labels},le="+Inf"}}'), 2)
+        self.assertEqual(delta('bridge_http_response_size_bytes_count{view="location-by-state"}'), 2)
+        # The first request loads the state and the version; the second is served from memory
+        self.assertEqual(delta('bridge_db_queries_total{view="location-by-state"}'), 2)
+        self.assertGreaterEqual(delta('bridge_cache_hits_total{cache="location"}'), 1)
+        self.assertIn('bridge_cache_hit_ratio{cache="location"}', after)
+
+    @override_settings(METRICS_ALLOWED_IPS=['10.0.0.0/8'], METRICS_TOKEN='s3cret')
+    def test_access_is_restricted(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.1.2.3').status_code, 200)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        self.scrape(HTTP_AUTHORIZATION='Bearer s3cret')
+
+        with override_settings(METRICS_TOKEN=None):
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer ').status_code, 403)
@@ -5,26 +5,57 @@ Endpoints:
 - /api/locations/ - List all locations
 - /api/locations/by_state/ - Filter by state
 - /api/locations/by_district/ - Filter by state and district
+- /api/locations/nearest/ - Nearest locations to GPS coordinates
+- /api/locations/search/ - District autocomplete
 - /api/geometry/validate/ - Validate geometry
+- /api/geometry/validate/batch/ - Validate many geometries at once
+- /api/geometry/solve/ - Enumerate feasible girder layouts
+- /api/geometry/sweep/ - Feasibility grid as a bit-packed .npz
+- /api/loads/ - Design loads for location x geometry combinations
 - /api/materials/ - Get material options
 - /api/submit/ - Submit form
+- /api/designs/ - Submitted designs (list, detail, bulk/)
+- /api/health/ - Connectivity check
+- /api/writes/<token>/ - Status of a buffered write
+- /api/async/... - Native async versions of locations/by_state, locations/by_district,
+  materials, geometry/validate and submit (see async_views.py)
 """
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import async_views
 from .views import (
     LocationDataViewSet,
     GeometryValidationView,
+    GeometryBatchValidationView,
+    GeometrySolverView,
+    GeometrySweepView,
+    DesignLoadView,
     MaterialOptionsView,
     SubmissionView,
+    DesignSubmissionViewSet,
+    HealthView,
+    WriteStatusView,
 )
 
 router = DefaultRouter()
 router.register(r'locations', LocationDataViewSet, basename='location')
+router.register(r'designs', DesignSubmissionViewSet, basename='design')
 
 urlpatterns = [
     path('', include(router.urls)),
     path('geometry/validate/', GeometryValidationView.as_view(), name='geometry-validate'),
+    path('geometry/validate/batch/', GeometryBatchValidationView.as_view(), name='geometry-validate-batch'),
+    path('geometry/solve/', GeometrySolverView.as_view(), name='geometry-solve'),
+    path('geometry/sweep/', GeometrySweepView.as_view(), name='geometry-sweep'),
+    path('loads/', DesignLoadView.as_view(), name='design-loads'),
     path('materials/', MaterialOptionsView.as_view(), name='materials'),
     path('submit/', SubmissionView.as_view(), name='submit'),
+    path('health/', HealthView.as_view(), name='health'),
+    path('writes/<str:token>/', WriteStatusView.as_view(), name='write-status'),
+    path('async/locations/by_state/', async_views.locations_by_state, name='async-location-by-state'),
+    path('async/locations/by_district/', async_views.locations_by_district, name='async-location-by-district'),
+    path('async/materials/', async_views.material_options, name='async-materials'),
+    path('async/geometry/validate/', async_views.validate_geometry_view, name='async-geometry-validate'),
+    path('async/submit/', async_views.submit, name='async-submit'),
 ]
@@ -4,34 +4,166 @@ Django REST Framework views for OSDAG Bridge Module API endpoints.
 Views:
 - LocationDataViewSet: CRUD endpoints for locations
 - GeometryValidationView: POST endpoint for geometry validation
+- GeometryBatchValidationView: POST endpoint for validating many geometries at once
+- GeometrySolverView: GET endpoint enumerating feasible girder layouts
+- GeometrySweepView: POST endpoint returning the feasibility grid as .npz
+- DesignLoadView: POST endpoint scoring design loads over locations x geometries
 - MaterialOptionsView: GET endpoint for available materials
 - SubmissionView: POST endpoint for form submissions
+- DesignSubmissionViewSet: Read and bulk-create submitted designs
+- HealthView: GET endpoint for lightweight connectivity checks
+- WriteStatusView: GET endpoint for resolving buffered write tokens
+- MetricsView: GET endpoint exposing request metrics to Prometheus
 """
 
+import csv
+import hmac
+import ipaddress
+import json
+
+import numpy as np
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.shortcuts import get_object_or_404
-from .models import LocationData, GeometryData, MaterialInput
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from .cache import LOCATION_FIELDS, location_cache, validation_memo
+from .coalesce import CoalescingMixin
+from .conditional import conditional_response
+from .designs import missing_references, parse_design, parse_design_batch
+from .loads import (
+    LOCATION_LOAD_FIELDS,
+    compute_loads,
+    design_loads,
+    geometry_columns,
+    location_columns,
+    parse_factors,
+)
+from .materials import material_registry
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, registry as metrics_registry
+from .geometry import (
+    GEOMETRY_FIELDS,
+    batch_errors,
+    geometry_key,
+    parse_geometry_batch,
+    solve_geometry,
+    validate_geometry,
+    validate_geometry_batch,
+)
+from .models import LocationData, GeometryData, MaterialInput, DesignSubmission
+from .pagination import DesignCursorPagination, LocationKeysetPagination
+from .renderers import PassthroughRenderer
+from .retention import needs_touch, touch_geometry
+from .search import district_search
+from .spatial import location_index
+from .sweep import grid_shape, parse_axes, sweep, to_npz_bytes
+from .writer import record_writer, wants_sync_write
 from .serializers import (
     LocationDataSerializer,
     GeometryDataSerializer,
     MaterialInputSerializer,
+    DesignSubmissionSerializer,
 )
 
 
-class LocationDataViewSet(viewsets.ModelViewSet):
+def memoized_geometry_response(key, sync):
+    """
+    Return the memoized validation response for an input hash, or None.
+    
+    Entries written by the background writer get their geometry_id filled in
+    once the write token resolves. A strict (sync) caller only accepts an
+    entry that already has a geometry_id.
+    """
+    memoized = validation_memo.get(key)
+    if memoized is None:
+        return None
+    if memoized['geometry_id'] is None:
+        pk = record_writer.resolve(memoized['write_token'])
+        if pk is not None:
+            memoized = {**memoized, 'geometry_id': pk}
+            del memoized['write_token']
+            validation_memo.put(key, memoized)
+    if memoized['geometry_id'] is None and sync:
+        return None
+    return memoized
+
+
+class LocationDataViewSet(CoalescingMixin, viewsets.ModelViewSet):
     """
     ViewSet for LocationData model.
     
     Endpoints:
     - GET /api/locations/ - List all locations
+    - GET /api/locations/?state=<state>&district=<district> - Filter on the server
+    - GET /api/locations/?state=<state>&search=<prefix> - District prefix search
+    - GET /api/locations/?cursor=<cursor>&page_size=<n> - Keyset pagination
     - GET /api/locations/<id>/ - Retrieve specific location
     - GET /api/locations/by-state/<state>/ - Get locations by state
+    - GET /api/locations/export/?output=ndjson|csv - Stream every location
+    - GET /api/locations/index/ - Compact {state: [districts]} tree
+    - GET /api/locations/nearest/?lat=<lat>&lon=<lon>&k=<k> - Nearest locations to a point
+    - GET /api/locations/search/?q=<text>&limit=<n> - Ranked, typo-tolerant district search
+    
+    by_state, by_district and index are served from location_cache, nearest from
+    the KD-tree in bridge.spatial and search from the indexes in bridge.search.
+    Read endpoints send an ETag of the table version and answer If-None-Match
+    with 304. Concurrent identical reads share one rendered response
+    (bridge.coalesce).
     """
     queryset = LocationData.objects.all()
     serializer_class = LocationDataSerializer
+    pagination_class = LocationKeysetPagination
+    coalesced_actions = ('list', 'retrieve', 'by_state', 'by_district', 'index', 'nearest', 'search')
+    export_chunk_size = 2000
+    max_nearest = 50
+    max_search_results = 50
+    
+    def get_queryset(self):
+        """
+        Apply the state, district and search query parameters.
+        
+        Filters map onto the (state, district) index: exact matches on both
+        columns, or an exact state plus a district range for prefix search.
+        """
+        queryset = super().get_queryset()
+        params = self.request.query_params
+        
+        state = params.get('state')
+        district = params.get('district')
+        search = params.get('search')
+        
+        if state:
+            queryset = queryset.filter(state=state)
+        if district:
+            queryset = queryset.filter(district=district)
+        elif search:
+            # Range bounds instead of LIKE so the index can serve the lookup
+            queryset = queryset.filter(
+                district__gte=search,
+                district__lt=search + '\U0010ffff'
+            )
+        return queryset
+    
+    def list(self, request, *args, **kwargs):
+        """List locations, or 304 if the client's copy is current."""
+        return conditional_response(
+            request,
+            location_cache.version(),
+            self._list_values
+        )
+    
+    def _list_values(self):
+        """
+        Read-only fast path: page dicts straight from .values().
+        
+        The rows are what LocationDataSerializer would produce, without
+        building serializer fields or calling to_representation per row.
+        """
+        queryset = self.filter_queryset(self.get_queryset()).values(*LOCATION_FIELDS)
+        return self.get_paginated_response(self.paginate_queryset(queryset))
     
     @action(detail=False, methods=['get'])
     def by_state(self, request, state=None):
@@ -43,9 +175,11 @@ class LocationDataViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        locations = LocationData.objects.filter(state=state)
-        serializer = self.get_serializer(locations, many=True)
-        return Response(serializer.data)
+        return conditional_response(
+            request,
+            location_cache.version(),
+            lambda: Response(location_cache.get_state_locations(state))
+        )
     
     @action(detail=False, methods=['get'])
     def by_district(self, request):
@@ -59,13 +193,143 @@ class LocationDataViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        location = get_object_or_404(
-            LocationData,
-            state=state,
-            district=district
+        location = location_cache.get_location(state, district)
+        if location is None:
+            raise Http404
+        return conditional_response(
+            request,
+            location_cache.version(),
+            lambda: Response(location)
         )
-        serializer = self.get_serializer(location)
-        return Response(serializer.data)
+    
+    @action(detail=False, methods=['get'])
+    def index(self, request):
+        """Get every state with its district names, for dropdown population."""
+        return conditional_response(
+            request,
+            location_cache.version(),
+            lambda: Response(location_cache.index())
+        )
+    
+    @action(detail=False, methods=['get'])
+    def nearest(self, request):
+        """Get the k locations nearest to a GPS point, closest first, with distance_km."""
+        params = request.query_params
+        try:
+            latitude = float(params.get('lat'))
+            longitude = float(params.get('lon'))
+            k = int(params.get('k', 5))
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'lat and lon are required and must be numbers; k must be an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            return Response(
+                {'error': 'lat must be within [-90, 90] and lon within [-180, 180]'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not 1 <= k <= self.max_nearest:
+            return Response(
+                {'error': f'k must be between 1 and {self.max_nearest}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return conditional_response(
+            request,
+            location_cache.version(),
+            lambda: Response(location_index.nearest(latitude, longitude, k))
+        )
+    
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Autocomplete district names; misspellings and alternate names still match."""
+        query = request.query_params.get('q', '')
+        state = request.query_params.get('state') or None
+        try:
+            limit = int(request.query_params.get('limit', 10))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= self.max_search_results:
+            return Response(
+                {'error': f'limit must be an integer between 1 and {self.max_search_results}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return conditional_response(
+            request,
+            location_cache.version(),
+            lambda: Response(district_search.search(query, limit=limit, state=state))
+        )
+    
+    @action(detail=False, methods=['get'], renderer_classes=[PassthroughRenderer])
+    def export(self, request):
+        """
+        Stream all (filtered) locations as NDJSON or CSV.
+        
+        Rows are read with a server-side iterator and written in blocks, so
+        the whole table is sent in one request with constant server memory.
+        """
+        output = request.query_params.get('output', 'ndjson')
+        if output not in ('ndjson', 'csv'):
+            # PassthroughRenderer cannot render data, so build the JSON here
+            return JsonResponse(
+                {'error': 'output must be ndjson or csv'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        rows = (
+            self.get_queryset()
+            .order_by(*self.pagination_class.ordering)
+            .values_list(*LOCATION_FIELDS)
+            .iterator(chunk_size=self.export_chunk_size)
+        )
+        
+        if output == 'csv':
+            content = self._export_csv(rows)
+            content_type = 'text/csv'
+        else:
+            content = self._export_ndjson(rows)
+            content_type = 'application/x-ndjson'
+        
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="locations.{output}"'
+        return response
+    
+    def _export_ndjson(self, rows):
+        lines = []
+        for row in rows:
+            lines.append(json.dumps(dict(zip(LOCATION_FIELDS, row))))
+            if len(lines) == self.export_chunk_size:
+                yield '\n'.join(lines) + '\n'
+                lines = []
+        if lines:
+            yield '\n'.join(lines) + '\n'
+    
+    def _export_csv(self, rows):
+        buffer = _LineBuffer()
+        writer = csv.writer(buffer)
+        writer.writerow(LOCATION_FIELDS)
+        for row in rows:
+            writer.writerow(row)
+            if len(buffer.lines) == self.export_chunk_size:
+                yield buffer.flush()
+        yield buffer.flush()
+
+
+class _LineBuffer:
+    """File-like sink that collects csv.writer output for streaming."""
+    
+    def __init__(self):
+        self.lines = []
+    
+    def write(self, value):
+        self.lines.append(value)
+    
+    def flush(self):
+        data = ''.join(self.lines)
+        self.lines = []
+        return data
 
 
 class GeometryValidationView(APIView):
@@ -89,6 +353,14 @@ class GeometryValidationView(APIView):
         "message": "Geometry validated successfully.",
         "errors": []
     }
+    
+    The record is queued for the background writer (202 with a
+    "write_token", "geometry_id": null) unless ?sync=true is given or
+    buffering is disabled, in which case it is stored before responding.
+    
+    Inputs are content-addressed (GeometryData.input_hash): repeating a
+    geometry returns the existing geometry_id and verdict from the LRU memo
+    or the stored row, without writing a new record.
     """
     
     def post(self, request):
@@ -108,52 +380,408 @@ class GeometryValidationView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Compute overall width
-        overall_width = carriageway_width + 5
-        
-        # Validate constraints
-        errors = []
+        key = geometry_key(carriageway_width, girder_spacing, num_girders, deck_overhang_width)
+        sync = wants_sync_write(request)
         
-        if girder_spacing >= overall_width:
-            errors.append(
-                f"Girder spacing ({girder_spacing}) must be < overall width ({overall_width})"
-            )
+        # Repeated inputs: answer from the memo without running the rules or writing
+        memoized = memoized_geometry_response(key, sync)
+        if memoized is not None:
+            if memoized['geometry_id'] is not None and validation_memo.touch_due(key):
+                touch_geometry([memoized['geometry_id']])
+            return Response(memoized, status=status.HTTP_200_OK)
         
-        if deck_overhang_width >= overall_width:
-            errors.append(
-                f"Deck overhang ({deck_overhang_width}) must be < overall width ({overall_width})"
-            )
+        is_valid, overall_width, errors = validate_geometry(
+            carriageway_width, girder_spacing, num_girders, deck_overhang_width
+        )
         
-        # Validate formula: (overall_width - overhang) / spacing = num_girders
-        if girder_spacing > 0:
-            calculated_girders = (overall_width - deck_overhang_width) / girder_spacing
-            if abs(calculated_girders - num_girders) > 0.01:
-                errors.append(
-                    f"Geometry mismatch: Expected {calculated_girders:.2f} girders, got {num_girders}"
-                )
+        stored = GeometryData.objects.filter(input_hash=key).values_list('id', 'updated_at').first()
+        response = {
+            'valid': is_valid,
+            'overall_width': overall_width,
+            'geometry_id': stored[0] if stored else None,
+            'message': 'Geometry validated successfully.' if is_valid else 'Geometry validation failed.',
+            'errors': errors
+        }
         
-        is_valid = len(errors) == 0
+        # Same inputs stored earlier (possibly by another process): reuse the row
+        if stored is not None:
+            if needs_touch(stored[1]):
+                touch_geometry([stored[0]])
+            validation_memo.put(key, response)
+            return Response(response, status=status.HTTP_200_OK)
         
-        # Create GeometryData record
-        geometry = GeometryData.objects.create(
+        geometry = GeometryData(
             carriageway_width=carriageway_width,
             girder_spacing=girder_spacing,
             num_girders=num_girders,
             deck_overhang_width=deck_overhang_width,
             overall_width=overall_width,
-            valid=is_valid
+            valid=is_valid,
+            input_hash=key
         )
         
+        # Create GeometryData record, or queue it for the background writer
+        if sync:
+            try:
+                with transaction.atomic():
+                    geometry.save()
+                response['geometry_id'] = geometry.id
+            except IntegrityError:
+                # A concurrent request stored the same inputs first
+                response['geometry_id'] = GeometryData.objects.get(input_hash=key).id
+                touch_geometry([response['geometry_id']])
+            validation_memo.put(key, response)
+            return Response(response, status=status.HTTP_200_OK)
+        
+        response['write_token'] = record_writer.submit(geometry)
+        validation_memo.put(key, response)
+        return Response(response, status=status.HTTP_202_ACCEPTED)
+
+
+class GeometryBatchValidationView(APIView):
+    """
+    Validate many geometries in one request.
+    
+    POST /api/geometry/validate/batch/
+    
+    Request body (list of rows, optionally wrapped as {"geometries": [...]}):
+    [
+        {"carriageway_width": 7.5, "girder_spacing": 2.5, "num_girders": 4, "deck_overhang_width": 2.5},
+        ...
+    ]
+    
+    or columnar:
+    {
+        "carriageway_width": [7.5, 10.0],
+        "girder_spacing": [2.5, 3.0],
+        "num_girders": [4, 5],
+        "deck_overhang_width": [2.5, 3.0]
+    }
+    
+    Rows are stored once per distinct input (GeometryData.input_hash);
+    repeated or previously stored inputs return the existing geometry_id.
+    
+    Response (results are in input order):
+    {
+        "count": 2,
+        "valid_count": 1,
+        "results": [
+            {"index": 0, "valid": true, "overall_width": 12.5, "geometry_id": 1, "errors": []},
+            ...
+        ]
+    }
+    """
+    
+    max_rows = 10000
+    
+    def post(self, request):
+        """Validate a batch of geometries and store new inputs with a single bulk insert."""
+        try:
+            columns = parse_geometry_batch(request.data, max_rows=self.max_rows)
+        except ValueError as e:
+            return Response(
+                {
+                    'valid': False,
+                    'message': 'Invalid input parameters',
+                    'errors': e.args[0]
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        result = validate_geometry_batch(*(columns[field] for field in GEOMETRY_FIELDS))
+        
+        rows = list(zip(
+            columns['carriageway_width'].tolist(),
+            columns['girder_spacing'].tolist(),
+            columns['num_girders'].tolist(),
+            columns['deck_overhang_width'].tolist(),
+            result['overall_width'].tolist(),
+            result['valid'].tolist(),
+        ))
+        
+        keys = [geometry_key(*row[:4]) for row in rows]
+        stored = self._stored_ids(set(keys))
+        
+        # Insert each new input once; repeated or already-stored inputs reuse their row
+        new_rows = {}
+        for key, row in zip(keys, rows):
+            if key not in stored and key not in new_rows:
+                new_rows[key] = row
+        if new_rows:
+            GeometryData.objects.bulk_create(
+                [
+                    GeometryData(
+                        carriageway_width=carriageway_width,
+                        girder_spacing=girder_spacing,
+                        num_girders=num_girders,
+                        deck_overhang_width=deck_overhang_width,
+                        overall_width=overall_width,
+                        valid=is_valid,
+                        input_hash=key
+                    )
+                    for key, (carriageway_width, girder_spacing, num_girders,
+                              deck_overhang_width, overall_width, is_valid) in new_rows.items()
+                ],
+                ignore_conflicts=True
+            )
+            stored.update(self._stored_ids(set(new_rows)))
+        
+        results = []
+        for index, (key, row) in enumerate(zip(keys, rows)):
+            carriageway_width, girder_spacing, num_girders, deck_overhang_width, overall_width, is_valid = row
+            results.append({
+                'index': index,
+                'valid': is_valid,
+                'overall_width': overall_width,
+                'geometry_id': stored.get(key),
+                'errors': [] if is_valid else batch_errors(
+                    result, index, girder_spacing, num_girders, deck_overhang_width
+                ),
+            })
+        
         return Response({
-            'valid': is_valid,
-            'overall_width': overall_width,
-            'geometry_id': geometry.id,
-            'message': 'Geometry validated successfully.' if is_valid else 'Geometry validation failed.',
-            'errors': errors
+            'count': len(results),
+            'valid_count': int(result['valid'].sum()),
+            'results': results
         }, status=status.HTTP_200_OK)
+    
+    def _stored_ids(self, keys):
+        """Map input_hash -> id for the stored rows among keys, touching reused rows."""
+        keys = list(keys)
+        size = connection.features.max_query_params or len(keys) or 1
+        stored = {}
+        stale = []
+        for start in range(0, len(keys), size):
+            for input_hash, pk, updated_at in (
+                GeometryData.objects.filter(input_hash__in=keys[start:start + size])
+                .values_list('input_hash', 'id', 'updated_at')
+            ):
+                stored[input_hash] = pk
+                if needs_touch(updated_at):
+                    stale.append(pk)
+        for start in range(0, len(stale), size):
+            touch_geometry(stale[start:start + size])
+        return stored
+
+
+class GeometrySolverView(APIView):
+    """
+    Enumerate every feasible girder layout for a carriageway width.
+    
+    GET /api/geometry/solve/?carriageway_width=7.5
+    
+    Optional query parameters (metres unless noted):
+    - spacing_min, spacing_max, spacing_step: Girder spacing grid (0.5, overall width, 0.05)
+    - overhang_min, overhang_max: Deck overhang bounds (0, overall width)
+    - num_girders_min, num_girders_max: Girder count bounds (2, 20)
+    - overhang_target: Rank by overhang closest to this value
+    - page, page_size: Pagination (1, 50; page_size at most 1000)
+    
+    Response:
+    {
+        "overall_width": 12.5,
+        "count": 469,
+        "page": 1,
+        "page_size": 50,
+        "results": [
+            {"girder_spacing": 6.25, "num_girders": 2, "deck_overhang_width": 0.0},
+            ...
+        ]
+    }
+    """
+    
+    float_params = (
+        'spacing_min', 'spacing_max', 'spacing_step',
+        'overhang_min', 'overhang_max', 'overhang_target',
+    )
+    int_params = ('num_girders_min', 'num_girders_max')
+    max_page_size = 1000
+    
+    def get(self, request):
+        """Solve the girder rule for all layouts within the bounds."""
+        params = request.query_params
+        try:
+            carriageway_width = float(params.get('carriageway_width'))
+            bounds = {name: float(params[name]) for name in self.float_params if name in params}
+            bounds.update({name: int(params[name]) for name in self.int_params if name in params})
+            page = max(int(params.get('page', 1)), 1)
+            page_size = min(max(int(params.get('page_size', 50)), 1), self.max_page_size)
+        except (TypeError, ValueError):
+            return Response(
+                {
+                    'message': 'Invalid input parameters',
+                    'errors': ['carriageway_width is required and all parameters must be valid numbers']
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            solution = solve_geometry(carriageway_width, **bounds)
+        except ValueError as e:
+            return Response(
+                {'message': 'Invalid input parameters', 'errors': [str(e)]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        start = (page - 1) * page_size
+        window = slice(start, start + page_size)
+        results = [
+            {
+                'girder_spacing': girder_spacing,
+                'num_girders': num_girders,
+                'deck_overhang_width': deck_overhang_width,
+            }
+            for girder_spacing, num_girders, deck_overhang_width in zip(
+                solution['girder_spacing'][window].tolist(),
+                solution['num_girders'][window].tolist(),
+                solution['deck_overhang_width'][window].tolist(),
+            )
+        ]
+        
+        return Response({
+            'overall_width': solution['overall_width'],
+            'count': len(solution['num_girders']),
+            'page': page,
+            'page_size': page_size,
+            'results': results
+        })
+
+
+class GeometrySweepView(APIView):
+    """
+    Evaluate the geometry rules over a full parameter grid.
+    
+    POST /api/geometry/sweep/
+    
+    Request body (every axis optional, see bridge.sweep.DEFAULT_AXES):
+    {
+        "carriageway_width": [4.25, 23.75, 0.25],
+        "girder_spacing": [0.5, 6.0, 0.05],
+        "deck_overhang_width": [0.0, 3.0, 0.05],
+        "num_girders": [2, 20]
+    }
+    
+    Response: application/octet-stream .npz holding the axes and the
+    bit-packed validity grid (format documented in bridge/sweep.py).
+    """
+    renderer_classes = [PassthroughRenderer]
+    max_points = 50_000_000
+    
+    def post(self, request):
+        """Sweep the grid in parallel and return it as a compact binary file."""
+        data = request.data if isinstance(request.data, dict) else {}
+        try:
+            axes = parse_axes(data)
+        except ValueError as e:
+            return JsonResponse(
+                {'message': 'Invalid input parameters', 'errors': [str(e)]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        points = int(np.prod(grid_shape(axes)))
+        if points > self.max_points:
+            return JsonResponse(
+                {
+                    'message': 'Invalid input parameters',
+                    'errors': [f'Grid has {points} points; the limit is {self.max_points}']
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        valid = sweep(axes, workers=getattr(settings, 'SWEEP_WORKERS', None))
+        response = HttpResponse(to_npz_bytes(axes, valid), content_type='application/octet-stream')
+        response['Content-Disposition'] = 'attachment; filename="geometry_sweep.npz"'
+        response['X-Sweep-Points'] = str(points)
+        response['X-Sweep-Feasible'] = str(int(valid.sum()))
+        return response
 
 
-class MaterialOptionsView(APIView):
+class DesignLoadView(APIView):
+    """
+    Score environmental design loads for every location x geometry pair.
+    
+    POST /api/loads/
+    
+    Request body (locations by id or by state; geometries by id or inline,
+    in any form accepted by the batch validator; factors optional, see
+    bridge.loads.DEFAULT_FACTORS):
+    {
+        "location_ids": [1, 2, 3],
+        "geometry_ids": [5, 6],
+        "risk_factor": 1.08
+    }
+    
+    Response (each load is an L x G grid, rows in location_ids order):
+    {
+        "count": 6,
+        "location_ids": [1, 2, 3],
+        "geometry_ids": [5, 6],
+        "factors": {"risk_factor": 1.08, ...},
+        "loads": {
+            "design_wind_pressure": [[1.08, 1.08], ...],
+            ...
+        },
+        "governing": {
+            "design_wind_pressure": {"value": 1.53, "location_id": 3, "geometry_index": 0},
+            ...
+        }
+    }
+    """
+    
+    max_locations = 10000
+    max_geometries = 10000
+    max_combinations = 200_000
+    
+    def post(self, request):
+        """Compute the full load grid in one vectorized pass."""
+        data = request.data if isinstance(request.data, dict) else {}
+        try:
+            factors = parse_factors(data)
+            geometry_ids, geometries = geometry_columns(data, max_rows=self.max_geometries)
+            location_ids, locations = location_columns(data, max_rows=self.max_locations)
+        except ValueError as e:
+            return Response(
+                {'message': 'Invalid input parameters', 'errors': e.args[0]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        count = len(location_ids) * len(geometry_ids)
+        if count > self.max_combinations:
+            return Response(
+                {
+                    'message': 'Invalid input parameters',
+                    'errors': [f'{count} combinations exceeds the limit of {self.max_combinations}']
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        loads = compute_loads(
+            *(locations[field][:, np.newaxis] for field in LOCATION_LOAD_FIELDS),
+            geometries['overall_width'][np.newaxis, :],
+            geometries['num_girders'][np.newaxis, :],
+            factors
+        )
+        
+        governing = {}
+        for field, grid in loads.items():
+            row, column = np.unravel_index(np.argmax(grid), grid.shape)
+            governing[field] = {
+                'value': round(float(grid[row, column]), 4),
+                'location_id': location_ids[row],
+                'geometry_index': int(column),
+            }
+        
+        return Response({
+            'count': count,
+            'location_ids': location_ids,
+            'geometry_ids': geometry_ids,
+            'factors': factors,
+            'loads': {field: np.round(grid, 4).tolist() for field, grid in loads.items()},
+            'governing': governing
+        })
+
+
+class MaterialOptionsView(CoalescingMixin, APIView):
     """
     Get available material options.
     
@@ -162,18 +790,32 @@ class MaterialOptionsView(APIView):
     Response:
     {
         "steel_options": ["E250", "E350", "E450"],
-        "concrete_options": ["M25", "M30", ..., "M60"]
+        "concrete_options": ["M25", "M30", ..., "M60"],
+        "steel_grades": [
+            {"grade": "E250", "fy": 250.0, "fu": 410.0, "elastic_modulus": 200000.0,
+             "density": 7850.0, "thermal_coefficient": 1.2e-05},
+            ...
+        ],
+        "concrete_grades": [
+            {"grade": "M25", "fck": 25.0, "ecm": 30000.0, "density": 2500.0,
+             "thermal_coefficient": 1e-05},
+            ...
+        ]
     }
+    
+    Served from the in-memory materials registry (bridge.materials); its
+    version is the ETag. Concurrent identical requests share one rendered
+    response (bridge.coalesce).
     """
     
     def get(self, request):
         """Return available material options."""
-        return Response({
-            'steel_options': ['E250', 'E350', 'E450'],
-            'concrete_options': [
-                'M25', 'M30', 'M35', 'M40', 'M45', 'M50', 'M55', 'M60'
-            ]
-        })
+        registry = material_registry()
+        return conditional_response(
+            request,
+            registry.version,
+            lambda: Response(registry.options)
+        )
 
 
 class SubmissionView(APIView):
@@ -193,29 +835,315 @@ class SubmissionView(APIView):
             "deck_concrete": "M25"
         }
     }
+    
+    The materials are stored as a MaterialInput and the whole design as a
+    DesignSubmission referencing it ("design_id", see /api/designs/).
+    location_id and geometry_id are optional but must exist when given.
+    
+    Like geometry validation, the records are buffered (202 with a
+    "write_token" for the materials and a "design_write_token") unless
+    ?sync=true is given or buffering is disabled.
     """
     
     def post(self, request):
         """Store form submission."""
         try:
-            materials_data = request.data.get('materials', {})
+            material, design = parse_design(request.data)
+            errors = missing_references([design])
+            if errors:
+                raise ValueError('; '.join(errors))
             
-            # Create MaterialInput record
-            material = MaterialInput.objects.create(
-                girder_steel=materials_data.get('girder_steel', 'E250'),
-                cross_bracing_steel=materials_data.get('cross_bracing_steel', 'E250'),
-                deck_concrete=materials_data.get('deck_concrete', 'M25')
-            )
+            # Create the records, or queue them for the background writer
+            if wants_sync_write(request):
+                with transaction.atomic():
+                    material.save()
+                    design.save()
+                return Response({
+                    'success': True,
+                    'message': 'Form submitted successfully.',
+                    'design_id': design.id,
+                    'data': MaterialInputSerializer(material).data
+                }, status=status.HTTP_201_CREATED)
             
-            serializer = MaterialInputSerializer(material)
+            token = record_writer.submit(material)
+            design_token = record_writer.submit(design)
             return Response({
                 'success': True,
-                'message': 'Form submitted successfully.',
-                'data': serializer.data
-            }, status=status.HTTP_201_CREATED)
+                'message': 'Form accepted; it will be stored shortly.',
+                'write_token': token,
+                'design_write_token': design_token,
+                'data': MaterialInputSerializer(material).data
+            }, status=status.HTTP_202_ACCEPTED)
         
         except Exception as e:
             return Response({
                 'success': False,
                 'message': f'Error submitting form: {str(e)}'
             }, status=status.HTTP_400_BAD_REQUEST)
+
+
+class DesignSubmissionViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Submitted designs with their location, geometry and materials.
+    
+    Endpoints:
+    - GET /api/designs/ - Newest first, cursor paginated (?page_size up to 10000)
+    - GET /api/designs/{id}/ - One design
+    - GET /api/designs/{id}/loads/ - Design loads of one design
+    - POST /api/designs/bulk/ - Store many designs at once
+    
+    Filters: ?location=<id>, ?structure_type=Highway
+    
+    Each page or detail is a single query: the three references are joined
+    with select_related, so cost does not grow with the number of designs.
+    
+    Response (detail):
+    {
+        "id": 7,
+        "structure_type": "Highway",
+        "location": {"id": 1, "state": "Maharashtra", "district": "Mumbai", ...},
+        "geometry": {"id": 5, "carriageway_width": 7.5, ...},
+        "materials": {"id": 12, "girder_steel": "E250", ...},
+        "created_at": "..."
+    }
+    """
+    serializer_class = DesignSubmissionSerializer
+    pagination_class = DesignCursorPagination
+    max_bulk_rows = 10000
+    bulk_batch_size = 1000
+    related_fields = {
+        'location': LocationDataSerializer.Meta.fields,
+        'geometry': GeometryDataSerializer.Meta.fields,
+        'materials': MaterialInputSerializer.Meta.fields,
+    }
+    datetime_field = DesignSubmissionSerializer().fields['created_at']
+    
+    def get_queryset(self):
+        """Join the references and apply the location and structure_type filters."""
+        queryset = DesignSubmission.objects.with_related()
+        params = self.request.query_params
+        
+        location = params.get('location')
+        structure_type = params.get('structure_type')
+        
+        if location:
+            if not location.isdigit():
+                return queryset.none()
+            queryset = queryset.filter(location_id=location)
+        if structure_type:
+            queryset = queryset.filter(structure_type=structure_type)
+        return queryset
+    
+    def list(self, request, *args, **kwargs):
+        """
+        Read-only fast path: nested dicts built from one .values() query.
+        
+        The rows are what DesignSubmissionSerializer would produce, without
+        instantiating three related models and serializers per design.
+        """
+        fields = ['id', 'structure_type', 'created_at'] + [
+            f'{relation}__{field}'
+            for relation, related in self.related_fields.items()
+            for field in related
+        ]
+        queryset = self.filter_queryset(self.get_queryset()).values(*fields)
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response([self._nest(row) for row in page])
+    
+    def _nest(self, row):
+        to_datetime = self.datetime_field.to_representation
+        design = {
+            'id': row['id'],
+            'structure_type': row['structure_type'],
+        }
+        for relation, related in self.related_fields.items():
+            if row[f'{relation}__id'] is None:
+                design[relation] = None
+                continue
+            nested = {}
+            for field in related:
+                value = row[f'{relation}__{field}']
+                nested[field] = to_datetime(value) if field in ('created_at', 'updated_at') else value
+            design[relation] = nested
+        design['created_at'] = to_datetime(row['created_at'])
+        return design
+    
+    @action(detail=True, methods=['get'])
+    def loads(self, request, pk=None):
+        """
+        Design loads for the design's location and geometry.
+        
+        Query parameters override bridge.loads.DEFAULT_FACTORS (e.g.
+        ?risk_factor=1.15); the thermal coefficient comes from the design's
+        deck_concrete unless ?deck_concrete= names another grade.
+        
+        Response:
+        {
+            "design_id": 7,
+            "location_id": 1,
+            "geometry_id": 5,
+            "factors": {"risk_factor": 1.08, ...},
+            "loads": {"design_wind_speed": 47.52, ...}
+        }
+        """
+        design = self.get_object()
+        if design.location is None or design.geometry is None:
+            return Response(
+                {'message': 'Design loads need both a location and a geometry'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            factors = parse_factors({
+                'deck_concrete': design.materials.deck_concrete,
+                **request.query_params.dict(),
+            })
+        except ValueError as e:
+            return Response(
+                {'message': 'Invalid input parameters', 'errors': e.args[0]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response({
+            'design_id': design.id,
+            'location_id': design.location_id,
+            'geometry_id': design.geometry_id,
+            'factors': factors,
+            'loads': design_loads(design.location, design.geometry, factors),
+        })
+    
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Store a batch of designs in one transaction.
+        
+        Request body: a list of /api/submit/ payloads, optionally wrapped as
+        {"designs": [...]}. Materials and designs are written with one
+        bulk insert each; referenced ids are checked with one query per
+        model. Nothing is stored if any row is invalid.
+        
+        Response:
+        {
+            "success": true,
+            "count": 2,
+            "ids": [8, 9]
+        }
+        """
+        try:
+            pairs = parse_design_batch(request.data, max_rows=self.max_bulk_rows)
+        except ValueError as e:
+            return Response(
+                {
+                    'success': False,
+                    'message': 'Invalid designs',
+                    'errors': e.args[0]
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        materials = [material for material, _ in pairs]
+        designs = [design for _, design in pairs]
+        errors = missing_references(designs)
+        if errors:
+            return Response(
+                {
+                    'success': False,
+                    'message': 'Invalid designs',
+                    'errors': errors
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        with transaction.atomic():
+            MaterialInput.objects.bulk_create(materials, batch_size=self.bulk_batch_size)
+            DesignSubmission.objects.bulk_create(designs, batch_size=self.bulk_batch_size)
+        
+        return Response({
+            'success': True,
+            'count': len(designs),
+            'ids': [design.id for design in designs]
+        }, status=status.HTTP_201_CREATED)
+
+
+class HealthView(APIView):
+    """
+    Lightweight connectivity check.
+    
+    GET /api/health/
+    
+    Response:
+    {
+        "status": "ok"
+    }
+    """
+    
+    def get(self, request):
+        """Return a constant payload without touching the database."""
+        response = Response({'status': 'ok'})
+        response['Cache-Control'] = 'no-store'
+        return response
+
+
+class WriteStatusView(APIView):
+    """
+    Resolve a write token returned by a buffered write.
+    
+    GET /api/writes/<token>/
+    
+    Response:
+    {
+        "token": "3f2a...",
+        "written": true,
+        "id": 42
+    }
+    
+    Tokens are known only to the worker process that issued them.
+    """
+    
+    def get(self, request, token):
+        """Return the stored id for token, or written=false while pending."""
+        pk = record_writer.resolve(token)
+        return Response({
+            'token': token,
+            'written': pk is not None,
+            'id': pk
+        })
+
+
+class MetricsView(APIView):
+    """
+    Request metrics in the Prometheus text format.
+    
+    GET /metrics
+    
+    Per-view request counts, latency and response size histograms, SQL
+    query counts/time, cache hit ratios and write buffer counters for this
+    worker process (see bridge/metrics.py).
+    
+    Only clients whose address is in METRICS_ALLOWED_IPS (addresses or
+    networks; loopback by default), or that send "Authorization: Bearer
+    <METRICS_TOKEN>" when a token is set, get the metrics; others get 403.
+    """
+    renderer_classes = [PassthroughRenderer]
+    
+    def get(self, request):
+        """Render the current metric values."""
+        if not self._allowed(request):
+            return HttpResponse('Forbidden\n', status=status.HTTP_403_FORBIDDEN, content_type='text/plain')
+        response = HttpResponse(metrics_registry.render(), content_type=METRICS_CONTENT_TYPE)
+        response['Cache-Control'] = 'no-store'
+        return response
+    
+    def _allowed(self, request):
+        token = getattr(settings, 'METRICS_TOKEN', None)
+        if token:
+            supplied = request.META.get('HTTP_AUTHORIZATION', '')
+            if hmac.compare_digest(supplied.encode('utf-8'), f'Bearer {token}'.encode('utf-8')):
+                return True
+        try:
+            address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+        except ValueError:
+            return False
+        return any(
+            address in ipaddress.ip_network(network, strict=False)
+            for network in getattr(settings, 'METRICS_ALLOWED_IPS', ('127.0.0.1', '::1'))
+        )
@@ -0,0 +1,340 @@
+"""
+Buffered background writer for GeometryData, MaterialInput and
+DesignSubmission records.
+
+SQLite allows a single writer at a time, so one INSERT per request
+serializes concurrent requests on the database lock. Views instead hand
+unsaved model instances to record_writer.submit(), which returns a token
+immediately; a background thread flushes queued instances with one
+bulk_create per model when batch_size records are waiting or
+flush_interval seconds have passed, whichever comes first.
+
+- resolve(token) returns the primary key once the record is written
+  (tokens are only known to the process that issued them)
+- flush() blocks until everything queued so far is written
+- shutdown() drains the queue and stops the thread; it is registered with
+  atexit so queued records are written when the server process exits
+
+Settings:
+- WRITE_BUFFER_ENABLED: Buffer writes by default (views offer ?sync=true)
+- WRITE_BUFFER_BATCH_SIZE: Maximum records per flush
+- WRITE_BUFFER_FLUSH_INTERVAL: Maximum seconds a record waits in the queue
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class BufferedWriter:
+    """Queue of unsaved model instances flushed in bulk by a background thread."""
+
+    max_retries = 3
+    max_resolved = 100000
+
+    def __init__(self, batch_size=None, flush_interval=None):
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._resolved = OrderedDict()
+        self.queued = 0
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+
+    @property
+    def batch_size(self):
+        return self._batch_size or getattr(settings, 'WRITE_BUFFER_BATCH_SIZE', 500)
+
+    @property
+    def flush_interval(self):
+        return self._flush_interval or getattr(settings, 'WRITE_BUFFER_FLUSH_INTERVAL', 0.5)
+
+    def submit(self, instance):
+        """Queue an unsaved model instance and return its write token."""
+        token = uuid.uuid4().hex
+        self._ensure_started()
+        self._queue.put((token, instance))
+        self.queued += 1
+        return token
+
+    def resolve(self, token):
+        """Return the primary key written for token, or None if still pending/unknown."""
+        return self._resolved.get(token)
+
+    def pending(self):
+        """Approximate number of records waiting to be written."""
+        return self._queue.qsize()
+
+    def flush(self):
+        """Block until every record queued so far has been written."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def shutdown(self, timeout=None):
+        """Write everything still queued and stop the background thread."""
+        with self._lock:
+            thread = self._thread
+            if thread is None or not thread.is_alive():
+                return
+            self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def stats(self):
+        return {
+            'queued': self.queued,
+            'written': self.written,
+            'batches': self.batches,
+            'failed': self.failed,
+            'pending': self.pending(),
+        }
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name='bridge-buffered-writer', daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        try:
+            stopping = False
+            while not stopping:
+                batch = []
+                deadline = None
+                while len(batch) < self.batch_size:
+                    timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+                    try:
+                        item = self._queue.get(timeout=timeout)
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        self._queue.task_done()
+                        stopping = True
+                        # Anything queued before the stop marker is still written
+                        batch.extend(self._drain())
+                        break
+                    batch.append(item)
+                    if deadline is None:
+                        deadline = time.monotonic() + self.flush_interval
+                if batch:
+                    self._write(batch)
+        finally:
+            connections.close_all()
+
+    def _drain(self):
+        items = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return items
+            if item is _STOP:
+                self._queue.task_done()
+            else:
+                items.append(item)
+
+    def _write(self, batch):
+        by_model = OrderedDict()
+        for token, instance in batch:
+            by_model.setdefault(type(instance), []).append((token, instance))
+
+        for model in _dependency_order(by_model):
+            items = by_model[model]
+            ready = self._drop_orphans(model, items)
+            duplicates = set()
+            error = None
+            for attempt in range(1, self.max_retries + 1):
+                try:
+                    with transaction.atomic():
+                        model.objects.bulk_create([instance for _, instance in ready])
+                    error = None
+                    break
+                except IntegrityError as e:
+                    # A unique row (e.g. GeometryData.input_hash) already exists, or a row is bad
+                    error = e
+                    break
+                except Exception as e:
+                    error = e
+                    if attempt < self.max_retries:
+                        time.sleep(0.1 * attempt)
+
+            if error is not None:
+                # Rolled back: primary keys a partial insert assigned are not valid
+                for _, instance in ready:
+                    instance.pk = None
+                # Find the offending rows instead of dropping the whole batch;
+                # a duplicate (IntegrityError) is the common, expected case
+                logger.log(
+                    logging.DEBUG if isinstance(error, IntegrityError) else logging.WARNING,
+                    'Bulk insert of %d buffered %s record(s) failed (%s); inserting one by one',
+                    len(ready), model.__name__, error
+                )
+                duplicates = self._write_each(model, ready)
+
+            self.batches += 1
+            for token, instance in ready:
+                if instance.pk is not None:
+                    if token not in duplicates:
+                        self.written += 1
+                    self._resolved[token] = instance.pk
+            while len(self._resolved) > self.max_resolved:
+                self._resolved.popitem(last=False)
+            self._finish(items)
+
+    def _drop_orphans(self, model, items):
+        """
+        Return the items whose related records were written.
+
+        A DesignSubmission whose MaterialInput failed in the same batch
+        cannot be inserted; it is counted as failed, the others still are.
+        """
+        relations = [field for field in model._meta.concrete_fields if field.is_relation]
+        ready = []
+        for token, instance in items:
+            unsaved = [
+                field.name for field in relations
+                if field.is_cached(instance)
+                and getattr(instance, field.name) is not None
+                and getattr(instance, field.name).pk is None
+            ]
+            if unsaved:
+                self.failed += 1
+                logger.error(
+                    'Dropping buffered %s record: its %s was not written',
+                    model.__name__, ', '.join(unsaved)
+                )
+            else:
+                ready.append((token, instance))
+        return ready
+
+    def _write_each(self, model, items):
+        """
+        Insert items one by one; return the tokens of those that already existed.
+
+        A record that violates a unique constraint takes the primary key of
+        the existing row (found by its unique fields, and marked as used),
+        so its token still resolves. Two identical validations racing past the memo both
+        queue a GeometryData row, and the second must point at the first.
+        Any other failure (NOT NULL, foreign key, a lost connection) drops
+        only that record and counts it in failed.
+        """
+        duplicates = set()
+        for token, instance in items:
+            try:
+                with transaction.atomic():
+                    model.objects.bulk_create([instance])
+                continue
+            except IntegrityError as e:
+                error = e
+                existing = _existing_pk(model, instance) if _is_unique_violation(e) else None
+                if existing is not None:
+                    instance.pk = existing
+                    _mark_used(model, existing)
+                    duplicates.add(token)
+                    logger.debug('Buffered %s record already exists as %s', model.__name__, existing)
+                    continue
+            except Exception as e:
+                error = e
+            instance.pk = None
+            self.failed += 1
+            logger.error('Dropping buffered %s record: %s', model.__name__, error)
+        return duplicates
+
+    def _finish(self, items):
+        for _ in items:
+            self._queue.task_done()
+
+
+def _is_unique_violation(error):
+    """True if an IntegrityError comes from a unique or primary key constraint."""
+    cause = error.__cause__
+    # PostgreSQL SQLSTATE, or the extended SQLite error name (Python 3.11+)
+    code = getattr(cause, 'pgcode', None) or getattr(cause, 'sqlite_errorname', None)
+    if code:
+        return code in ('23505', 'SQLITE_CONSTRAINT_UNIQUE', 'SQLITE_CONSTRAINT_PRIMARYKEY')
+    return 'unique' in str(error).lower()
+
+
+def _existing_pk(model, instance):
+    """Primary key of the row sharing a unique field value with instance, or None."""
+    for field in model._meta.concrete_fields:
+        if not field.unique or field.primary_key:
+            continue
+        value = getattr(instance, field.attname)
+        if value is None:
+            continue
+        pk = model.objects.filter(**{field.attname: value}).values_list('pk', flat=True).first()
+        if pk is not None:
+            return pk
+    return None
+
+
+def _mark_used(model, pk):
+    """Move updated_at of a row a record was deduplicated into, so retention sees it as used."""
+    if any(field.name == 'updated_at' for field in model._meta.concrete_fields):
+        model.objects.filter(pk=pk).update(updated_at=timezone.now())
+
+
+def _dependency_order(models):
+    """
+    Order models so each comes after the models it has foreign keys to.
+
+    A DesignSubmission queued with its MaterialInput can then be inserted
+    in the same batch: by the time designs are written, their materials
+    have primary keys.
+    """
+    pending = list(models)
+    ordered = []
+    while pending:
+        for model in pending:
+            targets = {
+                field.related_model for field in model._meta.concrete_fields
+                if field.is_relation and field.related_model is not model
+            }
+            if not targets.intersection(pending):
+                break
+        else:
+            model = pending[0]
+        pending.remove(model)
+        ordered.append(model)
+    return ordered
+
+
+record_writer = BufferedWriter()
+atexit.register(record_writer.shutdown)
+
+
+def wants_sync_write(request, data=None):
+    """
+    Return True if the request should be written before responding.
+
+    Writes are synchronous when buffering is disabled in settings or the
+    client asks for it with ?sync=true or "sync": true in the body. Works
+    with DRF requests and, given the parsed body as data, plain Django ones.
+    """
+    if not getattr(settings, 'WRITE_BUFFER_ENABLED', False):
+        return True
+    params = getattr(request, 'query_params', request.GET)
+    if params.get('sync', '').lower() in ('1', 'true', 'yes'):
+        return True
+    if data is None:
+        data = request.data
+    return isinstance(data, dict) and data.get('sync') is True
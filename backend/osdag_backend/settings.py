@@ -12,6 +12,9 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 from pathlib import Path
 
+from decouple import config
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -43,6 +46,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'bridge.middleware.MetricsMiddleware',
+    'bridge.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -77,11 +82,54 @@ WSGI_APPLICATION = 'osdag_backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# The profile is selected with the DB_PROFILE environment variable (or .env):
+# - sqlite (default): WAL journal, synchronous=NORMAL, mmap, busy timeout and
+#   persistent connections; pragmas are applied in bridge/signals.py, and WAL,
+#   which is stored in the database file, once by migration 0008
+# - postgres: persistent connections with health checks (requires psycopg);
+#   put PgBouncer in front for pooling across worker processes
+
+DB_PROFILE = config('DB_PROFILE', default='sqlite')
+
+if DB_PROFILE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('POSTGRES_DB', default='osdag'),
+            'USER': config('POSTGRES_USER', default='osdag'),
+            'PASSWORD': config('POSTGRES_PASSWORD', default=''),
+            'HOST': config('POSTGRES_HOST', default='localhost'),
+            'PORT': config('POSTGRES_PORT', default='5432'),
+            'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=600, cast=int),
+            'CONN_HEALTH_CHECKS': True,
+            # Server-side cursors do not survive PgBouncer transaction pooling
+            'DISABLE_SERVER_SIDE_CURSORS': config('DB_BEHIND_PGBOUNCER', default=False, cast=bool),
+        }
+    }
+elif DB_PROFILE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': config('SQLITE_PATH', default=str(BASE_DIR / 'db.sqlite3')),
+            'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=600, cast=int),
+            'OPTIONS': {
+                # Seconds a writer waits for the lock before "database is locked"
+                'timeout': 20,
+            },
+        }
     }
+else:
+    raise ImproperlyConfigured(f"Unknown DB_PROFILE {DB_PROFILE!r}; use 'sqlite' or 'postgres'")
+
+# PRAGMAs run on every new SQLite connection (bridge/signals.py). Only
+# per-connection settings belong here: a persistent one such as journal_mode
+# would rewrite the database file whenever any command connects
+SQLITE_PRAGMAS = {
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'busy_timeout': 20000,
+    'cache_size': -64000,
+    'foreign_keys': 'ON',
 }
 
 
@@ -140,4 +188,64 @@ CORS_ALLOW_CREDENTIALS = True
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    'DEFAULT_RENDERER_CLASSES': [
+        'bridge.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
+
+# Location reference cache (bridge/cache.py)
+# Set to a key of CACHES to share cached locations between worker processes
+LOCATION_CACHE_ALIAS = None
+# Seconds between checks of the table version in server processes, so rows changed
+# by another process (e.g. import_locations) are dropped from the cache
+LOCATION_CHECK_INTERVAL = 5.0
+
+# Memory-mapped LocationData snapshot shared by worker processes (bridge/snapshot.py);
+# e.g. BASE_DIR / 'snapshots' / 'locations.snap'. None: read from the database
+LOCATION_SNAPSHOT_PATH = None
+LOCATION_SNAPSHOT_CHECK_INTERVAL = 1.0
+
+# Seconds between background re-reads of the materials catalog in server
+# processes, so grade changes made by another worker are picked up (bridge/materials.py)
+MATERIALS_CHECK_INTERVAL = 30.0
+
+# Cache-Control max-age (seconds) for ETag-validated reference data
+REFERENCE_DATA_MAX_AGE = 3600
+
+# Entries in the LRU memo of geometry validation results (bridge/cache.py)
+GEOMETRY_MEMO_SIZE = 4096
+
+# Buffered writes for geometry/submission records (bridge/writer.py)
+WRITE_BUFFER_ENABLED = True
+WRITE_BUFFER_BATCH_SIZE = 500
+WRITE_BUFFER_FLUSH_INTERVAL = 0.5
+
+# GeometryData retention (bridge/retention.py, manage.py compact_geometry)
+GEOMETRY_RETENTION_ENABLED = False
+GEOMETRY_RETENTION_INTERVAL = 3600
+GEOMETRY_RETENTION_DAYS = 90
+GEOMETRY_RETENTION_INVALID = True
+GEOMETRY_RETENTION_BATCH_SIZE = 1000
+GEOMETRY_ARCHIVE_DIR = BASE_DIR / 'archive'
+# Only the worker process holding this file runs a retention pass (None: no locking)
+GEOMETRY_RETENTION_LOCK = BASE_DIR / 'archive' / 'retention.lock'
+
+# Worker processes for /api/geometry/sweep/ (None: CPU count)
+SWEEP_WORKERS = None
+
+# Request metrics served at /metrics (bridge/metrics.py)
+METRICS_ENABLED = True
+# Client addresses or networks allowed to read /metrics (REMOTE_ADDR; behind a
+# proxy, that is the proxy's address)
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+# If set, clients sending "Authorization: Bearer <token>" may read /metrics from any address
+METRICS_TOKEN = config('METRICS_TOKEN', default=None)
+
+# Concurrent identical reads share one response (bridge/coalesce.py)
+COALESCE_ENABLED = True
+COALESCE_WAIT_TIMEOUT = 10.0
+
+# Response compression (bridge/middleware.py); smaller bodies are sent as-is
+COMPRESSION_ENABLED = True
+COMPRESSION_MIN_SIZE = 1024
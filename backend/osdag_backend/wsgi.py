@@ -14,3 +14,19 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'osdag_backend.settings')
 
 application = get_wsgi_application()
+
+# Materials catalog: loaded now, then re-read in a background thread
+from bridge.materials import registry_refresher  # noqa: E402
+
+registry_refresher.start()
+
+# Drop cached locations when another process changes the table
+from bridge.cache import location_watcher  # noqa: E402
+
+location_watcher.start()
+
+# Periodic GeometryData retention, if GEOMETRY_RETENTION_ENABLED (server processes only;
+# each worker starts one, and GEOMETRY_RETENTION_LOCK lets one run at a time)
+from bridge.retention import retention_scheduler  # noqa: E402
+
+retention_scheduler.start()
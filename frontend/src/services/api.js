@@ -42,6 +42,27 @@ const apiService = {
     }
   },
 
+  /**
+   * Fetch the state -> districts index for dropdowns
+   * GET /api/locations/index/
+   */
+  getLocationIndex: async () => {
+    try {
+      const response = await apiClient.get('/locations/index/');
+      return {
+        success: true,
+        data: response.data,
+        message: 'Location index fetched successfully',
+      };
+    } catch (error) {
+      return {
+        success: false,
+        error: error.response?.data?.detail || error.message,
+        message: 'Failed to fetch location index',
+      };
+    }
+  },
+
   /**
    * Fetch location by state and district
    * GET /api/locations/by_state/ or by_district/
@@ -79,6 +100,52 @@ const apiService = {
     }
   },
 
+  /**
+   * Search district names as the user types
+   * GET /api/locations/search/
+   */
+  searchLocations: async (q, limit = 10, state) => {
+    try {
+      const response = await apiClient.get('/locations/search/', {
+        params: { q, limit, state },
+      });
+      return {
+        success: true,
+        data: response.data,
+        message: 'Locations searched successfully',
+      };
+    } catch (error) {
+      return {
+        success: false,
+        error: error.response?.data?.error || error.message,
+        message: 'Failed to search locations',
+      };
+    }
+  },
+
+  /**
+   * Fetch the locations nearest to GPS coordinates
+   * GET /api/locations/nearest/
+   */
+  getNearestLocations: async (lat, lon, k = 5) => {
+    try {
+      const response = await apiClient.get('/locations/nearest/', {
+        params: { lat, lon, k },
+      });
+      return {
+        success: true,
+        data: response.data,
+        message: 'Nearest locations fetched successfully',
+      };
+    } catch (error) {
+      return {
+        success: false,
+        error: error.response?.data?.error || error.message,
+        message: 'Failed to fetch nearest locations',
+      };
+    }
+  },
+
   /**
    * Validate geometry
    * POST /api/geometry/validate/
@@ -107,6 +174,50 @@ const apiService = {
     }
   },
 
+  /**
+   * Enumerate feasible girder layouts for a carriageway width
+   * GET /api/geometry/solve/
+   * Params: { carriageway_width, overhang_target?, page?, page_size?, ... }
+   */
+  solveGeometry: async (params) => {
+    try {
+      const response = await apiClient.get('/geometry/solve/', { params });
+      return {
+        success: true,
+        data: response.data,
+        message: 'Geometry layouts fetched successfully',
+      };
+    } catch (error) {
+      return {
+        success: false,
+        error: error.response?.data?.errors?.[0] || error.message,
+        message: 'Failed to solve geometry',
+      };
+    }
+  },
+
+  /**
+   * Compute design loads for locations x geometries
+   * POST /api/loads/
+   * Body: { location_ids | state, geometry_ids | geometries, ...factors }
+   */
+  getDesignLoads: async (payload) => {
+    try {
+      const response = await apiClient.post('/loads/', payload);
+      return {
+        success: true,
+        data: response.data,
+        message: 'Design loads computed successfully',
+      };
+    } catch (error) {
+      return {
+        success: false,
+        error: error.response?.data?.errors?.[0] || error.message,
+        message: 'Failed to compute design loads',
+      };
+    }
+  },
+
   /**
    * Get available material options
    * GET /api/materials/
@@ -151,6 +262,27 @@ const apiService = {
     }
   },
 
+  /**
+   * Fetch a submitted design with its location, geometry and materials
+   * GET /api/designs/{id}/
+   */
+  getDesign: async (designId) => {
+    try {
+      const response = await apiClient.get(`/designs/${designId}/`);
+      return {
+        success: true,
+        data: response.data,
+        message: 'Design fetched successfully',
+      };
+    } catch (error) {
+      return {
+        success: false,
+        error: error.response?.data?.detail || error.message,
+        message: 'Failed to fetch design',
+      };
+    }
+  },
+
   /**
    * Save custom parameters (optional endpoint)
    * POST /api/custom-params/
@@ -182,11 +314,11 @@ const apiService = {
 
   /**
    * Health check - Test backend connectivity
-   * GET /api/locations/ (simple test)
+   * GET /api/health/
    */
   checkBackendConnection: async () => {
     try {
-      await apiClient.get('/locations/', {
+      await apiClient.get('/health/', {
         timeout: 2000,
       });
       return {